@@ -50,61 +50,63 @@ MODEL_DIR_ADVANCED = Path("models/saved_models")
 
 DISEASES = ['orthopedic', 'dermatological', 'cardiac', 'ear', 'urinary']
 
-# AUC Performance Metrics (Based on Testing Data)
-AUC_SCORES_BASIC = {
-    'orthopedic': 0.6676,
-    'dermatological': 0.5814,
-    'cardiac': 0.6706,
-    'ear': 0.5836,
-    'urinary': 0.7064
-}
-
-AUC_SCORES_ADVANCED = {
-    'orthopedic': 0.6965,
-    'dermatological': 0.6423,
-    'cardiac': 0.7124,
-    'ear': 0.6487,
-    'urinary': 0.7253
-}
+# The advanced directory may hold versioned sub-directories (written by
+# scripts/train_unified_clean.py --save-dir) plus a CURRENT pointer file. The basic
+# 19-feature set is not published by any script and stays a flat directory.
+CURRENT_FILE = "CURRENT"
 
 # ============================================================================
 # Model Loading
 # ============================================================================
 
+def resolve_model_dir(root):
+    """Directory holding the active version (the root itself for a flat set)"""
+    pointer = root / CURRENT_FILE
+    if pointer.exists():
+        return root / pointer.read_text().strip()
+    return root
+
+def load_auc_scores(model_dir, metrics_file):
+    """AUC per disease measured at training time, from the set's metrics CSV"""
+    df = pd.read_csv(model_dir / metrics_file)
+    return {row['disease'].removeprefix('target_'): float(row['auc_roc']) for _, row in df.iterrows()}
+
 def load_models():
-    """Load all trained models and preprocessing components"""
+    """Load all trained models, preprocessing components and their AUC scores"""
     models_basic = {}
     models_advanced = {}
+    dir_basic = MODEL_DIR_BASIC
+    dir_advanced = resolve_model_dir(MODEL_DIR_ADVANCED)
     
     # Load basic models
     for disease in DISEASES:
-        model_file = MODEL_DIR_BASIC / f"target_{disease}_19feat.pkl"
+        model_file = dir_basic / f"target_{disease}_19feat.pkl"
         with open(model_file, 'rb') as f:
             models_basic[disease] = pickle.load(f)
     
     # Load advanced models
     for disease in DISEASES:
-        model_file = MODEL_DIR_ADVANCED / f"{disease}_logistic.pkl"
+        model_file = dir_advanced / f"{disease}_logistic.pkl"
         with open(model_file, 'rb') as f:
             models_advanced[disease] = pickle.load(f)
     
     # Load preprocessing components
-    with open(MODEL_DIR_BASIC / "scaler_19feat.pkl", 'rb') as f:
+    with open(dir_basic / "scaler_19feat.pkl", 'rb') as f:
         scaler_basic = pickle.load(f)
     
-    with open(MODEL_DIR_ADVANCED / "feature_scaler.pkl", 'rb') as f:
+    with open(dir_advanced / "feature_scaler.pkl", 'rb') as f:
         scaler_advanced = pickle.load(f)
     
-    with open(MODEL_DIR_BASIC / "features_19feat.pkl", 'rb') as f:
+    with open(dir_basic / "features_19feat.pkl", 'rb') as f:
         features_19 = pickle.load(f)
     
-    with open(MODEL_DIR_ADVANCED / "features_list.pkl", 'rb') as f:
+    with open(dir_advanced / "features_list.pkl", 'rb') as f:
         features_67 = pickle.load(f)
     
-    with open(MODEL_DIR_BASIC / "encoders_19feat.pkl", 'rb') as f:
+    with open(dir_basic / "encoders_19feat.pkl", 'rb') as f:
         encoders_basic = pickle.load(f)
     
-    with open(MODEL_DIR_ADVANCED / "label_encoders.pkl", 'rb') as f:
+    with open(dir_advanced / "label_encoders.pkl", 'rb') as f:
         encoders_advanced = pickle.load(f)
     
     return {
@@ -116,6 +118,7 @@ def load_models():
         'features_67': features_67,
         'encoders_basic': encoders_basic,
         'encoders_advanced': encoders_advanced,
+        'auc_basic': load_auc_scores(dir_basic, "metrics_19feat.csv"),
     }
 
 # Load models on startup
@@ -325,7 +328,7 @@ async def predict_basic(request: BasicPredictionRequest):
             confidence = max(proba) * 100
             recommendation = get_recommendation(disease, risk_score)
             
-            auc = AUC_SCORES_BASIC[disease]
+            auc = models_dict['auc_basic'][disease]
             reliability = get_reliability_rating(auc)
             reliability_explanation = get_reliability_explanation(auc, disease)
             
@@ -0,0 +1,78 @@
+"""
+Versioned serving artifact sets shared by the training and update scripts.
+
+A save directory holds one sub-directory per version plus a CURRENT file naming
+the active one. Each version carries a manifest.json with file roles, SHA-256
+hashes, a content hash and the measured metrics; backend_ds2/artifacts.py reads
+the same layout. A version is staged in a hidden temp directory and renamed
+into place before CURRENT is switched, so servers never see a partial set.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_hash(file_hashes):
+    """Hash over every file in a set; must match backend_ds2/artifacts.py."""
+    lines = "".join(f"{name}:{file_hashes[name]}\n" for name in sorted(file_hashes))
+    return hashlib.sha256(lines.encode()).hexdigest()
+
+
+def current_version_dir(root_dir):
+    """(version, directory) named by root_dir/CURRENT."""
+    root_dir = Path(root_dir)
+    pointer = root_dir / CURRENT_FILE
+    if not pointer.exists():
+        raise FileNotFoundError(f"No {CURRENT_FILE} file in {root_dir}; publish a version with --save-dir first")
+    version = pointer.read_text().strip()
+    return version, root_dir / version
+
+
+def read_manifest(version_dir):
+    with open(Path(version_dir) / MANIFEST_FILE) as f:
+        return json.load(f)
+
+
+def stage_version(root_dir, version):
+    """Create the temp directory a new version is written into."""
+    root_dir = Path(root_dir)
+    if (root_dir / version).exists():
+        raise FileExistsError(f"Version {version} already exists in {root_dir}")
+    staging_dir = root_dir / f".{version}.tmp"
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    return staging_dir
+
+
+def publish_version(root_dir, version, staging_dir, manifest):
+    """Hash the staged files, write the manifest, move the set into place and switch CURRENT."""
+    root_dir = Path(root_dir)
+    file_hashes = {path.name: file_sha256(path) for path in sorted(Path(staging_dir).iterdir())
+                   if path.name != MANIFEST_FILE}
+    manifest = {
+        'version': version,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        **manifest,
+        'files': file_hashes,
+        'content_hash': content_hash(file_hashes),
+    }
+    with open(Path(staging_dir) / MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    Path(staging_dir).rename(root_dir / version)
+    pointer_tmp = root_dir / f"{CURRENT_FILE}.tmp"
+    pointer_tmp.write_text(version)
+    os.replace(pointer_tmp, root_dir / CURRENT_FILE)
+    return manifest
@@ -0,0 +1,66 @@
+"""
+One-hot and label encodings of the unified feature matrix.
+
+encode_dense is the original pd.get_dummies(drop_first=True) pipeline.
+encode_sparse builds the same columns, in the same order, straight into a CSR
+matrix. encode_label produces the label-encoded layout the APIs serve.
+
+Used by train_unified_clean.py --encoding.
+"""
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import LabelEncoder
+
+
+def encode_dense(X_raw):
+    """One-hot encode categorical columns into a dense DataFrame (original pipeline)."""
+    return pd.get_dummies(X_raw, drop_first=True)
+
+
+def encode_sparse(X_raw):
+    """
+    One-hot encode categorical columns straight into a scipy CSR matrix.
+    Produces the same columns, in the same order, as pd.get_dummies(drop_first=True)
+    without ever materializing the dense indicator block.
+    """
+    cat_cols = X_raw.select_dtypes(include=['object', 'string', 'category']).columns
+    num_cols = [col for col in X_raw.columns if col not in cat_cols]
+    n_rows = len(X_raw)
+
+    blocks = [sparse.csr_matrix(X_raw[num_cols].to_numpy(dtype=np.float64))]
+    columns = list(num_cols)
+
+    for col in cat_cols:
+        cat = pd.Categorical(X_raw[col])
+        codes = cat.codes          # -1 marks missing values (all-zero row, like get_dummies)
+        keep = codes > 0           # code 0 is the dropped first level
+        rows = np.flatnonzero(keep)
+        blocks.append(sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, codes[keep] - 1)),
+            shape=(n_rows, len(cat.categories) - 1),
+        ))
+        columns += [f"{col}_{level}" for level in cat.categories[1:]]
+
+    return sparse.hstack(blocks, format='csr'), columns
+
+
+def encode_label(X_raw):
+    """
+    Label-encode categorical columns in place, keeping the raw column order.
+    Matches what the APIs do at inference time (str(value).strip() -> encoder.transform).
+    """
+    X = X_raw.copy()
+    encoders = {}
+    for col in X.select_dtypes(include=['object', 'string', 'category']).columns:
+        values = X[col].astype(str).str.strip()
+        encoders[col] = LabelEncoder().fit(values)
+        X[col] = encoders[col].transform(values).astype(float)
+    return X.astype(float), encoders
+
+
+def matrix_nbytes(X):
+    """Memory held by an encoded feature matrix (DataFrame or CSR)."""
+    if sparse.issparse(X):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return int(X.memory_usage(deep=True).sum())
@@ -0,0 +1,24 @@
+"""
+Re-express linear models in an updated StandardScaler.
+
+When the scaler's running mean and scale change, w·(x - mean)/scale + b is kept
+identical by rescaling the coefficients and shifting the intercept, so a model's
+predictions do not move until it is trained on the new rows.
+
+Used by update_incremental.py.
+"""
+import numpy as np
+
+
+def rescale_coefficients(model, mean_old, scale_old, mean_new, scale_new):
+    """Keep w·(x - mean)/scale + b identical when the scaler's mean/scale change."""
+    w = model.coef_[0]
+    model.intercept_ = model.intercept_ + w @ ((mean_new - mean_old) / scale_old)
+    model.coef_ = (w * scale_new / scale_old)[np.newaxis, :]
+
+
+def rescale_bootstrap(boot, mean_old, scale_old, mean_new, scale_new):
+    """rescale_coefficients() for every replicate in a (replicates x features x diseases) tensor."""
+    coef = boot['coef'].astype(float)
+    intercept = boot['intercept'] + np.einsum('rfd,f->rd', coef, (mean_new - mean_old) / scale_old)
+    return coef * (scale_new / scale_old)[np.newaxis, :, np.newaxis], intercept
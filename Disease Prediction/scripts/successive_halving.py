@@ -0,0 +1,144 @@
+"""
+Successive-halving hyperparameter search with warm-started candidates.
+
+Every candidate starts on a small budget of its model's resource parameter
+(trees or iterations). After each rung only the best 1/factor candidates
+survive, and they are grown to factor times the budget with warm_start
+instead of being refit, so earlier work is reused. Candidates in a rung are
+fit in parallel with joblib and the search state is checkpointed after every
+rung, so an interrupted run resumes where it stopped.
+
+Used by train_unified_clean.py --search.
+"""
+import os
+import pickle
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import ParameterGrid, train_test_split
+
+# model name -> (resource grown per rung, min budget, max budget, hyperparameter grid)
+SEARCH_SPACES = {
+    'LogisticRegression': ('max_iter', 50, 1000, {
+        'C': [0.001, 0.01, 0.1, 1.0, 10.0],
+    }),
+    'RandomForest': ('n_estimators', 25, 400, {
+        'max_depth': [8, 12, 15, 20, None],
+        'min_samples_leaf': [1, 5, 20],
+        'max_features': ['sqrt', 0.3],
+    }),
+    'GradientBoosting': ('n_estimators', 25, 400, {
+        'max_depth': [3, 5],
+        'learning_rate': [0.05, 0.1],
+        'subsample': [0.8, 1.0],
+    }),
+    'HistGradientBoosting': ('max_iter', 25, 500, {
+        'learning_rate': [0.05, 0.1],
+        'max_leaf_nodes': [15, 31, 63],
+        'l2_regularization': [0.0, 1.0],
+    }),
+}
+
+
+def load_checkpoint(path):
+    """Return the saved search states ({key: state}), or {} when starting fresh."""
+    if path and os.path.exists(path):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    return {}
+
+
+def save_checkpoint(path, checkpoint):
+    """Write the checkpoint atomically so a crash never leaves a truncated file."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def _search_clone(base_estimator, params):
+    """Warm-startable, single-threaded copy of the base estimator for one candidate."""
+    estimator = clone(base_estimator).set_params(warm_start=True, **params)
+    tunables = estimator.get_params()
+    if 'n_jobs' in tunables:
+        estimator.set_params(n_jobs=1)  # parallelism comes from running candidates side by side
+    if 'early_stopping' in tunables:
+        estimator.set_params(early_stopping=False)  # the rung budget must be the iteration count
+    return estimator
+
+
+def _grow_and_score(estimator, resource, budget, X_fit, y_fit, X_val, y_val):
+    """Grow one candidate to the rung budget (reusing its earlier fit) and score it."""
+    estimator.set_params(**{resource: budget})
+    estimator.fit(X_fit, y_fit)
+    return estimator, roc_auc_score(y_val, estimator.predict_proba(X_val)[:, 1])
+
+
+def successive_halving(model_name, base_estimator, X, y, checkpoint_path, key,
+                       factor=3, max_candidates=None, n_jobs=-1, random_state=42, log=print):
+    """
+    Tune base_estimator on (X, y) and return (best_params, history).
+
+    best_params holds the winning hyperparameters plus the resource set to its
+    maximum budget; history has one row per candidate per rung. A stratified
+    20% hold-out of X is used for scoring, so the caller's test split stays unseen.
+    """
+    resource, min_budget, max_budget, grid = SEARCH_SPACES[model_name]
+    checkpoint = load_checkpoint(checkpoint_path)
+    signature = (tuple(X.shape), int(np.asarray(y).sum()))
+
+    state = checkpoint.get(key)
+    if state is not None and state['signature'] == signature:
+        if state['best_params'] is not None:
+            log(f"     ↻ {key}: finished search restored from checkpoint")
+            return state['best_params'], state['history']
+        log(f"     ↻ {key}: resuming at rung {state['rung']} ({resource}={state['budget']})")
+    else:
+        candidates = list(ParameterGrid(grid))
+        if max_candidates and len(candidates) > max_candidates:
+            picks = np.random.RandomState(random_state).choice(len(candidates), max_candidates, replace=False)
+            candidates = [candidates[i] for i in sorted(picks)]
+        state = {
+            'signature': signature,
+            'rung': 0,
+            'budget': min_budget,
+            'candidates': candidates,
+            'estimators': [_search_clone(base_estimator, params) for params in candidates],
+            'history': [],
+            'best_params': None,
+        }
+
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X, y, test_size=0.2, random_state=random_state, stratify=y
+    )
+
+    while True:
+        results = Parallel(n_jobs=n_jobs)(
+            delayed(_grow_and_score)(est, resource, state['budget'], X_fit, y_fit, X_val, y_val)
+            for est in state['estimators']
+        )
+        estimators = [est for est, _ in results]
+        scores = np.array([score for _, score in results])
+        state['history'] += [
+            {'Rung': state['rung'], 'Budget': state['budget'], 'Params': str(params), 'AUC': score}
+            for params, score in zip(state['candidates'], scores)
+        ]
+        log(f"     rung {state['rung']}: {len(estimators)} candidates @ {resource}={state['budget']} "
+            f"-> best AUC {scores.max():.4f}")
+
+        order = np.argsort(scores)[::-1]
+        n_keep = int(np.ceil(len(estimators) / factor))
+        if n_keep == 1 or state['budget'] >= max_budget:
+            state['best_params'] = {**state['candidates'][order[0]], resource: max_budget}
+            state['estimators'] = []  # finished searches only need their result
+            checkpoint[key] = state
+            save_checkpoint(checkpoint_path, checkpoint)
+            return state['best_params'], state['history']
+
+        state['candidates'] = [state['candidates'][i] for i in order[:n_keep]]
+        state['estimators'] = [estimators[i] for i in order[:n_keep]]
+        state['budget'] = min(state['budget'] * factor, max_budget)
+        state['rung'] += 1
+        checkpoint[key] = state
+        save_checkpoint(checkpoint_path, checkpoint)
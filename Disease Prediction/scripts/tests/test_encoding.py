@@ -0,0 +1,46 @@
+# test_encoding.py
+"""
+encode_sparse must give the same columns, order and values as the dense
+pd.get_dummies(drop_first=True) pipeline (run pytest from Disease Prediction/scripts).
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from encoding import encode_dense, encode_label, encode_sparse
+
+
+def random_matrix(seed, n=300):
+    """Numeric, bool and categorical columns; categoricals include missing values and a single-level column."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "age": rng.uniform(0, 15, n),
+        "weight": rng.integers(1, 60, n),
+        "insured": rng.random(n) < 0.5,
+        "sex": rng.choice(["Female", "Male", "Male, neutered"], n),
+        "diet": pd.Series(rng.choice(["Kibble", "Raw", "Wet", "Home cooked", None], n), dtype=object),
+        "home": rng.choice(["House"], n),
+        "income": rng.choice([f"band {i}" for i in range(12)], n),
+    })
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sparse_matches_dense(seed):
+    X_raw = random_matrix(seed)
+    dense = encode_dense(X_raw)
+    X_sparse, columns = encode_sparse(X_raw)
+    assert columns == list(dense.columns)
+    np.testing.assert_array_equal(X_sparse.toarray(), dense.to_numpy(dtype=float))
+
+
+def test_label_encoding_keeps_column_order():
+    X_raw = random_matrix(0)
+    X, encoders = encode_label(X_raw)
+    assert list(X.columns) == list(X_raw.columns)
+    assert set(encoders) == {"sex", "diet", "home", "income"}
+    np.testing.assert_array_equal(X["sex"], encoders["sex"].transform(X_raw["sex"].astype(str).str.strip()))
@@ -0,0 +1,45 @@
+# test_rescaling.py
+"""
+Re-expressing a logistic model (and its bootstrap replicates) in an updated
+StandardScaler must leave its predictions unchanged before any learning.
+"""
+import copy
+import os
+import sys
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rescaling import rescale_bootstrap, rescale_coefficients
+
+
+def scalers_and_data(seed=0):
+    """A scaler fit on the training rows, the same scaler after partial_fit on shifted new rows, and the rows."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(0, 1, (400, 6)) * [1, 2, 5, 0.5, 10, 1] + [0, 1, -3, 2, 50, 0]
+    y = (X[:, 0] + 0.1 * X[:, 4] + rng.normal(0, 1, 400) > 5).astype(int)
+    new_rows = rng.normal(1, 3, (150, 6)) + X.mean(axis=0)
+    old = StandardScaler().fit(X)
+    new = copy.deepcopy(old).partial_fit(new_rows)
+    return old, new, X, y
+
+
+def test_rescaled_model_predicts_the_same():
+    old, new, X, y = scalers_and_data()
+    model = LogisticRegression(max_iter=1000).fit(old.transform(X), y)
+    before = model.predict_proba(old.transform(X))
+    rescale_coefficients(model, old.mean_, old.scale_, new.mean_, new.scale_)
+    np.testing.assert_allclose(model.predict_proba(new.transform(X)), before, rtol=0, atol=1e-10)
+
+
+def test_rescaled_bootstrap_matches_each_replicate():
+    old, new, X, y = scalers_and_data(1)
+    rng = np.random.default_rng(1)
+    boot = {"coef": rng.normal(0, 1, (8, X.shape[1], 5)), "intercept": rng.normal(0, 1, (8, 5))}
+    coef, intercept = rescale_bootstrap(boot, old.mean_, old.scale_, new.mean_, new.scale_)
+    before = np.einsum("nf,rfd->rnd", old.transform(X), boot["coef"]) + boot["intercept"][:, np.newaxis, :]
+    after = np.einsum("nf,rfd->rnd", new.transform(X), coef) + intercept[:, np.newaxis, :]
+    np.testing.assert_allclose(after, before, rtol=0, atol=1e-9)
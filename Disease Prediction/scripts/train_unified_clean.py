@@ -1,20 +1,174 @@
+import argparse
+import json
+import pickle
+import time
+from datetime import datetime
+from pathlib import Path
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
+from sklearn.base import clone
 from sklearn.linear_model import LogisticRegression
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier
+from sklearn.multioutput import MultiOutputClassifier
 from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+from successive_halving import successive_halving
+from encoding import encode_dense, encode_sparse, encode_label, matrix_nbytes
+from artifact_store import stage_version, publish_version
 import warnings
 warnings.filterwarnings('ignore')
 
+MODEL_NAMES = ['LogisticRegression', 'RandomForest', 'GradientBoosting', 'HistGradientBoosting']
+
+# Artifact file suffix for each servable model family: {disease}_{suffix}.pkl
+ARTIFACT_KINDS = {'LogisticRegression': 'logistic', 'HistGradientBoosting': 'hist_gb'}
+
+parser = argparse.ArgumentParser(description="Train disease models on the clean unified feature matrix")
+parser.add_argument("--data", default="DAP_Feature_Matrix_Unified_CLEAN.csv",
+                    help="Path to the unified feature matrix CSV")
+parser.add_argument("--encoding", choices=["dense", "sparse", "label", "both"], default="dense",
+                    help="dense: pd.get_dummies DataFrame | sparse: CSR one-hot matrix | "
+                         "label: LabelEncoder codes (the layout the APIs serve) | both: train dense and sparse and compare")
+parser.add_argument("--shared-split", action="store_true",
+                    help="Split and scale once for all five diseases instead of once per disease")
+parser.add_argument("--multi-output", action="store_true",
+                    help="Fit all five targets in one multi-output pass per model (implies --shared-split)")
+parser.add_argument("--models", nargs="+", choices=MODEL_NAMES, default=MODEL_NAMES[:3],
+                    help="Model families to train (HistGradientBoosting is opt-in)")
+parser.add_argument("--search", action="store_true",
+                    help="Tune each disease/model with warm-started successive halving before the final fit")
+parser.add_argument("--search-checkpoint", default="search_checkpoint.pkl",
+                    help="Checkpoint file that lets an interrupted --search resume")
+parser.add_argument("--search-candidates", type=int, default=None,
+                    help="Randomly sample at most this many grid points per model")
+parser.add_argument("--search-jobs", type=int, default=-1,
+                    help="Parallel workers per successive-halving rung")
+parser.add_argument("--save-dir", default=None,
+                    help="Publish a versioned five-disease serving artifact set under this directory")
+parser.add_argument("--version", default=datetime.now().strftime("%Y%m%d-%H%M%S"),
+                    help="Version name for --save-dir (default: timestamp)")
+parser.add_argument("--bootstrap", type=int, default=0,
+                    help="With --save-dir: also store this many bootstrap refits of each logistic model "
+                         "(used by the APIs for bootstrap intervals)")
+args = parser.parse_args()
+
+if args.multi_output or args.save_dir:
+    # The served artifact set has a single scaler for all five diseases
+    args.shared_split = True
+if args.save_dir and args.encoding != 'label':
+    parser.error("--save-dir requires --encoding label (the APIs label-encode their inputs)")
+if args.search and args.multi_output:
+    parser.error("--search tunes each disease separately and cannot be combined with --multi-output")
+if args.save_dir and 'LogisticRegression' not in args.models:
+    parser.error("--save-dir requires LogisticRegression in --models (the default served model)")
+if args.bootstrap and not args.save_dir:
+    parser.error("--bootstrap requires --save-dir")
+
+
+def joint_stratify_key(Y, min_count=5):
+    """
+    Stratification key for a single split shared by all diseases: the joint
+    0/1 pattern across the five targets, with rare patterns pooled together.
+    """
+    key = Y.astype(int).astype(str).agg(''.join, axis=1)
+    counts = key.map(key.value_counts())
+    key = key.where(counts >= min_count, 'rare')
+    if (key == 'rare').sum() == 1:
+        key[key == 'rare'] = key.value_counts().idxmax()
+    return key
+
+
+def hist_categorical_mask(columns, encoders, max_bins=255):
+    """
+    Boolean mask of the label-encoded columns HistGradientBoosting should treat
+    as native categoricals (it only supports up to max_bins levels per feature).
+    """
+    return [col in encoders and len(encoders[col].classes_) <= max_bins for col in columns]
+
+
+def make_models(categorical_mask=None):
+    """One estimator per selected model family, fit separately for each disease."""
+    models = {
+        'LogisticRegression': LogisticRegression(max_iter=1000, class_weight='balanced', random_state=42),
+        'RandomForest': RandomForestClassifier(n_estimators=100, max_depth=15, class_weight='balanced', random_state=42, n_jobs=-1),
+        'GradientBoosting': GradientBoostingClassifier(n_estimators=100, max_depth=5, random_state=42),
+        # Binned histogram boosting on label codes; stops once the held-out loss stalls
+        'HistGradientBoosting': HistGradientBoostingClassifier(
+            max_iter=500, learning_rate=0.1, categorical_features=categorical_mask,
+            early_stopping=True, validation_fraction=0.1, n_iter_no_change=10,
+            class_weight='balanced', random_state=42
+        ),
+    }
+    return {name: models[name] for name in args.models}
+
+
+def make_multi_output_models(categorical_mask=None):
+    """
+    One estimator per model family covering all five targets.
+    RandomForest handles a 2-D target natively (one forest); the others are
+    wrapped in MultiOutputClassifier, which fits the per-disease copies in parallel.
+    """
+    return {
+        name: model if name == 'RandomForest' else MultiOutputClassifier(model, n_jobs=-1)
+        for name, model in make_models(categorical_mask).items()
+    }
+
+
+def single_row_latency_ms(model, X_eval, repeats=50):
+    """Mean predict_proba latency for one row, i.e. what an API request pays per disease."""
+    row = X_eval[:1]
+    start = time.perf_counter()
+    for _ in range(repeats):
+        model.predict_proba(row)
+    return (time.perf_counter() - start) / repeats * 1000
+
+
+def fit_bootstrap_replicates(models, X, Y, n_replicates, random_state=42):
+    """
+    Refit each disease's logistic model on n_replicates bootstrap resamples of the training
+    rows, warm-started from the full fit. All diseases share each replicate's resample.
+    Returns coefficients (replicates x features x diseases) and intercepts (replicates x diseases).
+    """
+    rng = np.random.RandomState(random_state)
+    coef = np.empty((n_replicates, X.shape[1], len(diseases)), dtype=np.float32)
+    intercept = np.empty((n_replicates, len(diseases)), dtype=np.float32)
+    for r in range(n_replicates):
+        rows = rng.randint(0, X.shape[0], X.shape[0])
+        for j, disease in enumerate(diseases):
+            replicate = clone(models[disease]).set_params(warm_start=True)
+            replicate.coef_ = models[disease].coef_.copy()
+            replicate.intercept_ = models[disease].intercept_.copy()
+            replicate.fit(X[rows], Y[f'target_{disease}'].to_numpy()[rows])
+            coef[r, :, j] = replicate.coef_[0]
+            intercept[r, j] = replicate.intercept_[0]
+    return coef, intercept
+
+
+def evaluate(y_test, y_pred, y_pred_proba):
+    """Compute and print the standard metric set for one disease/model."""
+    metrics = {
+        'Accuracy': accuracy_score(y_test, y_pred),
+        'Precision': precision_score(y_test, y_pred, zero_division=0),
+        'Recall': recall_score(y_test, y_pred, zero_division=0),
+        'F1': f1_score(y_test, y_pred, zero_division=0),
+        'AUC': roc_auc_score(y_test, y_pred_proba),
+    }
+    print(f"     Accuracy:  {metrics['Accuracy']:.4f}")
+    print(f"     Precision: {metrics['Precision']:.4f}")
+    print(f"     Recall:    {metrics['Recall']:.4f}")
+    print(f"     F1-Score:  {metrics['F1']:.4f}")
+    print(f"     AUC:       {metrics['AUC']:.4f}")
+    return metrics
+
+
 print("=" * 100)
 print("TRAINING MODELS ON CLEAN UNIFIED MATRIX (NO DATA LEAKAGE)")
 print("=" * 100)
 
 # Load clean unified matrix
 print("\n📁 Loading clean unified feature matrix...")
-df = pd.read_csv("DAP_Feature_Matrix_Unified_CLEAN.csv")
+df = pd.read_csv(args.data)
 
 print(f"✅ Loaded: {df.shape[0]:,} dogs × {df.shape[1]} columns")
 print(f"   Features: {df.shape[1] - 6} (dog_id + 5 targets removed)")
@@ -22,110 +176,316 @@ print(f"   Features: {df.shape[1] - 6} (dog_id + 5 targets removed)")
 # Prepare data
 diseases = ['orthopedic', 'dermatological', 'cardiac', 'ear', 'urinary']
 target_cols = [f'target_{disease}' for disease in diseases]
+Y = df[target_cols]
 
 # Drop dog_id and get features
 X_raw = df.drop(['dog_id'] + target_cols, axis=1)
 
-# Encode categorical variables
-X = pd.get_dummies(X_raw, drop_first=True)
-
-print(f"   Final feature count after encoding: {X.shape[1]}")
+encodings = ['dense', 'sparse'] if args.encoding == 'both' else [args.encoding]
+mode = 'multi-output' if args.multi_output else ('shared' if args.shared_split else 'per-disease')
+print(f"   Training mode: {mode}")
 
 # Store results
 all_results = []
+encoding_stats = {}
+fitted_models = {kind: {} for kind in ARTIFACT_KINDS.values()}     # kind -> disease -> estimator (for --save-dir)
+artifact_metrics = {kind: [] for kind in ARTIFACT_KINDS.values()}  # kind -> rows for model_metrics csv
+search_history = []    # every candidate score per rung (for --search)
+search_best = {}       # disease -> model -> tuned params (for --search)
 
-# Train models for each disease
-for disease in diseases:
-    print(f"\n{'='*100}")
-    print(f"DISEASE: {disease.upper()}")
-    print(f"{'='*100}")
-    
-    y = df[f'target_{disease}']
-    
-    # Check class distribution
-    pos_count = y.sum()
-    neg_count = len(y) - pos_count
-    print(f"  Class distribution: {pos_count:,} positive / {neg_count:,} negative ({pos_count/len(y)*100:.1f}% / {neg_count/len(y)*100:.1f}%)")
-    
-    # Split data
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
-    )
-    
-    print(f"  Train: {len(X_train):,} | Test: {len(X_test):,}")
-    
-    # Define models
-    models = {
-        'LogisticRegression': LogisticRegression(max_iter=1000, class_weight='balanced', random_state=42),
-        'RandomForest': RandomForestClassifier(n_estimators=100, max_depth=15, class_weight='balanced', random_state=42, n_jobs=-1),
-        'GradientBoosting': GradientBoostingClassifier(n_estimators=100, max_depth=5, random_state=42)
+# HistGradientBoosting always trains on label codes so it can split categoricals natively,
+# whatever encoding the other models use (the split rows are identical across encodings)
+X_hist, categorical_mask = None, None
+if 'HistGradientBoosting' in args.models:
+    X_hist, hist_encoders = encode_label(X_raw)
+    categorical_mask = hist_categorical_mask(X_hist.columns, hist_encoders)
+    print(f"   HistGradientBoosting: {sum(categorical_mask)} native categorical features")
+
+for encoding in encodings:
+    # Encode categorical variables
+    start = time.perf_counter()
+    encoders = {}
+    if encoding == 'sparse':
+        X, _ = encode_sparse(X_raw)
+    elif encoding == 'label':
+        X, encoders = encode_label(X_raw)
+    else:
+        X = encode_dense(X_raw)
+    encode_time = time.perf_counter() - start
+
+    # Dense float64 copy is what StandardScaler / sklearn would allocate from get_dummies output
+    encoding_stats[encoding] = {
+        'memory_mb': matrix_nbytes(X) / 1e6,
+        'float64_mb': X.shape[0] * X.shape[1] * 8 / 1e6 if encoding == 'dense' else matrix_nbytes(X) / 1e6,
+        'encode_time': encode_time,
     }
-    
-    for model_name, model in models.items():
-        print(f"\n  🔄 Training {model_name}...")
-        
-        # Scale for LogisticRegression
-        if model_name == 'LogisticRegression':
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_test_scaled = scaler.transform(X_test)
-            model.fit(X_train_scaled, y_train)
-            y_pred = model.predict(X_test_scaled)
-            y_pred_proba = model.predict_proba(X_test_scaled)[:, 1]
+
+    print(f"\n   [{encoding}] Final feature count after encoding: {X.shape[1]}")
+    print(f"   [{encoding}] Encoded matrix: {encoding_stats[encoding]['memory_mb']:.1f} MB "
+          f"(float64 working copy: {encoding_stats[encoding]['float64_mb']:.1f} MB), "
+          f"encoded in {encode_time:.2f}s")
+
+    # Centering would densify a sparse matrix, so the sparse path only rescales
+    with_mean = encoding != 'sparse'
+
+    if args.shared_split:
+        # One split and one scaler for every disease
+        X_train, X_test, Y_train, Y_test = train_test_split(
+            X, Y, test_size=0.2, random_state=42, stratify=joint_stratify_key(Y)
+        )
+        if X_hist is not None:
+            Xh_train, Xh_test = X_hist.loc[Y_train.index], X_hist.loc[Y_test.index]
+        start = time.perf_counter()
+        scaler = StandardScaler(with_mean=with_mean)
+        X_train_scaled = scaler.fit_transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+        shared_scale_time = time.perf_counter() - start
+        print(f"   Shared split — Train: {X_train.shape[0]:,} | Test: {X_test.shape[0]:,} "
+              f"(scaled once in {shared_scale_time:.2f}s)")
+
+    if args.multi_output:
+        print(f"\n{'='*100}")
+        print(f"ALL DISEASES (multi-output) [{encoding}]")
+        print(f"{'='*100}")
+
+        for model_name, model in make_multi_output_models(categorical_mask).items():
+            print(f"\n  🔄 Training {model_name} on {len(diseases)} targets...")
+
+            if model_name == 'LogisticRegression':
+                X_fit, X_eval = X_train_scaled, X_test_scaled
+            elif model_name == 'HistGradientBoosting':
+                X_fit, X_eval = Xh_train, Xh_test
+            else:
+                X_fit, X_eval = X_train, X_test
+            start = time.perf_counter()
+            model.fit(X_fit, Y_train)
+            fit_time = time.perf_counter() - start
+            print(f"     Fit time:  {fit_time:.2f}s")
+
+            Y_pred = np.asarray(model.predict(X_eval))
+            Y_proba = model.predict_proba(X_eval)  # list with one (n, 2) array per target
+            predict_ms = single_row_latency_ms(model, X_eval) / len(diseases)
+
+            for i, disease in enumerate(diseases):
+                print(f"\n   • {disease.upper()}")
+                metrics = evaluate(Y_test.iloc[:, i], Y_pred[:, i], Y_proba[i][:, 1])
+                all_results.append({
+                    'Disease': disease.capitalize(),
+                    'Model': model_name,
+                    'Encoding': encoding,
+                    'Mode': mode,
+                    **metrics,
+                    # Joint fit/predict time split evenly so totals stay comparable across modes
+                    'Fit_Time_s': fit_time / len(diseases),
+                    'Predict_ms': predict_ms
+                })
+                if model_name in ARTIFACT_KINDS:
+                    kind = ARTIFACT_KINDS[model_name]
+                    fitted_models[kind][disease] = model.estimators_[i]
+                    artifact_metrics[kind].append((disease, model.estimators_[i], X_fit, Y_train.iloc[:, i], Y_test.iloc[:, i], metrics))
+        continue
+
+    # Train models for each disease
+    for disease in diseases:
+        print(f"\n{'='*100}")
+        print(f"DISEASE: {disease.upper()} [{encoding}]")
+        print(f"{'='*100}")
+
+        y = df[f'target_{disease}']
+
+        # Check class distribution
+        pos_count = y.sum()
+        neg_count = len(y) - pos_count
+        print(f"  Class distribution: {pos_count:,} positive / {neg_count:,} negative ({pos_count/len(y)*100:.1f}% / {neg_count/len(y)*100:.1f}%)")
+
+        if args.shared_split:
+            y_train, y_test = Y_train[f'target_{disease}'], Y_test[f'target_{disease}']
         else:
-            model.fit(X_train, y_train)
-            y_pred = model.predict(X_test)
-            y_pred_proba = model.predict_proba(X_test)[:, 1]
-        
-        # Calculate metrics
-        accuracy = accuracy_score(y_test, y_pred)
-        precision = precision_score(y_test, y_pred, zero_division=0)
-        recall = recall_score(y_test, y_pred, zero_division=0)
-        f1 = f1_score(y_test, y_pred, zero_division=0)
-        auc = roc_auc_score(y_test, y_pred_proba)
-        
-        print(f"     Accuracy:  {accuracy:.4f}")
-        print(f"     Precision: {precision:.4f}")
-        print(f"     Recall:    {recall:.4f}")
-        print(f"     F1-Score:  {f1:.4f}")
-        print(f"     AUC:       {auc:.4f}")
-        
-        # Store results
-        all_results.append({
-            'Disease': disease.capitalize(),
-            'Model': model_name,
-            'Accuracy': accuracy,
-            'Precision': precision,
-            'Recall': recall,
-            'F1': f1,
-            'AUC': auc
-        })
+            # Split data
+            X_train, X_test, y_train, y_test = train_test_split(
+                X, y, test_size=0.2, random_state=42, stratify=y
+            )
+            if X_hist is not None:
+                Xh_train, Xh_test = X_hist.loc[y_train.index], X_hist.loc[y_test.index]
+            # Scale for LogisticRegression
+            if 'LogisticRegression' in args.models:
+                scaler = StandardScaler(with_mean=with_mean)
+                X_train_scaled = scaler.fit_transform(X_train)
+                X_test_scaled = scaler.transform(X_test)
+
+        print(f"  Train: {X_train.shape[0]:,} | Test: {X_test.shape[0]:,}")
+
+        for model_name, model in make_models(categorical_mask).items():
+            print(f"\n  🔄 Training {model_name}...")
+
+            if model_name == 'LogisticRegression':
+                X_fit, X_eval = X_train_scaled, X_test_scaled
+            elif model_name == 'HistGradientBoosting':
+                X_fit, X_eval = Xh_train, Xh_test
+            else:
+                # RandomForest and GradientBoosting accept CSR input directly
+                X_fit, X_eval = X_train, X_test
+
+            if args.search:
+                start = time.perf_counter()
+                best_params, history = successive_halving(
+                    model_name, model, X_fit, y_train,
+                    checkpoint_path=args.search_checkpoint,
+                    key=f"{encoding}/{disease}/{model_name}",
+                    max_candidates=args.search_candidates,
+                    n_jobs=args.search_jobs,
+                )
+                model.set_params(**best_params)
+                search_best.setdefault(disease, {})[model_name] = best_params
+                search_history += [
+                    {'Disease': disease.capitalize(), 'Model': model_name, 'Encoding': encoding, **row}
+                    for row in history
+                ]
+                print(f"     Search:    {best_params} ({time.perf_counter() - start:.2f}s)")
+
+            start = time.perf_counter()
+            model.fit(X_fit, y_train)
+            fit_time = time.perf_counter() - start
+            y_pred = model.predict(X_eval)
+            y_pred_proba = model.predict_proba(X_eval)[:, 1]
+
+            metrics = evaluate(y_test, y_pred, y_pred_proba)
+            predict_ms = single_row_latency_ms(model, X_eval)
+            print(f"     Fit time:  {fit_time:.2f}s")
+            print(f"     Predict:   {predict_ms:.2f}ms / row")
+
+            # Store results
+            all_results.append({
+                'Disease': disease.capitalize(),
+                'Model': model_name,
+                'Encoding': encoding,
+                'Mode': mode,
+                **metrics,
+                'Fit_Time_s': fit_time,
+                'Predict_ms': predict_ms
+            })
+            if model_name in ARTIFACT_KINDS:
+                kind = ARTIFACT_KINDS[model_name]
+                fitted_models[kind][disease] = model
+                artifact_metrics[kind].append((disease, model, X_fit, y_train, y_test, metrics))
 
 # Save results
 results_df = pd.DataFrame(all_results)
 output_path = "unified_clean_model_performance.csv"
 results_df.to_csv(output_path, index=False)
+if args.search:
+    pd.DataFrame(search_history).to_csv("hyperparameter_search_results.csv", index=False)
+
+if args.save_dir:
+    # Versioned set: <save-dir>/<version>/ with the file names the APIs load, a manifest
+    # (roles, hashes, metrics) and <save-dir>/CURRENT pointing at the newest version
+    try:
+        staging_dir = stage_version(args.save_dir, args.version)
+    except FileExistsError as e:
+        parser.error(str(e))
+    for kind, models_by_disease in fitted_models.items():
+        for disease, model in models_by_disease.items():
+            with open(staging_dir / f"{disease}_{kind}.pkl", 'wb') as f:
+                pickle.dump(model, f)
+    with open(staging_dir / "feature_scaler.pkl", 'wb') as f:
+        pickle.dump(scaler, f)
+    with open(staging_dir / "features_list.pkl", 'wb') as f:
+        pickle.dump(list(X_raw.columns), f)
+    with open(staging_dir / "label_encoders.pkl", 'wb') as f:
+        pickle.dump(encoders, f)
+    if args.search:
+        with open(staging_dir / "best_params.json", 'w') as f:
+            json.dump(search_best, f, indent=2, default=str)
+    if args.bootstrap:
+        start = time.perf_counter()
+        boot_coef, boot_intercept = fit_bootstrap_replicates(
+            fitted_models['logistic'], X_train_scaled, Y_train, args.bootstrap
+        )
+        np.savez_compressed(staging_dir / "bootstrap_coefficients.npz",
+                            coef=boot_coef, intercept=boot_intercept, diseases=np.array(diseases))
+        print(f"\n🎲 {args.bootstrap} bootstrap replicates per disease fitted in {time.perf_counter() - start:.2f}s "
+              f"({boot_coef.nbytes / 1e3:.0f} KB coefficient tensor)")
+
+    manifest_metrics = {}
+    for kind, rows in artifact_metrics.items():
+        if not rows:
+            continue
+        metrics_df = pd.DataFrame([{
+            'disease': disease,
+            'train_accuracy': accuracy_score(y_tr, model.predict(X_tr)),
+            'test_accuracy': metrics['Accuracy'],
+            'precision': metrics['Precision'],
+            'recall': metrics['Recall'],
+            'f1_score': metrics['F1'],
+            'auc_roc': metrics['AUC'],
+            'positive_test_samples': int(y_te.sum()),
+            'total_test_samples': len(y_te),
+        } for disease, model, X_tr, y_tr, y_te, metrics in rows])
+        metrics_file = "model_metrics.csv" if kind == 'logistic' else f"model_metrics_{kind}.csv"
+        metrics_df.to_csv(staging_dir / metrics_file, index=False)
+        manifest_metrics[kind] = json.loads(metrics_df.set_index('disease').to_json(orient='index'))
+
+    manifest = publish_version(args.save_dir, args.version, staging_dir, {
+        'family': '67feat',
+        'roles': {
+            'models': {kind: f"{{disease}}_{kind}.pkl" for kind, models_by_disease in fitted_models.items() if models_by_disease},
+            'scaler': "feature_scaler.pkl",
+            'features': "features_list.pkl",
+            'encoders': "label_encoders.pkl",
+            'metrics': "model_metrics.csv",
+            **({'bootstrap': "bootstrap_coefficients.npz"} if args.bootstrap else {}),
+        },
+        'features': list(X_raw.columns),
+        'metrics': manifest_metrics,
+        'training': {
+            'data': str(args.data),
+            'rows': int(df.shape[0]),
+            'encoding': args.encoding,
+            'mode': mode,
+            'models': args.models,
+            'search': args.search,
+            'bootstrap_replicates': args.bootstrap,
+        },
+    })
+    print(f"\n📦 Serving artifacts version {args.version} published to: {Path(args.save_dir) / args.version} "
+          f"(content hash {manifest['content_hash'][:12]})")
 
 print(f"\n{'='*100}")
 print("SUMMARY - HONEST MODEL PERFORMANCE (NO DATA LEAKAGE)")
 print(f"{'='*100}\n")
 
 # Display summary by disease (best model per disease)
-print(f"{'Disease':<20} {'Best Model':<20} {'AUC':<10} {'Precision':<12} {'Recall':<10}")
+print(f"{'Disease':<20} {'Best Model':<20} {'Encoding':<10} {'AUC':<10} {'Precision':<12} {'Recall':<10}")
 print("-" * 100)
 
 for disease in diseases:
     disease_results = results_df[results_df['Disease'] == disease.capitalize()]
     best_idx = disease_results['AUC'].idxmax()
     best = disease_results.loc[best_idx]
-    print(f"{best['Disease']:<20} {best['Model']:<20} {best['AUC']:<10.4f} {best['Precision']:<12.4f} {best['Recall']:<10.4f}")
+    print(f"{best['Disease']:<20} {best['Model']:<20} {best['Encoding']:<10} {best['AUC']:<10.4f} {best['Precision']:<12.4f} {best['Recall']:<10.4f}")
 
 # Calculate average
-avg_auc = results_df.groupby('Model')['AUC'].mean()
+avg_auc = results_df.groupby(['Encoding', 'Model'])['AUC'].mean()
+total_fit = results_df.groupby(['Encoding', 'Model'])['Fit_Time_s'].sum()
 print("\n" + "-" * 100)
-print("AVERAGE AUC BY MODEL:")
-for model_name in ['LogisticRegression', 'RandomForest', 'GradientBoosting']:
-    print(f"  {model_name:<20} {avg_auc[model_name]:.4f}")
+avg_latency = results_df.groupby(['Encoding', 'Model'])['Predict_ms'].mean()
+print(f"AVERAGE AUC / TOTAL FIT TIME / SINGLE-ROW PREDICT BY MODEL ({mode}):")
+for encoding in encodings:
+    for model_name in args.models:
+        print(f"  [{encoding:<6}] {model_name:<20} {avg_auc[(encoding, model_name)]:.4f}   "
+              f"{total_fit[(encoding, model_name)]:.2f}s   {avg_latency[(encoding, model_name)]:.2f}ms")
+
+if len(encodings) > 1:
+    dense, sparse_ = encoding_stats['dense'], encoding_stats['sparse']
+    print("\n" + "-" * 100)
+    print("DENSE vs SPARSE ENCODING:")
+    print(f"  {'Encoded matrix:':<26}{dense['memory_mb']:.1f} MB vs {sparse_['memory_mb']:.1f} MB")
+    print(f"  {'float64 copy:':<26}{dense['float64_mb']:.1f} MB vs {sparse_['float64_mb']:.1f} MB "
+          f"({dense['float64_mb'] / max(sparse_['float64_mb'], 1e-9):.1f}x smaller)")
+    print(f"  {'Encode time:':<26}{dense['encode_time']:.2f}s vs {sparse_['encode_time']:.2f}s")
+    for model_name in args.models:
+        print(f"  {model_name + ' fit:':<26}{total_fit[('dense', model_name)]:.2f}s vs "
+              f"{total_fit[('sparse', model_name)]:.2f}s")
 
 print(f"\n💾 Results saved to: {output_path}")
 print(f"\n{'='*100}")
@@ -0,0 +1,208 @@
+"""
+Fold newly labeled outcomes into the served disease models without retraining.
+
+Loads the CURRENT artifact set written by train_unified_clean.py --save-dir,
+updates the StandardScaler with the new rows (running mean/variance), re-expresses
+each disease's logistic coefficients in the updated scaling so predictions are
+unchanged before learning, then runs SGD partial_fit (log loss) on the new rows
+only and publishes the result as a new version. The first update converts the
+LogisticRegression models to equivalent SGDClassifier models. Bootstrap replicates
+(--bootstrap at training time) are re-expressed in the new scaling and shifted by
+each model's update, so the interval keeps its width and follows the point estimate.
+
+Work is proportional to the new rows: the full feature matrix is never reloaded.
+"""
+import argparse
+import pickle
+import shutil
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+from artifact_store import current_version_dir, read_manifest, stage_version, publish_version
+from rescaling import rescale_coefficients, rescale_bootstrap
+import warnings
+warnings.filterwarnings('ignore')
+
+parser = argparse.ArgumentParser(description="Incrementally update the served disease models with new labeled rows")
+parser.add_argument("--data", required=True,
+                    help="CSV of new rows in the unified feature matrix format (features + target_* columns)")
+parser.add_argument("--save-dir", required=True,
+                    help="Versioned artifact directory written by train_unified_clean.py --save-dir")
+parser.add_argument("--version", default=datetime.now().strftime("%Y%m%d-%H%M%S"),
+                    help="Name of the published version (default: timestamp)")
+parser.add_argument("--learning-rate", type=float, default=0.001,
+                    help="Constant SGD step size (eta0)")
+parser.add_argument("--epochs", type=int, default=1,
+                    help="Passes over the new rows")
+parser.add_argument("--eval-data", default=None,
+                    help="Labeled hold-out CSV to re-measure metrics on; otherwise the previous metrics are kept")
+args = parser.parse_args()
+
+diseases = ['orthopedic', 'dermatological', 'cardiac', 'ear', 'urinary']
+target_cols = [f'target_{disease}' for disease in diseases]
+
+
+def encode_rows(df, features, encoders):
+    """Apply the saved encoders the way the APIs do: unseen categories and bad numbers become 0."""
+    X = pd.DataFrame(index=df.index)
+    for col in features:
+        if col in encoders:
+            codes = {value: float(code) for code, value in enumerate(encoders[col].classes_)}
+            X[col] = df[col].astype(str).str.strip().map(codes).fillna(0.0)
+        else:
+            X[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0)
+    return X.astype(float).to_numpy()
+
+
+def to_sgd(model, n_seen):
+    """SGDClassifier (log loss) with the same coefficients and an equivalent L2 penalty."""
+    if isinstance(model, SGDClassifier):
+        return model
+    if not isinstance(model, LogisticRegression):
+        raise TypeError(f"Cannot update {type(model).__name__} incrementally")
+    sgd = SGDClassifier(loss='log_loss', penalty='l2', alpha=1.0 / (model.C * n_seen),
+                        learning_rate='constant', eta0=args.learning_rate, random_state=42)
+    sgd.coef_ = model.coef_.copy()
+    sgd.intercept_ = model.intercept_.copy()
+    return sgd
+
+
+def balanced_weights(y, class_counts):
+    """Per-row weights matching class_weight='balanced' over every row seen so far."""
+    counts = np.asarray(class_counts, dtype=float)
+    weights = counts.sum() / (2 * np.maximum(counts, 1))
+    return weights[y]
+
+
+print(f"{'='*100}")
+print("INCREMENTAL UPDATE OF SERVED DISEASE MODELS")
+print(f"{'='*100}\n")
+
+base_version, base_dir = current_version_dir(args.save_dir)
+manifest = read_manifest(base_dir)
+with open(base_dir / manifest['roles']['features'], 'rb') as f:
+    features = pickle.load(f)
+with open(base_dir / manifest['roles']['encoders'], 'rb') as f:
+    encoders = pickle.load(f)
+with open(base_dir / manifest['roles']['scaler'], 'rb') as f:
+    scaler = pickle.load(f)
+model_template = manifest['roles']['models']['logistic']
+models = {}
+for disease in diseases:
+    with open(base_dir / model_template.format(disease=disease), 'rb') as f:
+        models[disease] = pickle.load(f)
+print(f"📦 Base version: {base_version} ({int(scaler.n_samples_seen_):,} rows seen)")
+
+df = pd.read_csv(args.data)
+X = encode_rows(df, features, encoders)
+Y = df[target_cols].astype(int).to_numpy()
+print(f"📁 New labeled rows: {len(df):,}")
+
+# Class counts behind the balanced weights; first update estimates them from the test prevalence
+training = manifest.get('training', {})
+n_seen = int(scaler.n_samples_seen_)
+class_counts = training.get('class_counts') or {
+    disease: [n_seen - round(n_seen * m['positive_test_samples'] / m['total_test_samples']),
+              round(n_seen * m['positive_test_samples'] / m['total_test_samples'])]
+    for disease, m in manifest['metrics']['logistic'].items()
+}
+
+# Running StandardScaler: fold the new rows into mean/variance, then keep the models equivalent
+mean_old, scale_old = scaler.mean_.copy(), scaler.scale_.copy()
+scaler.partial_fit(X)
+X_scaled = scaler.transform(X)
+
+boot_file = manifest['roles'].get('bootstrap')
+if boot_file:
+    with np.load(base_dir / boot_file) as boot:
+        boot = {k: boot[k] for k in boot.files}
+    boot_coef, boot_intercept = rescale_bootstrap(boot, mean_old, scale_old, scaler.mean_, scaler.scale_)
+    boot_order = [list(boot['diseases']).index(d) for d in diseases]
+
+batch_auc = {}
+for i, disease in enumerate(diseases):
+    model = to_sgd(models[disease], n_seen)
+    rescale_coefficients(model, mean_old, scale_old, scaler.mean_, scaler.scale_)
+    coef_before, intercept_before = model.coef_[0].copy(), model.intercept_[0]
+    model.set_params(eta0=args.learning_rate)
+    y = Y[:, i]
+
+    # Progressive validation: score the new rows before learning from them
+    if 0 < y.sum() < len(y):
+        batch_auc[disease] = roc_auc_score(y, model.decision_function(X_scaled))
+
+    class_counts[disease][0] += int((y == 0).sum())
+    class_counts[disease][1] += int(y.sum())
+    for _ in range(args.epochs):
+        model.partial_fit(X_scaled, y, classes=np.array([0, 1]),
+                          sample_weight=balanced_weights(y, class_counts[disease]))
+    models[disease] = model
+    if boot_file:
+        boot_coef[:, :, boot_order[i]] += model.coef_[0] - coef_before
+        boot_intercept[:, boot_order[i]] += model.intercept_[0] - intercept_before
+    auc_note = f"{batch_auc[disease]:.4f}" if disease in batch_auc else "n/a (one class)"
+    print(f"  🔄 {disease:<16} updated on {len(y):,} rows ({int(y.sum())} positive), pre-update AUC {auc_note}")
+
+metrics = manifest['metrics']
+if args.eval_data:
+    eval_df = pd.read_csv(args.eval_data)
+    X_eval = scaler.transform(encode_rows(eval_df, features, encoders))
+    rows = []
+    for i, disease in enumerate(diseases):
+        y_eval = eval_df[target_cols[i]].astype(int).to_numpy()
+        y_pred = models[disease].predict(X_eval)
+        rows.append({
+            'disease': disease,
+            'train_accuracy': np.nan,
+            'test_accuracy': accuracy_score(y_eval, y_pred),
+            'precision': precision_score(y_eval, y_pred, zero_division=0),
+            'recall': recall_score(y_eval, y_pred, zero_division=0),
+            'f1_score': f1_score(y_eval, y_pred, zero_division=0),
+            'auc_roc': roc_auc_score(y_eval, models[disease].predict_proba(X_eval)[:, 1]),
+            'positive_test_samples': int(y_eval.sum()),
+            'total_test_samples': len(y_eval),
+        })
+    metrics_df = pd.DataFrame(rows)
+    metrics = {**metrics, 'logistic': metrics_df.set_index('disease').to_dict(orient='index')}
+    print(f"\n📊 Re-measured on {len(eval_df):,} hold-out rows: mean AUC {metrics_df['auc_roc'].mean():.4f}")
+
+# Stage the new version: updated models + scaler, every other file carried over unchanged
+staging_dir = stage_version(args.save_dir, args.version)
+updated = {model_template.format(disease=d) for d in diseases} | {manifest['roles']['scaler']}
+if boot_file:
+    updated.add(boot_file)
+for name in manifest['files']:
+    if name not in updated:
+        shutil.copy2(base_dir / name, staging_dir / name)
+for disease, model in models.items():
+    with open(staging_dir / model_template.format(disease=disease), 'wb') as f:
+        pickle.dump(model, f)
+with open(staging_dir / manifest['roles']['scaler'], 'wb') as f:
+    pickle.dump(scaler, f)
+if boot_file:
+    np.savez_compressed(staging_dir / boot_file, coef=boot_coef.astype(np.float32),
+                        intercept=boot_intercept.astype(np.float32), diseases=boot['diseases'])
+if args.eval_data:
+    metrics_df.to_csv(staging_dir / manifest['roles']['metrics'], index=False)
+
+published = publish_version(args.save_dir, args.version, staging_dir, {
+    'family': manifest['family'],
+    'roles': manifest['roles'],
+    'features': manifest.get('features', features),
+    'metrics': metrics,
+    'training': {
+        **training,
+        'incremental_from': base_version,
+        'rows': int(scaler.n_samples_seen_),
+        'update_rows': len(df),
+        'update_data': str(args.data),
+        'estimator': 'SGDClassifier(log_loss)',
+        'learning_rate': args.learning_rate,
+        'epochs': args.epochs,
+        'class_counts': class_counts,
+        'pre_update_auc': batch_auc,
+    },
+})
+print(f"\n📦 Version {args.version} published (from {base_version}, content hash {published['content_hash'][:12]})")
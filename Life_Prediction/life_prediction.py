@@ -1,14 +1,22 @@
+import os
+from pathlib import Path
+import numpy as np
 import pandas as pd
 import joblib
 import uvicorn
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from contextlib import asynccontextmanager
 
 # --- CONFIGURATION ---
-MODEL_PATH = r"D:\Code\DOG_project\dog_lifespan_app\joblib\dog_lifespan_model.joblib"
-COLUMNS_PATH = r"D:\Code\DOG_project\dog_lifespan_app\joblib\model_columns.joblib"
+# Artifacts default to the joblib/ folder next to this file; override the folder or each file via env
+MODEL_DIR = Path(os.getenv("LIFESPAN_MODEL_DIR", Path(__file__).resolve().parent / "joblib"))
+MODEL_PATH = Path(os.getenv("LIFESPAN_MODEL_PATH", MODEL_DIR / "dog_lifespan_model.joblib"))
+COLUMNS_PATH = Path(os.getenv("LIFESPAN_COLUMNS_PATH", MODEL_DIR / "model_columns.joblib"))
+
+# Largest number of dogs accepted by /lifespan/predict/batch
+MAX_BATCH_SIZE = int(os.getenv("LIFESPAN_MAX_BATCH_SIZE", "1000"))
 
 # Global dictionary to hold artifacts
 ml_models = {}
@@ -20,6 +28,7 @@ async def lifespan(app: FastAPI):
     try:
         ml_models["model"] = joblib.load(MODEL_PATH)
         ml_models["columns"] = joblib.load(COLUMNS_PATH)
+        ml_models["column_index"] = {col: i for i, col in enumerate(ml_models["columns"])}
         print("✅ Model and column definitions loaded successfully.")
     except Exception as e:
         print(f"❌ Error loading artifacts: {e}")
@@ -33,7 +42,7 @@ async def lifespan(app: FastAPI):
 app = FastAPI(
     title="Dog Lifespan Prediction API",
     description="API to predict remaining lifespan based on medical and lifestyle features.",
-    lifespan=lifespan  # Register the lifespan handler
+    lifespan=lifespan,  # Register the lifespan handler
 )
 
 # --- INPUT SCHEMA ---
@@ -57,34 +66,58 @@ class DogFeatures(BaseModel):
     lifestyle_02: Optional[str] = None
     lifestyle_03: Optional[str] = None
 
-# --- PREDICTION ENDPOINT ---
+# --- ENCODING ---
+def encode_dogs(dogs, model_cols, column_index):
+    """
+    One-hot encode dogs straight into the model's column layout, matching the old
+    get_dummies + reindex + fillna(0) pipeline: a text field sets its "<field>_<value>"
+    column to 1, a numeric (or bool) field fills its own column, and values without
+    a matching column (or None) stay 0.
+    """
+    # Handle Typo (from your training logic)
+    rename = {}
+    if 'mp_vacciNaNtion_status' in column_index:
+        rename['mp_vaccination_status'] = 'mp_vacciNaNtion_status'
+
+    # Per field: the rows that set a column, the column each sets, and the value
+    columns = pd.Index(model_cols)
+    values = [dog.model_dump() for dog in dogs]
+    rows, cols, vals = [], [], []
+    for field, info in DogFeatures.model_fields.items():
+        column = pd.Series([v[field] for v in values], dtype=object)
+        present = column.notna().to_numpy()
+        name = rename.get(field, field)
+        if str in (info.annotation, *getattr(info.annotation, "__args__", ())):
+            # Text field: "<field>_<value>" column set to 1; -1 where no such column
+            field_cols = columns.get_indexer(name + "_" + column[present].astype(str))
+            field_vals = np.ones(len(field_cols))
+        else:
+            col = column_index.get(name)
+            if col is None:
+                continue
+            field_vals = column[present].astype(float).to_numpy()
+            field_cols = np.full(len(field_vals), col)
+        found = field_cols >= 0
+        rows.append(np.flatnonzero(present)[found])
+        cols.append(field_cols[found])
+        vals.append(field_vals[found])
+
+    X = np.zeros((len(dogs), len(model_cols)))
+    X[np.concatenate(rows), np.concatenate(cols)] = np.concatenate(vals)
+    return pd.DataFrame(X, columns=model_cols)
+
+
+# --- PREDICTION ENDPOINTS ---
 @app.post("/lifespan/predict", summary="Predict Dog Remaining Lifespan")
 def predict_lifespan(dog: DogFeatures):
     if "model" not in ml_models or "columns" not in ml_models:
         raise HTTPException(status_code=500, detail="Model not loaded")
     
     try:
-        # A. Convert to DataFrame
-        input_data = dog.dict()
-        df = pd.DataFrame([input_data])
-
-        # B. Handle Typo (from your training logic)
-        model_cols = ml_models["columns"]
-        if 'mp_vaccination_status' in df.columns:
-             if 'mp_vacciNaNtion_status' in model_cols:
-                 df.rename(columns={'mp_vaccination_status': 'mp_vacciNaNtion_status'}, inplace=True)
+        # A. Encode into the model's column layout
+        df_final = encode_dogs([dog], ml_models["columns"], ml_models["column_index"])
 
-        # C. One-Hot Encoding
-        df_encoded = pd.get_dummies(df)
-
-        # D. ALIGNMENT: Force input to match model structure exactly
-        # This adds missing columns (with 0) and removes extra ones
-        df_final = df_encoded.reindex(columns=model_cols, fill_value=0)
-
-        # E. Cleanup
-        df_final = df_final.fillna(0)
-
-        # F. Predict
+        # B. Predict
         prediction = ml_models["model"].predict(df_final)
         
         return {
@@ -99,5 +132,34 @@ def predict_lifespan(dog: DogFeatures):
         traceback.print_exc() 
         raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
 
+
+@app.post("/lifespan/predict/batch", summary="Predict Remaining Lifespan for Many Dogs")
+def predict_lifespan_batch(dogs: List[DogFeatures]):
+    """Encodes every dog into one matrix and scores it with a single model.predict call."""
+    if "model" not in ml_models or "columns" not in ml_models:
+        raise HTTPException(status_code=500, detail="Model not loaded")
+    if len(dogs) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BATCH_SIZE} dogs per batch")
+    if not dogs:
+        return {"predictions": [], "unit": "years", "status": "success"}
+
+    try:
+        df_final = encode_dogs(dogs, ml_models["columns"], ml_models["column_index"])
+        predictions = ml_models["model"].predict(df_final)
+
+        # tolist() converts every prediction to a Python float in one call
+        return {
+            "predictions": [
+                {"predicted_remaining_lifespan": round(p, 2)} for p in np.asarray(predictions, dtype=float).tolist()
+            ],
+            "unit": "years",
+            "status": "success"
+        }
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=400, detail=f"Prediction error: {str(e)}")
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,60 @@
+# test_encode_dogs.py
+"""
+encode_dogs must give the same model input as the old per-dog pipeline
+(get_dummies + reindex to the model columns + fillna(0)), run from Life_Prediction.
+"""
+import os
+import sys
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from life_prediction import COLUMNS_PATH, DogFeatures, encode_dogs
+
+
+def legacy_encode(dog, model_cols):
+    df = pd.DataFrame([dog.model_dump()])
+    if 'mp_vacciNaNtion_status' in model_cols:
+        df.rename(columns={'mp_vaccination_status': 'mp_vacciNaNtion_status'}, inplace=True)
+    return pd.get_dummies(df).reindex(columns=model_cols, fill_value=0).fillna(0)
+
+
+def random_dogs(model_cols, n, seed=0):
+    """Dogs mixing known category values (taken from the model columns), unknown values and None."""
+    rng = np.random.default_rng(seed)
+    text_fields = [f for f, info in DogFeatures.model_fields.items()
+                   if str in (info.annotation, *getattr(info.annotation, "__args__", ()))]
+    known = {f: [c[len(f) + 1:] for c in model_cols if c.startswith(f + "_")] + ["Unknown value"]
+             for f in text_fields}
+    dogs = []
+    for _ in range(n):
+        fields = {f: str(rng.choice(known[f])) for f in text_fields}
+        for f in ("dd_breed_pure", "lifestyle_02", "pa_avg_activity_intensity"):
+            if rng.random() < 0.3:
+                fields[f] = None
+        dogs.append(DogFeatures(
+            Age_at_Condition=float(rng.uniform(0, 15)), dog_insurance=bool(rng.random() < 0.5),
+            pa_avg_daily_active_hours=float(rng.uniform(0, 6)), weight_lbs=float(rng.uniform(5, 120)),
+            mp_vaccination_status=None if rng.random() < 0.2 else int(rng.integers(0, 3)), **fields,
+        ))
+    return dogs
+
+
+@pytest.fixture(scope="module")
+def model_cols():
+    if not COLUMNS_PATH.exists():
+        pytest.skip(f"{COLUMNS_PATH} not available")
+    return list(joblib.load(COLUMNS_PATH))
+
+
+def test_encode_dogs_matches_legacy_pipeline(model_cols):
+    dogs = random_dogs(model_cols, 50)
+    column_index = {c: i for i, c in enumerate(model_cols)}
+    encoded = encode_dogs(dogs, model_cols, column_index)
+    expected = pd.concat([legacy_encode(dog, model_cols) for dog in dogs], ignore_index=True)
+    assert list(encoded.columns) == model_cols
+    np.testing.assert_array_equal(encoded.to_numpy(), expected.to_numpy(dtype=float))
@@ -0,0 +1,158 @@
+# admission.py
+"""
+Admission control and load shedding for the prediction endpoints.
+
+At most ADMISSION_MAX_IN_FLIGHT prediction requests run at once. Up to
+ADMISSION_QUEUE_SIZE more wait for a slot in arrival order, for at most
+ADMISSION_QUEUE_TIMEOUT seconds. A request that finds the queue full, or whose
+wait times out, gets an immediate 503 with Retry-After instead of slowing down
+the requests already admitted. When RATE_LIMIT_PER_SECOND is set, each client
+also gets a token bucket (RATE_LIMIT_PER_SECOND refill, RATE_LIMIT_BURST
+capacity), and a client that runs dry gets a 429 with Retry-After. Queue depth,
+shed counts and the latency of admitted requests (queue wait included) are kept
+for GET /models/admission.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+from responses import FastJSONResponse
+
+ADMISSION_PATH_PREFIX = "/predict"
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "4"))
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "16"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2.0"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+# Optional per-client token bucket, off by default; set RATE_LIMIT_PER_SECOND > 0 to enable it
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", "0"))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", "10"))
+# Header holding the client id when the API sits behind a proxy (e.g. x-forwarded-for); peer address otherwise
+CLIENT_ID_HEADER = os.getenv("CLIENT_ID_HEADER", "").lower().encode()
+MAX_TRACKED_CLIENTS = 10000
+LATENCY_WINDOW = 1000
+
+admission_stats = {
+    "admitted": 0,
+    "rejected_queue_full": 0,
+    "rejected_queue_timeout": 0,
+    "rate_limited": 0,
+    "in_flight": 0,
+    "queued": 0,
+    "max_queued": 0,
+}
+_slots = asyncio.Semaphore(ADMISSION_MAX_IN_FLIGHT)
+_buckets = {}
+_latencies_ms = deque(maxlen=LATENCY_WINDOW)
+
+
+def client_id(scope):
+    """Client id of a request: the configured header's first entry, else the peer address."""
+    if CLIENT_ID_HEADER:
+        for name, value in scope["headers"]:
+            if name == CLIENT_ID_HEADER:
+                return value.decode("latin-1").split(",")[0].strip()
+    return scope["client"][0] if scope.get("client") else "unknown"
+
+
+def take_token(client, now=None):
+    """Spend one token from the client's bucket; 0 when allowed, else seconds until a token is back."""
+    if RATE_LIMIT_PER_SECOND <= 0:
+        return 0
+    now = time.monotonic() if now is None else now
+    if len(_buckets) >= MAX_TRACKED_CLIENTS and client not in _buckets:
+        # Drop buckets that have refilled completely; they are equivalent to new ones
+        full_after = RATE_LIMIT_BURST / RATE_LIMIT_PER_SECOND
+        for key in [k for k, (_, last) in _buckets.items() if now - last >= full_after]:
+            del _buckets[key]
+    tokens, last = _buckets.get(client, (RATE_LIMIT_BURST, now))
+    tokens = min(RATE_LIMIT_BURST, tokens + (now - last) * RATE_LIMIT_PER_SECOND)
+    if tokens < 1:
+        _buckets[client] = (tokens, now)
+        return (1 - tokens) / RATE_LIMIT_PER_SECOND
+    _buckets[client] = (tokens - 1, now)
+    return 0
+
+
+async def acquire_slot():
+    """Wait for an in-flight slot; the reason string when the request is shed instead."""
+    if admission_stats["in_flight"] + admission_stats["queued"] >= ADMISSION_MAX_IN_FLIGHT + ADMISSION_QUEUE_SIZE:
+        admission_stats["rejected_queue_full"] += 1
+        return "queue_full"
+    admission_stats["queued"] += 1
+    admission_stats["max_queued"] = max(admission_stats["max_queued"], admission_stats["queued"])
+    try:
+        await asyncio.wait_for(_slots.acquire(), ADMISSION_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        admission_stats["rejected_queue_timeout"] += 1
+        return "queue_timeout"
+    finally:
+        admission_stats["queued"] -= 1
+    admission_stats["admitted"] += 1
+    admission_stats["in_flight"] += 1
+    return None
+
+
+def release_slot(elapsed_ms):
+    """Free an in-flight slot and record the request's latency from arrival."""
+    admission_stats["in_flight"] -= 1
+    _latencies_ms.append(elapsed_ms)
+    _slots.release()
+
+
+def recent_latency_ms(n, q):
+    """q-th percentile latency (ms, from arrival) of the last n admitted requests; 0 before any."""
+    latencies = list(_latencies_ms)[-n:]
+    return float(np.percentile(latencies, q)) if latencies else 0.0
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying the token bucket and the in-flight limit to the prediction paths."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(ADMISSION_PATH_PREFIX):
+            await self.app(scope, receive, send)
+            return
+
+        wait = take_token(client_id(scope))
+        if wait:
+            admission_stats["rate_limited"] += 1
+            response = FastJSONResponse({"detail": "Rate limit exceeded."}, status_code=429,
+                                        headers={"Retry-After": str(math.ceil(wait))})
+            await response(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        reason = await acquire_slot()
+        if reason:
+            response = FastJSONResponse({"detail": f"Server busy ({reason}), please retry."}, status_code=503,
+                                        headers={"Retry-After": str(ADMISSION_RETRY_AFTER)})
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            release_slot((time.perf_counter() - start) * 1000)
+
+
+def admission_summary():
+    """Limits, queue depth, admitted / shed counts and latency percentiles (ms, from arrival) of admitted requests."""
+    latencies = np.asarray(_latencies_ms)
+    return {
+        "max_in_flight": ADMISSION_MAX_IN_FLIGHT,
+        "queue_size": ADMISSION_QUEUE_SIZE,
+        "queue_timeout_s": ADMISSION_QUEUE_TIMEOUT,
+        "rate_limit": {"per_second": RATE_LIMIT_PER_SECOND, "burst": RATE_LIMIT_BURST, "clients": len(_buckets)},
+        **admission_stats,
+        "shed": admission_stats["rejected_queue_full"] + admission_stats["rejected_queue_timeout"],
+        "admitted_latency_ms": {
+            f"p{p}": round(float(np.percentile(latencies, p)), 3) for p in (50, 95, 99)
+        } if len(latencies) else None,
+    }
@@ -0,0 +1,177 @@
+# artifacts.py
+"""
+Versioned model artifact sets.
+
+A model directory (e.g. models/saved_models) holds either a legacy flat set of
+pickles or versioned sub-directories written by train_unified_clean.py --save-dir,
+plus a CURRENT file naming the active version. Each version carries a
+manifest.json with file roles, SHA-256 hashes, a content hash and measured metrics.
+"""
+import hashlib
+import json
+import pickle
+from pathlib import Path
+from typing import Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+
+# File roles for directories written before manifests existed
+LEGACY_LAYOUTS = {
+    "lifespan": {
+        "lifespan": "dog_lifespan_model.joblib",
+        "columns": "model_columns.joblib",
+    },
+    "19feat": {
+        "models": {"logistic": "target_{disease}_19feat.pkl"},
+        "scaler": "scaler_19feat.pkl",
+        "features": "features_19feat.pkl",
+        "encoders": "encoders_19feat.pkl",
+        "metrics": "metrics_19feat.csv",
+    },
+    "67feat": {
+        "models": {"logistic": "{disease}_logistic.pkl", "hist_gb": "{disease}_hist_gb.pkl"},
+        "scaler": "feature_scaler.pkl",
+        "features": "features_list.pkl",
+        "encoders": "label_encoders.pkl",
+        "metrics": "model_metrics.csv",
+    },
+}
+
+
+def available_versions(root) -> list:
+    """Versioned sets under root (sub-directories with a manifest), oldest name first."""
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    return sorted(p.name for p in root.iterdir()
+                  if p.is_dir() and not p.name.startswith(".") and (p / MANIFEST_FILE).exists())
+
+
+def current_version(root) -> Optional[str]:
+    """Version named by root/CURRENT, or None for a legacy flat directory."""
+    pointer = Path(root) / CURRENT_FILE
+    if pointer.exists():
+        return pointer.read_text().strip()
+    return None
+
+
+def resolve_version_dir(root, version=None) -> Path:
+    """Directory of the requested (default: current) version; the root itself for legacy sets."""
+    version = version or current_version(root)
+    return Path(root) / version if version else Path(root)
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_hash(file_hashes: dict) -> str:
+    """Single hash over every file in the set (name + hash, order independent)."""
+    lines = "".join(f"{name}:{file_hashes[name]}\n" for name in sorted(file_hashes))
+    return hashlib.sha256(lines.encode()).hexdigest()
+
+
+def _role_files(roles, diseases):
+    """Every file name referenced by a role map."""
+    names = []
+    for role, filename in roles.items():
+        if role == "models":
+            names += [template.format(disease=d) for template in filename.values() for d in diseases]
+        else:
+            names.append(filename)
+    return names
+
+
+def _legacy_manifest(version_dir: Path, family, diseases):
+    """Describe a pre-manifest directory the same way a written manifest would."""
+    roles = LEGACY_LAYOUTS[family]
+    files = {name: file_sha256(version_dir / name)
+             for name in _role_files(roles, diseases) if (version_dir / name).exists()}
+    metrics = {}
+    for kind in roles.get("models", {}):
+        metrics_file = roles["metrics"] if kind == "logistic" else f"model_metrics_{kind}.csv"
+        if (version_dir / metrics_file).exists():
+            df = pd.read_csv(version_dir / metrics_file)
+            metrics[kind] = {
+                row["disease"].removeprefix("target_"): row.drop("disease").to_dict()
+                for _, row in df.iterrows()
+            }
+    digest = content_hash(files)
+    return {
+        "version": f"legacy-{digest[:12]}",
+        "family": family,
+        "roles": roles,
+        "files": files,
+        "content_hash": digest,
+        "metrics": metrics,
+    }
+
+
+def read_manifest(version_dir, family, diseases) -> dict:
+    """Load manifest.json, or synthesize one (hashes + metrics CSV) for a legacy directory."""
+    version_dir = Path(version_dir)
+    manifest_path = version_dir / MANIFEST_FILE
+    if not manifest_path.exists():
+        return _legacy_manifest(version_dir, family, diseases)
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    for name, expected in manifest["files"].items():
+        if file_sha256(version_dir / name) != expected:
+            raise ValueError(f"Checksum mismatch for {version_dir / name}")
+    if content_hash(manifest["files"]) != manifest["content_hash"]:
+        raise ValueError(f"Content hash mismatch for {version_dir}")
+    return manifest
+
+
+def _load_file(path: Path):
+    if path.suffix == ".joblib":
+        return joblib.load(path)
+    if path.suffix == ".npz":
+        with np.load(path) as arrays:
+            return {name: arrays[name] for name in arrays.files}
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def load_artifact_set(root, family, diseases=(), model_kind="logistic", version=None) -> dict:
+    """
+    Load one artifact family (lifespan / 19feat / 67feat) from root.
+
+    Returns the loaded objects keyed by role ("models" is {disease: estimator}),
+    plus kind, auc ({disease: test AUC}), version, content_hash, path and nbytes
+    (size of the loaded files, used as the set's memory estimate).
+    """
+    version_dir = resolve_version_dir(root, version)
+    manifest = read_manifest(version_dir, family, diseases)
+
+    artifacts = {}
+    loaded_files = []
+    for role, filename in manifest["roles"].items():
+        if role == "models":
+            template = filename[model_kind]
+            loaded_files += [version_dir / template.format(disease=d) for d in diseases]
+            artifacts["models"] = {d: _load_file(version_dir / template.format(disease=d)) for d in diseases}
+        elif role != "metrics":
+            loaded_files.append(version_dir / filename)
+            artifacts[role] = _load_file(version_dir / filename)
+
+    metrics = manifest["metrics"].get(model_kind, {})
+    artifacts.update(
+        kind=model_kind,
+        auc={d: float(m["auc_roc"]) for d, m in metrics.items()},
+        version=manifest["version"],
+        content_hash=manifest["content_hash"],
+        path=str(version_dir),
+        nbytes=sum(path.stat().st_size for path in loaded_files),
+    )
+    return artifacts
@@ -0,0 +1,89 @@
+# cascade.py
+"""
+Cascade mode for the precision endpoint.
+
+The 19-feature models screen every disease first. Only diseases whose basic risk
+falls inside the uncertainty band [CASCADE_BAND_LOW, CASCADE_BAND_HIGH] are
+escalated to the 67-feature models; confident screens keep their basic score.
+When nothing is escalated, detailed preprocessing and scoring are skipped
+entirely. Counters and stage timings are kept so the cascade rate and the
+latency saved against full dual-model requests can be read from the API.
+Requests run in worker threads, so the counters are updated under a lock.
+"""
+import os
+import threading
+
+CASCADE_MODE = os.getenv("CASCADE_MODE", "false").lower() == "true"
+# Basic-risk probabilities between these bounds are treated as uncertain
+CASCADE_BAND_LOW = float(os.getenv("CASCADE_BAND_LOW", "0.25"))
+CASCADE_BAND_HIGH = float(os.getenv("CASCADE_BAND_HIGH", "0.75"))
+
+cascade_stats = {
+    "cascade_requests": 0,
+    "full_requests": 0,
+    "diseases_screened": 0,
+    "diseases_escalated": 0,
+    "requests_without_escalation": 0,
+    "requests_with_skips": 0,
+    "cascade_ms": 0.0,
+    "skipped_ms": 0.0,
+    "full_ms": 0.0,
+    "cascade_advanced_ms": 0.0,
+    "full_advanced_ms": 0.0,
+}
+_stats_lock = threading.Lock()
+
+
+def escalated(diseases, basic_proba, low=CASCADE_BAND_LOW, high=CASCADE_BAND_HIGH):
+    """Diseases whose basic risk lies in the uncertainty band, in the given order."""
+    return [d for d, p in zip(diseases, basic_proba) if low <= p <= high]
+
+
+def record_request(cascade, n_diseases, n_escalated, total_ms, advanced_ms):
+    """Count one /predict_detailed request and its total and advanced-stage latency."""
+    mode = "cascade" if cascade else "full"
+    with _stats_lock:
+        cascade_stats[f"{mode}_requests"] += 1
+        cascade_stats[f"{mode}_ms"] += total_ms
+        cascade_stats[f"{mode}_advanced_ms"] += advanced_ms
+        if cascade:
+            cascade_stats["diseases_screened"] += n_diseases
+            cascade_stats["diseases_escalated"] += n_escalated
+            if n_escalated == 0:
+                cascade_stats["requests_without_escalation"] += 1
+            if n_escalated < n_diseases:
+                cascade_stats["requests_with_skips"] += 1
+                cascade_stats["skipped_ms"] += total_ms
+
+
+def _mean(total, count):
+    return round(total / count, 3) if count else None
+
+
+def cascade_summary():
+    """
+    Band, counters, cascade rate and mean latencies (ms) of cascade vs full requests.
+    mean_saved_ms compares full requests with the cascade requests that skipped at least
+    one advanced model (a cascade that escalates every disease does the full work).
+    """
+    with _stats_lock:
+        s = dict(cascade_stats)
+    mean_full, mean_cascade = _mean(s["full_ms"], s["full_requests"]), _mean(s["cascade_ms"], s["cascade_requests"])
+    mean_skipped = _mean(s["skipped_ms"], s["requests_with_skips"])
+    return {
+        "enabled_by_default": CASCADE_MODE,
+        "band": [CASCADE_BAND_LOW, CASCADE_BAND_HIGH],
+        "cascade_requests": s["cascade_requests"],
+        "full_requests": s["full_requests"],
+        "diseases_screened": s["diseases_screened"],
+        "diseases_escalated": s["diseases_escalated"],
+        "requests_without_escalation": s["requests_without_escalation"],
+        "requests_with_skips": s["requests_with_skips"],
+        "cascade_rate": _mean(s["diseases_escalated"], s["diseases_screened"]),
+        "mean_ms": {"cascade": mean_cascade, "full": mean_full},
+        "mean_advanced_ms": {
+            "cascade": _mean(s["cascade_advanced_ms"], s["cascade_requests"]),
+            "full": _mean(s["full_advanced_ms"], s["full_requests"]),
+        },
+        "mean_saved_ms": round(mean_full - mean_skipped, 3) if mean_full is not None and mean_skipped is not None else None,
+    }
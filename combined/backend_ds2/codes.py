@@ -0,0 +1,179 @@
+# codes.py
+"""
+Model-input code tables for bodies validated with the strict schemas.
+
+A strict body holds only canonical answers, each with a fixed option code
+(schemas.OPTION_CODES). When a set is loaded, one variant dog per answer (and per
+life stage and weight class) is encoded with the family's normal preprocessing.
+For each field, the set keeps the columns that differ between its variants and
+their values per option code. A strict request's row is then gathered: the
+template row, the option rows of its answers, and the numeric inputs written
+directly. No string normalisation or encoder lookups run per request. The tables
+come from the normal preprocessing, so both paths give the same model inputs.
+"""
+from bisect import bisect_right
+
+import numpy as np
+import pandas as pd
+
+from preprocessor import (
+    dog_age,
+    lifespan_weight_lbs,
+    lifespan_raw_row,
+    encode_lifespan_rows,
+    preprocess_lifespan,
+    basic_disease_raw_row,
+    encode_basic_disease_rows,
+    preprocess_basic_disease,
+    detailed_disease_raw_row,
+    encode_detailed_disease_rows,
+    preprocess_detailed_disease,
+)
+from schemas import (
+    CATEGORY_OPTIONS,
+    DETAILED_CATEGORY_OPTIONS,
+    OPTION_CODES,
+    StrictDogHealthData,
+    StrictDetailedDogHealthData,
+)
+
+# Age of the template dog, and one age per life stage (see utils.map_age_to_life_stage)
+TEMPLATE_AGE = 5.0
+LIFE_STAGE_EDGES = [1.0, 3.0, 7.0]
+LIFE_STAGE_AGES = [0.5, 2.0, 5.0, 8.0]
+# Lower edges of the 5 kg weight classes after the first (see utils.map_weight_to_class)
+WEIGHT_CLASS_EDGES = [5.0, 10.0, 15.0, 25.0, 35.0]
+
+# Free-text request fields one-hot encoded by the lifespan model, and their column prefix
+LIFESPAN_TEXT_FIELDS = {
+    "disease": "hs_condition",
+    "breed": "dd_breed_pure",
+    "primaryBreed": "dd_breed_mixed_primary",
+    "secondaryBreed": "dd_breed_mixed_secondary",
+}
+# Numeric detailed-form fields, which the 67-feature model reads under their own name
+DETAILED_NUMERIC_FIELDS = [
+    "pa_moderate_weather_daily_hours_outside",
+    "pa_hot_weather_months_per_year",
+    "pa_cold_weather_months_per_year",
+    "de_nighttime_sleep_avg_hours",
+    "de_daytime_sleep_avg_hours",
+    "oc_household_person_count",
+    "oc_household_child_count",
+    "de_other_present_animals_dogs",
+]
+
+TEMPLATE_DOG = StrictDetailedDogHealthData(
+    dogName="template", birthYear=2020, weight=20.0, dailyActiveHours=1.0, disease=None,
+    pa_moderate_weather_daily_hours_outside=1.0, pa_hot_weather_months_per_year=3.0,
+    pa_cold_weather_months_per_year=3.0, de_nighttime_sleep_avg_hours=8.0, de_daytime_sleep_avg_hours=2.0,
+    oc_household_person_count=2, oc_household_child_count=0, de_other_present_animals_dogs=0,
+    **{field: options[0] for field, options in {**CATEGORY_OPTIONS, **DETAILED_CATEGORY_OPTIONS}.items()},
+)
+
+
+def encode_variants(family, artifact_set, dogs, ages):
+    """Encoded rows (as an array) of (dog, age) pairs with the family's own preprocessing."""
+    if family == "lifespan":
+        rows = encode_lifespan_rows([lifespan_raw_row(d, a) for d, a in zip(dogs, ages)], artifact_set["columns"])
+    elif family == "19feat":
+        rows = encode_basic_disease_rows([basic_disease_raw_row(d, a) for d, a in zip(dogs, ages)],
+                                         artifact_set["encoders"], artifact_set["features"])
+    else:
+        rows = encode_detailed_disease_rows([detailed_disease_raw_row(d, a) for d, a in zip(dogs, ages)],
+                                            artifact_set["encoders"], artifact_set["features"])
+    return np.asarray(rows, dtype=float), list(rows.columns)
+
+
+def variant_table(rows):
+    """Columns that differ between variant rows, and the rows' values in those columns."""
+    cols = np.flatnonzero((rows != rows[0]).any(axis=0))
+    return cols, rows[:, cols]
+
+
+def build_code_tables(family, artifact_set):
+    """Template row, per-answer / life-stage / weight-class tables and direct columns for one set."""
+    options = CATEGORY_OPTIONS if family != "67feat" else {**CATEGORY_OPTIONS, **DETAILED_CATEGORY_OPTIONS}
+    # Every variant is encoded in one batch: template, answers field by field, life stages, weight classes
+    groups = {"template": [(TEMPLATE_DOG, TEMPLATE_AGE)]}
+    for field, answers in options.items():
+        groups[field] = [(TEMPLATE_DOG.model_copy(update={field: answer}), TEMPLATE_AGE) for answer in answers]
+    groups["life_stage"] = [(TEMPLATE_DOG, age) for age in LIFE_STAGE_AGES]
+    groups["weight_class"] = [
+        (TEMPLATE_DOG.model_copy(update={"weight": w}), TEMPLATE_AGE) for w in [1.0] + WEIGHT_CLASS_EDGES
+    ]
+    pairs = [pair for group in groups.values() for pair in group]
+    rows, columns = encode_variants(family, artifact_set, [d for d, _ in pairs], [a for _, a in pairs])
+    bounds = np.cumsum([0] + [len(group) for group in groups.values()])
+    tables = {name: variant_table(rows[start:stop]) for name, start, stop in zip(groups, bounds[:-1], bounds[1:])}
+
+    index = {column: i for i, column in enumerate(columns)}
+    if family == "lifespan":
+        numeric = ["Age_at_Condition", "pa_avg_daily_active_hours", "weight_lbs"]
+        text = LIFESPAN_TEXT_FIELDS
+    else:
+        numeric = ["Estimated_Age_Years_at_HLES", "pa_avg_daily_active_hours"]
+        numeric += DETAILED_NUMERIC_FIELDS if family == "67feat" else []
+        text = {}
+    return {
+        "columns": columns,
+        "index": index,
+        "template": rows[0],
+        "fields": {field: tables[field] for field in options if len(tables[field][0])},
+        "life_stage": tables["life_stage"],
+        "weight_class": tables["weight_class"],
+        "numeric": [column for column in numeric if column in index],
+        "text": text,
+    }
+
+
+def numeric_value(column, dog, age):
+    """Value of a directly written numeric column."""
+    if column in ("Age_at_Condition", "Estimated_Age_Years_at_HLES"):
+        return float(age)
+    if column == "weight_lbs":
+        return float(lifespan_weight_lbs(age, dog.weight))
+    if column == "pa_avg_daily_active_hours":
+        return float(dog.dailyActiveHours)
+    return float(getattr(dog, column))
+
+
+def gather_row(tables, dog, age):
+    """One model-input row (DataFrame) for a strict body, gathered from a set's code tables."""
+    row = tables["template"].copy()
+    for field, (cols, values) in tables["fields"].items():
+        row[cols] = values[OPTION_CODES[field][getattr(dog, field)]]
+    cols, values = tables["life_stage"]
+    row[cols] = values[bisect_right(LIFE_STAGE_EDGES, age)]
+    cols, values = tables["weight_class"]
+    row[cols] = values[bisect_right(WEIGHT_CLASS_EDGES, dog.weight)]
+    for column in tables["numeric"]:
+        row[tables["index"][column]] = numeric_value(column, dog, age)
+    for field, prefix in tables["text"].items():
+        value = getattr(dog, field)
+        column = tables["index"].get(f"{prefix}_{value}") if value is not None else None
+        if column is not None:
+            row[column] = 1.0
+    return pd.DataFrame(row[np.newaxis, :], columns=tables["columns"])
+
+
+def lifespan_input(dog, lifespan_set):
+    """(lifespan model row, age): gathered for strict bodies, preprocessed otherwise."""
+    if isinstance(dog, StrictDogHealthData) and "code_tables" in lifespan_set:
+        age = dog_age(dog)
+        return gather_row(lifespan_set["code_tables"], dog, age), age
+    return preprocess_lifespan(dog, lifespan_set["columns"])
+
+
+def basic_disease_input(dog, age, artifact_set):
+    """19-feature model row: gathered for strict bodies, preprocessed otherwise."""
+    if isinstance(dog, StrictDogHealthData) and "code_tables" in artifact_set:
+        return gather_row(artifact_set["code_tables"], dog, age)
+    return preprocess_basic_disease(dog, age, artifact_set["encoders"], artifact_set["features"])
+
+
+def detailed_disease_input(dog, age, artifact_set):
+    """67-feature model row: gathered for strict bodies, preprocessed otherwise."""
+    if isinstance(dog, StrictDetailedDogHealthData) and "code_tables" in artifact_set:
+        return gather_row(artifact_set["code_tables"], dog, age)
+    return preprocess_detailed_disease(dog, age, artifact_set["encoders"], artifact_set["features"])
@@ -0,0 +1,181 @@
+# degraded.py
+"""
+Degraded mode for /predict: the lifespan optimizer is deferred under load.
+
+optimize_lifespan is the most expensive part of a /predict request. While the
+admission queue holds DEGRADE_QUEUE_DEPTH or more requests, or the recent p90
+latency of admitted requests reaches DEGRADE_LATENCY_MS, /predict returns the
+lifespan and disease results at once. Its lifespan_optimization section is then
+{"status": "pending", "job_id": ...}. A dispatcher thread hands the jobs, in
+order, to a single worker process started at nice DEFER_NICE, so the optimizer
+neither holds the API's GIL nor competes with it for CPU at equal priority. The
+worker loads the lifespan model itself, once per version, so a job carries only
+the dog and the model version. The dispatcher waits while the server is still
+under load (for at most DEFER_MAX_WAIT_SECONDS per job). When the job queue is full, /predict answers 503
+with Retry-After. Results are kept for GET /optimization/{job_id}.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException
+
+from admission import ADMISSION_RETRY_AFTER, admission_stats, recent_latency_ms
+from model_store import active, load_family
+from optimizer import optimize_lifespan
+
+# "auto" defers under load, "off" never defers, "always" defers every request
+DEGRADED_MODE = os.getenv("DEGRADED_MODE", "auto").lower()
+DEGRADE_QUEUE_DEPTH = int(os.getenv("DEGRADE_QUEUE_DEPTH", "4"))
+DEGRADE_LATENCY_MS = float(os.getenv("DEGRADE_LATENCY_MS", "2000"))
+# Admitted requests the latency trigger looks back over
+DEGRADE_LATENCY_WINDOW = 20
+DEFER_QUEUE_SIZE = int(os.getenv("DEFER_QUEUE_SIZE", "200"))
+DEFER_MAX_WAIT_SECONDS = float(os.getenv("DEFER_MAX_WAIT_SECONDS", "30"))
+DEFER_POLL_SECONDS = 0.2
+# Niceness added to the worker process (0 keeps the API's priority)
+DEFER_NICE = int(os.getenv("DEFER_NICE", "10"))
+# Finished and pending jobs kept for polling; the oldest are dropped first
+MAX_TRACKED_JOBS = 1000
+# Lifespan versions the worker process keeps loaded (the active one plus a pinned one)
+WORKER_MAX_VERSIONS = 2
+
+degraded_stats = {"deferred": 0, "rejected": 0, "completed": 0, "failed": 0}
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+_queue = queue.Queue(maxsize=DEFER_QUEUE_SIZE)
+_worker = None
+_pool = None
+_worker_models = OrderedDict()  # in the worker process: lifespan version -> (model, columns)
+
+
+def under_load():
+    """True when the admission queue or the recent latency of admitted requests crosses its threshold."""
+    if DEGRADED_MODE == "always":
+        return True
+    if DEGRADED_MODE == "off":
+        return False
+    return (
+        admission_stats["queued"] >= DEGRADE_QUEUE_DEPTH
+        or recent_latency_ms(DEGRADE_LATENCY_WINDOW, 90) >= DEGRADE_LATENCY_MS
+    )
+
+
+def _set_job(job_id, **fields):
+    with _jobs_lock:
+        _jobs.setdefault(job_id, {"job_id": job_id}).update(fields)
+        while len(_jobs) > MAX_TRACKED_JOBS:
+            _jobs.popitem(last=False)
+
+
+def defer_optimization(dog, ml_models):
+    """Queue optimize_lifespan for later; the pending section returned in its place, 503 when the queue is full."""
+    job_id = uuid.uuid4().hex
+    try:
+        _queue.put_nowait((job_id, dog, ml_models["version"], time.monotonic()))
+    except queue.Full:
+        degraded_stats["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Server busy (optimizer queue full), please retry.",
+                            headers={"Retry-After": str(ADMISSION_RETRY_AFTER)})
+    _set_job(job_id, status="pending", lifespan_version=ml_models["version"], lifespan_optimization=None)
+    degraded_stats["deferred"] += 1
+    return {"status": "pending", "job_id": job_id, "result_url": f"/optimization/{job_id}"}
+
+
+def worker_model(version):
+    """(model, columns) of a lifespan version in the worker process, loaded on first use."""
+    if version not in _worker_models:
+        lifespan_set = load_family("lifespan")  # CURRENT, or the flat legacy set
+        if lifespan_set["version"] != version:
+            lifespan_set = load_family("lifespan", version)
+        _worker_models[version] = (lifespan_set["lifespan"], lifespan_set["columns"])
+        while len(_worker_models) > WORKER_MAX_VERSIONS:
+            _worker_models.popitem(last=False)
+    _worker_models.move_to_end(version)
+    return _worker_models[version]
+
+
+def _init_worker(version):
+    """Worker process initializer: lower its priority and load the active lifespan model."""
+    os.nice(DEFER_NICE)
+    if version is not None:
+        worker_model(version)
+
+
+def run_optimization(dog, version):
+    """optimize_lifespan in the worker process, with the model version the request was served by."""
+    model, model_cols = worker_model(version)
+    return optimize_lifespan(dog, model, model_cols)
+
+
+def optimization_worker(pool):
+    """Dispatcher thread: send deferred optimizations to the worker process one at a time, yielding under load."""
+    while True:
+        job = _queue.get()
+        if job is None:  # stop_deferred
+            return
+        job_id, dog, version, queued_at = job
+        while under_load() and DEGRADED_MODE != "always" and time.monotonic() - queued_at < DEFER_MAX_WAIT_SECONDS:
+            time.sleep(DEFER_POLL_SECONDS)
+        _set_job(job_id, status="running")
+        try:
+            result = pool.submit(run_optimization, dog, version).result()
+            _set_job(job_id, status="done", lifespan_optimization=result)
+            degraded_stats["completed"] += 1
+        except Exception as e:
+            print(f"❌ Deferred optimization {job_id} failed: {e}")
+            _set_job(job_id, status="failed", error=str(e))
+            degraded_stats["failed"] += 1
+
+
+def start_deferred():
+    """Start the low-priority worker process and the dispatcher thread (once)."""
+    global _worker, _pool
+    if _worker is None:
+        _pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"),
+                                    initializer=_init_worker,
+                                    initargs=(active.get("lifespan", {}).get("version"),))
+        _worker = threading.Thread(target=optimization_worker, args=(_pool,), name="deferred-optimizer", daemon=True)
+        _worker.start()
+
+
+def stop_deferred():
+    """Stop the dispatcher and the worker process so start_deferred can start fresh ones; queued jobs fail."""
+    global _worker, _pool
+    if _worker is None:
+        return
+    while True:
+        try:
+            job_id = _queue.get_nowait()[0]
+        except queue.Empty:
+            break
+        _set_job(job_id, status="failed", error="Server shut down before the job ran.")
+        degraded_stats["failed"] += 1
+    _queue.put(None)
+    _pool.shutdown(wait=False, cancel_futures=True)
+    _worker, _pool = None, None
+
+
+def optimization_job(job_id):
+    """Status (and, once done, the lifespan_optimization section) of one deferred job, or None."""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        return dict(job) if job else None
+
+
+def degraded_summary():
+    """Mode, thresholds, whether the server is under load now, and deferred-job counters."""
+    return {
+        "mode": DEGRADED_MODE,
+        "queue_depth_threshold": DEGRADE_QUEUE_DEPTH,
+        "latency_threshold_ms": DEGRADE_LATENCY_MS,
+        "worker_nice": DEFER_NICE,
+        "under_load": under_load(),
+        **degraded_stats,
+        "queued_jobs": _queue.qsize(),
+    }
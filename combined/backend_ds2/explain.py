@@ -0,0 +1,112 @@
+# explain.py
+"""
+Per-feature risk explanations for the linear disease models.
+
+For logistic models the log-odds are intercept + sum(coef * scaled value), so each
+feature's contribution is one term of the matmul that produces the prediction.
+attach_linear_terms() stacks the five disease models' coefficients into one
+matrix at load time, and also stores a 0/1 matrix that sums model features into
+the request fields they come from. Scoring and explaining then reuse the same
+product, with no extra model evaluations.
+"""
+import numpy as np
+from scipy.special import expit
+
+from schemas import DetailedDogHealthData
+
+# Model feature -> request field it is derived from (detailed fields use their own name)
+FEATURE_FIELDS = {
+    "Estimated_Age_Years_at_HLES": "age",
+    "LifeStage_Class_at_HLES": "age",
+    "Sex_Class_at_HLES": "sex",
+    "Breed_Status": "breedState",
+    "Weight_Class_5KGBin_at_HLES": "weight",
+    "pa_activity_level": "activityLevel",
+    "pa_avg_daily_active_hours": "dailyActiveHours",
+    "pa_avg_activity_intensity": "activityIntensity",
+    "df_primary_diet_component": "primaryDiet",
+    "df_appetite": "appetiteLevel",
+    "dd_spayed_or_neutered": "spayedNeutered",
+    "mp_vaccination_status": "vaccinationStatus",
+    "db_fear_level_loud_noises": "fearOfNoises",
+    "db_aggression_level_on_leash_unknown_dog": "aggressionOnLeash",
+    "de_home_type": "homeType",
+    "de_home_area_type": "homeArea",
+    "cv_population_density": "homeArea",
+    "de_lead_present": "leadPresent",
+    "od_annual_income_range_usd": "annualIncome",
+    "cv_median_income": "annualIncome",
+    "dd_insurance": "insurance",
+    "de_drinking_water_is_filtered": "de_drinking_water_source",
+}
+
+
+def feature_field(feature):
+    """Request field behind a model feature, or None for features filled with fixed defaults."""
+    if feature in FEATURE_FIELDS:
+        return FEATURE_FIELDS[feature]
+    if feature in DetailedDogHealthData.model_fields:
+        return feature
+    return None
+
+
+def attach_linear_terms(artifact_set, diseases):
+    """
+    Add stacked coefficients (diseases x features), intercepts and the feature -> field
+    matrix to a disease artifact set whose models are all linear; leave others untouched.
+    """
+    models = [artifact_set["models"][d] for d in diseases]
+    if not all(hasattr(m, "coef_") and m.coef_.shape[0] == 1 for m in models):
+        return artifact_set
+
+    fields = []
+    for feature in artifact_set["features"]:
+        field = feature_field(feature)
+        if field is not None and field not in fields:
+            fields.append(field)
+    field_matrix = np.zeros((len(artifact_set["features"]), len(fields)))
+    for i, feature in enumerate(artifact_set["features"]):
+        field = feature_field(feature)
+        if field is not None:
+            field_matrix[i, fields.index(field)] = 1.0
+
+    artifact_set.update(
+        coef=np.vstack([m.coef_[0] for m in models]),
+        intercept=np.array([m.intercept_[0] for m in models]),
+        fields=fields,
+        field_matrix=field_matrix,
+    )
+    return artifact_set
+
+
+def linear_scores(artifact_set, X_scaled):
+    """
+    Positive-class probability per disease plus the contribution matrix
+    (diseases x features, in log-odds) from a single product.
+    """
+    x = np.asarray(X_scaled, dtype=float)[0]
+    contributions = artifact_set["coef"] * x
+    proba = expit(contributions.sum(axis=1) + artifact_set["intercept"])
+    return proba, contributions
+
+
+def top_factors(artifact_set, contributions, values, top_k=3):
+    """
+    The top_k request fields per disease row by absolute contribution, summed over
+    the features each field feeds. values maps field name -> the value the client sent.
+    """
+    by_field = contributions @ artifact_set["field_matrix"]      # diseases x fields
+    k = min(top_k, by_field.shape[1])
+    top = np.argsort(-np.abs(by_field), axis=1)[:, :k]
+    return [
+        [
+            {
+                "field": artifact_set["fields"][j],
+                "value": values.get(artifact_set["fields"][j]),
+                "contribution": round(float(row[j]), 4),
+                "effect": "raises risk" if row[j] > 0 else "lowers risk",
+            }
+            for j in order
+        ]
+        for row, order in zip(by_field, top)
+    ]
@@ -0,0 +1,55 @@
+# intervals.py
+"""
+Bootstrap intervals for the logistic disease models' risks.
+
+train_unified_clean.py --bootstrap N refits every disease model on N bootstrap
+resamples and stores the coefficients as one (replicates x features x diseases)
+tensor. For a request, all replicates' log-odds come from a single contraction of
+the scaled input row with that tensor. The replicates' spread around their median
+(in log-odds) is added to the served model's log-odds, so the interval is centred
+on the reported risk even when small-sample bias moves the replicates off it.
+
+The interval shows how much the fitted coefficients vary across resamples of the
+training data. It is not calibrated against held-out outcomes, so its level is the
+central percentile range of the replicates, not a coverage guarantee.
+"""
+import os
+
+import numpy as np
+from scipy.special import expit
+
+# Central percentile range of the replicates reported as the interval
+BOOTSTRAP_INTERVAL_LEVEL = float(os.getenv("BOOTSTRAP_INTERVAL_LEVEL", "0.9"))
+
+
+def attach_bootstrap_terms(artifact_set, diseases):
+    """Reorder a loaded bootstrap tensor to the serving disease order (linear sets only)."""
+    boot = artifact_set.get("bootstrap")
+    if boot is None or "coef" not in artifact_set:
+        artifact_set.pop("bootstrap", None)
+        return artifact_set
+    order = [list(boot["diseases"]).index(d) for d in diseases]
+    artifact_set["bootstrap"] = {
+        "coef": boot["coef"][:, :, order].astype(float),
+        "intercept": boot["intercept"][:, order].astype(float),
+    }
+    return artifact_set
+
+
+def bootstrap_intervals(artifact_set, X_scaled, level=BOOTSTRAP_INTERVAL_LEVEL):
+    """
+    [{low, high, percentile_range}] per disease on the 0-100 scale, or None entries when
+    the set has no bootstrap replicates.
+    """
+    boot = artifact_set.get("bootstrap")
+    if boot is None:
+        return [None] * len(artifact_set["models"])
+    x = np.asarray(X_scaled, dtype=float)[0]
+    log_odds = np.einsum("f,rfd->rd", x, boot["coef"]) + boot["intercept"]     # replicates x diseases
+    tail = (1 - level) / 2 * 100
+    spread = np.percentile(log_odds, [tail, 100 - tail], axis=0) - np.median(log_odds, axis=0)
+    low, high = expit(x @ artifact_set["coef"].T + artifact_set["intercept"] + spread) * 100
+    return [
+        {"low": round(float(lo), 1), "high": round(float(hi), 1), "percentile_range": round(level * 100)}
+        for lo, hi in zip(low, high)
+    ]
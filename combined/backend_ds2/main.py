@@ -1,118 +1,149 @@
 # main.py
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
-import joblib, uvicorn, os, pickle
+import uvicorn, os, asyncio, secrets, time
 from contextlib import asynccontextmanager
-from pathlib import Path
+from typing import Optional, Union
 
 # Import request/response schemas (Pydantic models)
-from schemas import DogHealthData, DetailedDogHealthData
+from schemas import DogHealthData, DetailedDogHealthData, StrictDogHealthData, StrictDetailedDogHealthData
 
-# Import custom preprocessing modules for different prediction pipelines
-from preprocessor import (
-    preprocess_lifespan,
-    preprocess_basic_disease,
-    preprocess_detailed_disease,
-)
+# Model inputs per pipeline: gathered from option-code tables for strict bodies, preprocessed otherwise
+from codes import lifespan_input, basic_disease_input, detailed_disease_input
 
 # Import optimization logic for lifespan improvement suggestions
-from optimizer import optimize_lifespan
+from optimizer import optimize_lifespan, optimize_lifespan_and_risk
+from risk_optimizer import optimize_disease_risk
+
+# Loaded model sets per family, validated background reloads and the CURRENT watcher
+from model_store import (
+    DISEASES,
+    FAMILIES,
+    UNSCALED_MODEL_KINDS,
+    RELOAD_CHECK_SECONDS,
+    active,
+    load_all,
+    reload_family,
+    watch_versions,
+    get_set,
+    version_summary,
+)
+
+# Log-odds contributions of the linear disease models, mapped back to request fields
+from explain import linear_scores, top_factors
+
+# Lifespan and risk curves over future ages, one batch per model family
+from trajectory import age_grid, lifespan_rows, risk_curves
+
+# Finite-difference sensitivities to the continuous inputs, one batch per model family
+from sensitivity import perturbations, lifespan_sensitivities, risk_sensitivities, sensitivity_report
+
+# Monte Carlo percentile bands for owner-estimated inputs
+from uncertainty import UNCERTAINTY_SAMPLES, uncertainty_bands
+
+# Bootstrap-replicate intervals around each linear disease risk
+from intervals import bootstrap_intervals
+
+# Cascade mode: advanced models only for diseases the basic screen is unsure about
+from cascade import CASCADE_MODE, CASCADE_BAND_LOW, CASCADE_BAND_HIGH, escalated, record_request, cascade_summary
+
+# Candidate model versions scored on live traffic after each response
+from shadow import start_shadow, submit_shadow, shadow_summary
+
+# Coalescing of identical in-flight requests
+from singleflight import request_key, single_flight, singleflight_summary
+
+# In-flight limit, bounded queue and per-client token bucket for the prediction paths
+from admission import AdmissionMiddleware, admission_summary
+
+# Degraded mode: the lifespan optimizer is deferred to a low-priority job under load
+from degraded import under_load, defer_optimization, start_deferred, stop_deferred, optimization_job, degraded_summary
 
 # Import helper functions for interpreting and formatting outputs
 from utils import (
-    get_risk_interpretation,
+    risk_band_text,
     get_reliability_rating,
-    get_reliability_explanation,
-    get_recommendation,
 )
 
-# --- Configuration & Paths ---
-# Resolve the directory where this file is located (used to build stable model paths)
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# orjson responses that bypass FastAPI's jsonable_encoder
+from responses import FastJSONResponse
+
+# --- Configuration ---
+# Token for the admin endpoints (sent as X-Admin-Token); they are disabled when unset
+ADMIN_TOKEN = os.getenv("MODEL_ADMIN_TOKEN")
+# Validate bodies against the enum-constrained schemas (unknown answers are rejected with a 422)
+STRICT_INPUTS = os.getenv("STRICT_INPUTS", "false").lower() == "true"
+BasicBody = StrictDogHealthData if STRICT_INPUTS else DogHealthData
+DetailedBody = StrictDetailedDogHealthData if STRICT_INPUTS else DetailedDogHealthData
 
-# Lifespan model paths
-MODEL_PATH_LIFESPAN = os.path.join(BASE_DIR, "models", "lifespan", "dog_lifespan_model.joblib")
-COLUMNS_PATH_LIFESPAN = os.path.join(BASE_DIR, "models", "lifespan", "model_columns.joblib")
 
-# Disease model directories
-MODEL_DIR_BASIC = Path("models/saved_models_19feat")   # Basic models using 19 features
-MODEL_DIR_DETAILED = Path("models/saved_models")       # Advanced models using 67 features
+def auc_fields(models_dict, disease):
+    """AUC-based reliability fields for one disease, read from the loaded artifact set."""
+    auc = models_dict["auc"].get(disease)
+    if auc is None:
+        return {"auc_score": None, "reliability": "Unknown"}
+    return {"auc_score": round(auc, 4), "reliability": get_reliability_rating(auc)}
 
-# Supported disease categories
-DISEASES = ["orthopedic", "dermatological", "cardiac", "ear", "urinary"]
 
-# Global containers for persisted models/metadata
-ml_models = {}
-disease_models_dict = {}   # Stores 19-feature models and preprocessors
-detailed_models_dict = {}  # Stores 67-feature models and preprocessors
+def disease_scores(models_dict, X, diseases=DISEASES):
+    """
+    Positive-class probability per listed disease, plus the contribution matrix when the
+    set is linear (one product for all five models; other model kinds loop over diseases).
+    """
+    if "coef" in models_dict:
+        positive_proba, contributions = linear_scores(models_dict, X)
+        rows = [DISEASES.index(d) for d in diseases]
+        return positive_proba[rows].tolist(), contributions[rows]
+    return [float(models_dict["models"][d].predict_proba(X)[0][1]) for d in diseases], None
 
 
-def load_disease_models():
-    """Load basic disease classifiers (19-feature pipeline) plus preprocessing assets."""
-    models_basic = {
-        d: pickle.load(open(MODEL_DIR_BASIC / f"target_{d}_19feat.pkl", "rb"))
-        for d in DISEASES
-    }
-    return {
-        "models": models_basic,
-        "scaler": pickle.load(open(MODEL_DIR_BASIC / "scaler_19feat.pkl", "rb")),
-        "features": pickle.load(open(MODEL_DIR_BASIC / "features_19feat.pkl", "rb")),
-        "encoders": pickle.load(open(MODEL_DIR_BASIC / "encoders_19feat.pkl", "rb")),
-    }
+def explain_factors(models_dict, contributions, dog, age, top_k):
+    """Top contributing request fields per disease (None entries when the set is not linear)."""
+    if contributions is None:
+        return [None] * len(DISEASES)
+    return top_factors(models_dict, contributions, {**dog.model_dump(), "age": age}, top_k)
 
 
-def load_detailed_models():
-    """Load advanced disease classifiers (67-feature pipeline) plus preprocessing assets."""
-    # Advanced models use the naming format: {disease}_logistic.pkl
-    models_detailed = {
-        d: pickle.load(open(MODEL_DIR_DETAILED / f"{d}_logistic.pkl", "rb"))
-        for d in DISEASES
-    }
-    return {
-        "models": models_detailed,
-        "scaler": pickle.load(open(MODEL_DIR_DETAILED / "feature_scaler.pkl", "rb")),
-        "features": pickle.load(open(MODEL_DIR_DETAILED / "features_list.pkl", "rb")),
-        "encoders": pickle.load(open(MODEL_DIR_DETAILED / "label_encoders.pkl", "rb")),
-    }
+async def resolve_set(family, version):
+    """Artifact set for a request, honouring an optional pinned version."""
+    try:
+        return await get_set(family, version)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown {family} model version: {version}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     FastAPI lifespan handler:
-    - On startup: load all ML models and preprocessing artifacts into memory.
-    - On shutdown: clear caches to free memory.
+    - On startup: load all ML models and preprocessing artifacts into memory and
+      start watching the CURRENT pointers for new versions.
+    - On shutdown: stop the watcher and clear caches to free memory.
     """
     try:
-        # Load lifespan regression model and its expected input column order
-        if os.path.exists(MODEL_PATH_LIFESPAN):
-            ml_models["lifespan"] = joblib.load(MODEL_PATH_LIFESPAN)
-            ml_models["columns"] = joblib.load(COLUMNS_PATH_LIFESPAN)
-            print("✅ Lifespan prediction model loaded.")
-
-        # Load basic disease risk models (19 features)
-        global disease_models_dict
-        disease_models_dict = load_disease_models()
-        print("✅ Basic disease risk models (19feat) loaded.")
-
-        # Load advanced disease risk models (67 features)
-        global detailed_models_dict
-        detailed_models_dict = load_detailed_models()
-        print("✅ Detailed disease risk models (67feat) loaded.")
-
+        load_all()
     except Exception as e:
         print(f"❌ Startup Error: {e}")
 
+    watcher = asyncio.create_task(watch_versions()) if RELOAD_CHECK_SECONDS > 0 else None
+    shadow = start_shadow()
+    start_deferred()
+
     yield
 
     # Cleanup on shutdown
-    ml_models.clear()
-    disease_models_dict.clear()
-    detailed_models_dict.clear()
+    for task in (watcher, shadow):
+        if task:
+            task.cancel()
+    stop_deferred()
+    active.clear()
 
 
 # Create FastAPI app and attach lifespan lifecycle logic
-app = FastAPI(title="Dog Health Prediction API", lifespan=lifespan)
+app = FastAPI(title="Dog Health Prediction API", lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Shed prediction requests beyond the in-flight limit and queue (added first so CORS wraps its 503 / 429s)
+app.add_middleware(AdmissionMiddleware)
 
 # Enable CORS for all origins (use a restricted list in production)
 app.add_middleware(
@@ -126,162 +157,486 @@ app.add_middleware(
 )
 
 
-@app.post("/predict")
-async def predict_health(dog: DogHealthData):
-    """Basic endpoint: runs lifespan + 19-feature disease risk assessment."""
-    if "lifespan" not in ml_models or not disease_models_dict:
-        raise HTTPException(status_code=500, detail="Models not loaded on server.")
+@app.post("/admin/reload")
+async def admin_reload(x_admin_token: Optional[str] = Header(None)):
+    """
+    Reload every family from its CURRENT version now (the watcher does this on its own).
+    Each set is loaded and smoke-tested in the background before it is swapped in;
+    a set that fails keeps the previous version serving.
+    """
+    if not ADMIN_TOKEN or not secrets.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required.")
 
-    try:
-        # 1) Lifespan prediction
-        df_l, age = preprocess_lifespan(dog, ml_models["columns"])
-        pred_l = ml_models["lifespan"].predict(df_l)[0]
+    results = []
+    for family in FAMILIES:
+        try:
+            results.append(await reload_family(family))
+        except Exception as e:
+            print(f"❌ Reload of {family} failed, keeping the current set: {e}")
+            results.append({"family": family, "version": active.get(family, {}).get("version"), "error": str(e)})
+    return {"reloaded": results}
+
+
+@app.get("/models/versions")
+async def model_versions():
+    """Active, in-memory and on-disk model versions per family (for pinning requests)."""
+    return version_summary()
+
+
+@app.get("/models/shadow")
+async def shadow_status():
+    """Shadow candidates and queue counters (enqueued / dropped / completed / failed)."""
+    return shadow_summary()
+
+
+@app.get("/models/cascade")
+async def cascade_status():
+    """Cascade band, escalation counters, cascade rate and mean latency of cascade vs full requests."""
+    return cascade_summary()
+
+
+@app.get("/models/singleflight")
+async def singleflight_status():
+    """Computed / coalesced request counts per endpoint and the number of computations in flight."""
+    return singleflight_summary()
+
+
+@app.get("/models/admission")
+async def admission_status():
+    """In-flight and queued requests, shed and rate-limited counts, and admitted-request latency percentiles."""
+    return admission_summary()
+
+
+@app.get("/models/degraded")
+async def degraded_status():
+    """Degraded-mode thresholds, current load state and deferred optimization counters."""
+    return degraded_summary()
+
+
+@app.get("/optimization/{job_id}")
+async def deferred_optimization(job_id: str):
+    """Status of a lifespan optimization deferred by /predict; includes the result once done."""
+    job = optimization_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown optimization job: {job_id}")
+    return job
+
+
+def enqueue_shadows(background_tasks, dog, shadows, start):
+    """Have the shadow candidates score this request's input once its response is sent."""
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for family, age, scores, version in shadows:
+        background_tasks.add_task(submit_shadow, family, dog, age, scores, version, elapsed_ms)
+
+
+def basic_prediction(dog, ml_models, disease_models_dict, explain, explain_top_k, pareto):
+    """/predict result and shadow inputs for one body (run in a worker thread, shared by duplicate requests)."""
+    # 1) Lifespan prediction
+    df_l, age = lifespan_input(dog, ml_models)
+    pred_l = ml_models["lifespan"].predict(df_l)[0]
+    # Under load the optimizer runs later as a low-priority job and its section comes back pending
+    if under_load():
+        optimization_result = defer_optimization(dog, ml_models)
+    else:
         optimization_result = optimize_lifespan(dog, ml_models["lifespan"], ml_models["columns"])
 
-        # 2) Disease risk prediction (basic 19-feature pipeline)
-        df_b = preprocess_basic_disease(
-            dog,
-            age,
-            disease_models_dict["encoders"],
-            disease_models_dict["features"],
+    # 2) Disease risk prediction (basic 19-feature pipeline)
+    df_b = basic_disease_input(dog, age, disease_models_dict)
+    X_scaled = disease_models_dict["scaler"].transform(df_b)
+
+    predictions_list = []
+    risk_values = []
+    positive_proba, contributions = disease_scores(disease_models_dict, X_scaled)
+    intervals = bootstrap_intervals(disease_models_dict, X_scaled)
+    if explain:
+        factors = explain_factors(disease_models_dict, contributions, dog, age, explain_top_k)
+
+    for i, d in enumerate(DISEASES):
+        proba = [1 - positive_proba[i], positive_proba[i]]
+        risk_score = round(proba[1] * 100, 1)
+        interpretation, recommendation = risk_band_text(risk_score)
+        risk_values.append(proba[1])
+
+        predictions_list.append(
+            {
+                "disease": d.upper(),
+                "risk_score": risk_score,
+                "bootstrap_interval": intervals[i],
+                "confidence": f"{round(max(proba) * 100, 1)}%",
+                "interpretation": interpretation,
+                "recommendation": recommendation,
+                **auc_fields(disease_models_dict, d),
+                "status": "basic_analysis",
+            }
         )
-        X_scaled = disease_models_dict["scaler"].transform(df_b)
+        if explain:
+            predictions_list[-1]["top_factors"] = factors[i]
+
+    # Average risk score across all disease categories (basic models)
+    avg_risk = (sum(risk_values) / len(risk_values)) * 100
+
+    # Optional multi-objective mode: plans that trade lifespan against disease risk
+    pareto_result = optimize_lifespan_and_risk(dog, ml_models, disease_models_dict) if pareto else None
+
+    # Shadow candidates score the same input; each caller enqueues them after its response
+    shadows = [
+        ("lifespan", age, {"lifespan": float(pred_l)}, ml_models["version"]),
+        ("19feat", age, dict(zip(DISEASES, risk_values)), disease_models_dict["version"]),
+    ]
+
+    return shadows, {
+        "dog_profile": {
+            "name": dog.dogName,
+            "age": age,
+            "sex": dog.sex,
+            "weight": dog.weight,
+        },
+        "lifespan_prediction": {
+            "remaining_years": round(float(pred_l), 2),
+            "total_estimated_years": round(age + float(pred_l), 2),
+        },
+        "lifespan_optimization": optimization_result,
+        **({"pareto_optimization": pareto_result} if pareto else {}),
+        "predictions": predictions_list,
+        "average_risk": round(avg_risk, 1),
+        "summary": "Health profile looks stable."
+        if avg_risk < 60
+        else "⚠️ Consultation advised.",
+        "honesty_level": "Basic 19-factor assessment",
+        "model_versions": {"lifespan": ml_models["version"], "basic": disease_models_dict["version"]},
+        "status": "success",
+    }
 
-        predictions_list = []
-        risk_values = []
 
-        for d in DISEASES:
-            model = disease_models_dict["models"][d]
-            proba = model.predict_proba(X_scaled)[0]
-            risk_score = round(proba[1] * 100, 1)
-            risk_values.append(proba[1])
+@app.post("/predict")
+async def predict_health(
+    dog: BasicBody,
+    background_tasks: BackgroundTasks,
+    lifespan_version: Optional[str] = None,
+    basic_version: Optional[str] = None,
+    explain: bool = False,
+    explain_top_k: int = Query(3, ge=1, le=20),
+    pareto: bool = False,
+):
+    """
+    Basic endpoint: runs lifespan + 19-feature disease risk assessment.
+    The *_version query parameters pin a model version (default: the active one).
+    explain=true adds the explain_top_k request fields driving each disease risk.
+    pareto=true adds the lifestyle plans trading off lifespan against disease risk.
+    """
+    start = time.perf_counter()
+    # Take each set once so a concurrent reload cannot change models mid-request
+    ml_models = await resolve_set("lifespan", lifespan_version)
+    disease_models_dict = await resolve_set("19feat", basic_version)
+    if not ml_models or not disease_models_dict:
+        raise HTTPException(status_code=500, detail="Models not loaded on server.")
 
-            predictions_list.append(
+    # Identical concurrent requests share one computation
+    key = request_key("predict", dog, lifespan=ml_models["version"], basic=disease_models_dict["version"],
+                      explain=explain, explain_top_k=explain_top_k, pareto=pareto)
+    try:
+        shadows, result = await single_flight("predict", key, basic_prediction, dog, ml_models,
+                                              disease_models_dict, explain, explain_top_k, pareto)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Prediction Error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    enqueue_shadows(background_tasks, dog, shadows, start)
+    return FastJSONResponse(result)
+
+
+def detailed_prediction(dog, ml_models, disease_models_dict, detailed_models_dict, explain, explain_top_k,
+                        cascade, start):
+    """/predict_detailed result for one body (run in a worker thread, shared by duplicate requests)."""
+    # 0) Shared preprocessing (age extraction + lifespan input formatting)
+    df_l, age = lifespan_input(dog, ml_models)
+
+    # 1) Basic model prediction (19-feature)
+    df_b = basic_disease_input(dog, age, disease_models_dict)
+    X_scaled_b = disease_models_dict["scaler"].transform(df_b)
+
+    basic_results = []
+    basic_risk_values = []
+    positive_proba, contributions = disease_scores(disease_models_dict, X_scaled_b)
+    intervals = bootstrap_intervals(disease_models_dict, X_scaled_b)
+    if explain:
+        factors = explain_factors(disease_models_dict, contributions, dog, age, explain_top_k)
+
+    # Cascade: only uncertain basic screens go on to the advanced models
+    advanced_diseases = escalated(DISEASES, positive_proba) if cascade else DISEASES
+
+    for i, d in enumerate(DISEASES):
+        risk_score = round(positive_proba[i] * 100, 1)
+        interpretation, recommendation = risk_band_text(risk_score)
+        basic_risk_values.append(positive_proba[i])
+
+        basic_results.append(
+            {
+                "disease": d.upper(),
+                "risk_score": risk_score,
+                "bootstrap_interval": intervals[i],
+                "model_type": "basic",
+                "interpretation": interpretation,
+                "recommendation": recommendation,
+                **auc_fields(disease_models_dict, d),
+            }
+        )
+        if explain:
+            basic_results[-1]["top_factors"] = factors[i]
+        if cascade:
+            basic_results[-1]["escalated"] = d in advanced_diseases
+
+    # 2) Advanced model prediction (67-feature), skipped when the cascade escalates nothing
+    advanced_start = time.perf_counter()
+    advanced_results = []
+    advanced_risk_values = []
+    risk_optimization = None
+    if advanced_diseases:
+        df_d = detailed_disease_input(dog, age, detailed_models_dict)
+        if detailed_models_dict["kind"] in UNSCALED_MODEL_KINDS:
+            X_scaled_d = df_d
+        else:
+            X_scaled_d = detailed_models_dict["scaler"].transform(df_d)
+
+        positive_proba, contributions = disease_scores(detailed_models_dict, X_scaled_d, advanced_diseases)
+        intervals = bootstrap_intervals(detailed_models_dict, X_scaled_d)
+        if explain:
+            factors = explain_factors(detailed_models_dict, contributions, dog, age, explain_top_k)
+
+        for i, d in enumerate(advanced_diseases):
+            risk_score = round(positive_proba[i] * 100, 1)
+            interpretation, recommendation = risk_band_text(risk_score)
+            advanced_risk_values.append(positive_proba[i])
+
+            advanced_results.append(
                 {
                     "disease": d.upper(),
                     "risk_score": risk_score,
-                    "confidence": f"{round(max(proba) * 100, 1)}%",
-                    "interpretation": get_risk_interpretation(risk_score),
-                    "recommendation": get_recommendation(d, risk_score),
-                    "status": "basic_analysis",
+                    "bootstrap_interval": intervals[DISEASES.index(d)],
+                    "model_type": "advanced",
+                    "interpretation": interpretation,
+                    "recommendation": recommendation,
+                    **auc_fields(detailed_models_dict, d),
                 }
             )
-
-        # Average risk score across all disease categories (basic models)
-        avg_risk = (sum(risk_values) / len(risk_values)) * 100
-
-        return {
-            "dog_profile": {
-                "name": dog.dogName,
-                "age": age,
-                "sex": dog.sex,
-                "weight": dog.weight,
-            },
-            "lifespan_prediction": {
-                "remaining_years": round(float(pred_l), 2),
-                "total_estimated_years": round(age + float(pred_l), 2),
-            },
-            "lifespan_optimization": optimization_result,
-            "predictions": predictions_list,
-            "average_risk": round(avg_risk, 1),
-            "summary": "Health profile looks stable."
-            if avg_risk < 60
-            else "⚠️ Consultation advised.",
-            "honesty_level": "Basic 19-factor assessment",
-            "status": "success",
-        }
-
-    except Exception as e:
-        print(f"Prediction Error: {e}")
-        raise HTTPException(status_code=400, detail=str(e))
+            if explain:
+                advanced_results[-1]["top_factors"] = factors[i]
+
+        # Care changes that lower the advanced risks of the scored diseases (closed form, linear models only)
+        if "coef" in detailed_models_dict:
+            risk_optimization = optimize_disease_risk(dog, df_d, detailed_models_dict, advanced_diseases)
+    advanced_ms = (time.perf_counter() - advanced_start) * 1000
+
+    # 3) Compute average risk for each model family. In cascade mode the headline average
+    # uses the advanced risk where a disease was escalated and the basic risk elsewhere.
+    avg_risk_basic = round((sum(basic_risk_values) / len(basic_risk_values)) * 100, 1)
+    avg_risk_adv = (
+        round((sum(advanced_risk_values) / len(advanced_risk_values)) * 100, 1) if advanced_risk_values else None
+    )
+    final_risks = dict(zip(DISEASES, basic_risk_values))
+    final_risks.update(zip(advanced_diseases, advanced_risk_values))
+    avg_risk = round((sum(final_risks.values()) / len(final_risks)) * 100, 1)
+
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    record_request(cascade, len(DISEASES), len(advanced_diseases) if cascade else 0, elapsed_ms, advanced_ms)
+    # Shadow candidates score the same input; each caller enqueues them after its response
+    shadows = [("19feat", age, dict(zip(DISEASES, basic_risk_values)), disease_models_dict["version"])]
+    if len(advanced_diseases) == len(DISEASES):
+        shadows.append(("67feat", age, dict(zip(DISEASES, advanced_risk_values)), detailed_models_dict["version"]))
+
+    return shadows, {
+        "dog_profile": {"name": dog.dogName, "age": age},
+        "predictions": basic_results + advanced_results,
+        "average_risk": avg_risk,  # The advanced pipeline average unless the cascade skipped diseases
+        "basic_average_risk": avg_risk_basic,
+        "advanced_average_risk": avg_risk_adv,
+        "risk_optimization": risk_optimization,
+        **({"cascade": {
+            "band": [CASCADE_BAND_LOW, CASCADE_BAND_HIGH],
+            "escalated": [d.upper() for d in advanced_diseases],
+            "advanced_ms": round(advanced_ms, 3),
+        }} if cascade else {}),
+        "honesty_level": "High-Precision Dual Model Sync",
+        "model_versions": {"basic": disease_models_dict["version"], "advanced": detailed_models_dict["version"]},
+        "status": "success",
+    }
 
 
 @app.post("/predict_detailed")
-async def predict_health_detailed(dog: DetailedDogHealthData):
+async def predict_health_detailed(
+    dog: DetailedBody,
+    background_tasks: BackgroundTasks,
+    basic_version: Optional[str] = None,
+    advanced_version: Optional[str] = None,
+    explain: bool = False,
+    explain_top_k: int = Query(3, ge=1, le=20),
+    cascade: bool = CASCADE_MODE,
+):
     """
     Precision endpoint:
     - Runs both basic (19-feature) and advanced (67-feature) disease risk models.
     - Returns combined predictions plus separate average risk scores.
+    - The *_version query parameters pin a model version (default: the active one).
+    - explain=true adds the explain_top_k request fields driving each disease risk.
+    - cascade=true runs the advanced models only for diseases whose basic risk is in
+      the uncertainty band (default from CASCADE_MODE).
     """
-    if "lifespan" not in ml_models or not detailed_models_dict or not disease_models_dict:
+    start = time.perf_counter()
+    # Take each set once so a concurrent reload cannot change models mid-request
+    ml_models = active.get("lifespan")  # only used for age extraction
+    disease_models_dict = await resolve_set("19feat", basic_version)
+    detailed_models_dict = await resolve_set("67feat", advanced_version)
+    if not ml_models or not detailed_models_dict or not disease_models_dict:
         raise HTTPException(status_code=500, detail="All models must be loaded.")
 
+    # Identical concurrent requests share one computation
+    key = request_key("predict_detailed", dog, lifespan=ml_models["version"], basic=disease_models_dict["version"],
+                      advanced=detailed_models_dict["version"], explain=explain, explain_top_k=explain_top_k,
+                      cascade=cascade)
     try:
-        # 0) Shared preprocessing (age extraction + lifespan input formatting)
-        df_l, age = preprocess_lifespan(dog, ml_models["columns"])
-
-        # 1) Basic model prediction (19-feature)
-        df_b = preprocess_basic_disease(
-            dog,
-            age,
-            disease_models_dict["encoders"],
-            disease_models_dict["features"],
-        )
-        X_scaled_b = disease_models_dict["scaler"].transform(df_b)
+        shadows, result = await single_flight("predict_detailed", key, detailed_prediction, dog, ml_models,
+                                              disease_models_dict, detailed_models_dict, explain, explain_top_k,
+                                              cascade, start)
+    except Exception as e:
+        print(f"Detailed Prediction Error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    enqueue_shadows(background_tasks, dog, shadows, start)
+    return FastJSONResponse(result)
+
+
+@app.post("/predict_trajectory")
+async def predict_trajectory(
+    dog: Union[DetailedBody, BasicBody],
+    years_ahead: float = Query(10.0, gt=0, le=20),
+    step: float = Query(1.0, ge=0.25, le=5),
+    lifespan_version: Optional[str] = None,
+    basic_version: Optional[str] = None,
+    advanced_version: Optional[str] = None,
+):
+    """
+    Report curves: predicted lifespan and disease risks at the dog's current age and
+    every `step` years up to `years_ahead` later. The advanced (67-feature) curves are
+    included when the body carries the detailed fields.
+    """
+    ml_models = await resolve_set("lifespan", lifespan_version)
+    disease_models_dict = await resolve_set("19feat", basic_version)
+    detailed = isinstance(dog, DetailedDogHealthData)
+    detailed_models_dict = await resolve_set("67feat", advanced_version) if detailed else None
+    if not ml_models or not disease_models_dict or (detailed and not detailed_models_dict):
+        raise HTTPException(status_code=500, detail="Models not loaded on server.")
 
-        basic_results = []
-        basic_risk_values = []
+    try:
+        df_l, age = lifespan_input(dog, ml_models)
+        ages = age_grid(age, years_ahead, step)
+
+        remaining = ml_models["lifespan"].predict(lifespan_rows(df_l, ages, dog.weight))
+        df_b = basic_disease_input(dog, age, disease_models_dict)
+        risks = {"basic": risk_curves(disease_models_dict, df_b, ages)}
+        versions = {"lifespan": ml_models["version"], "basic": disease_models_dict["version"]}
+        if detailed:
+            df_d = detailed_disease_input(dog, age, detailed_models_dict)
+            risks["advanced"] = risk_curves(detailed_models_dict, df_d, ages)
+            versions["advanced"] = detailed_models_dict["version"]
+
+        return FastJSONResponse({
+            "dog_profile": {"name": dog.dogName, "age": age},
+            "ages": ages.tolist(),
+            "lifespan": {
+                "remaining_years": [round(float(years), 2) for years in remaining],
+                "total_estimated_years": [round(float(a + years), 2) for a, years in zip(ages, remaining)],
+            },
+            "risks": risks,
+            "model_versions": versions,
+            "status": "success",
+        })
+
+    except Exception as e:
+        print(f"Trajectory Error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
 
-        for d in DISEASES:
-            model = disease_models_dict["models"][d]
-            proba = model.predict_proba(X_scaled_b)[0]
-            risk_score = round(proba[1] * 100, 1)
-            basic_risk_values.append(proba[1])
 
-            basic_results.append(
-                {
-                    "disease": d.upper(),
-                    "risk_score": risk_score,
-                    "model_type": "basic",
-                    "interpretation": get_risk_interpretation(risk_score),
-                    "recommendation": get_recommendation(d, risk_score),
-                }
-            )
+@app.post("/predict_sensitivity")
+async def predict_sensitivity(
+    dog: Union[DetailedBody, BasicBody],
+    lifespan_version: Optional[str] = None,
+    basic_version: Optional[str] = None,
+    advanced_version: Optional[str] = None,
+):
+    """
+    What moves the needle: change in predicted lifespan and each disease risk per unit
+    of every continuous input in the body (weight, active hours and, for detailed
+    bodies, time outside, sleep and household counts), largest mover first.
+    """
+    ml_models = await resolve_set("lifespan", lifespan_version)
+    disease_models_dict = await resolve_set("19feat", basic_version)
+    detailed = isinstance(dog, DetailedDogHealthData)
+    detailed_models_dict = await resolve_set("67feat", advanced_version) if detailed else None
+    if not ml_models or not disease_models_dict or (detailed and not detailed_models_dict):
+        raise HTTPException(status_code=500, detail="Models not loaded on server.")
 
-        # 2) Advanced model prediction (67-feature)
-        df_d = preprocess_detailed_disease(
-            dog,
-            age,
-            detailed_models_dict["encoders"],
-            detailed_models_dict["features"],
-        )
-        X_scaled_d = detailed_models_dict["scaler"].transform(df_d)
+    try:
+        df_l, age = lifespan_input(dog, ml_models)
+        inputs, upper, lower = perturbations(dog)
+
+        lifespan_per_unit = lifespan_sensitivities(ml_models, df_l, age, inputs, upper, lower)
+        df_b = basic_disease_input(dog, age, disease_models_dict)
+        risks = {"basic": risk_sensitivities(disease_models_dict, df_b, inputs, upper, lower)}
+        versions = {"lifespan": ml_models["version"], "basic": disease_models_dict["version"]}
+        if detailed:
+            df_d = detailed_disease_input(dog, age, detailed_models_dict)
+            risks["advanced"] = risk_sensitivities(detailed_models_dict, df_d, inputs, upper, lower)
+            versions["advanced"] = detailed_models_dict["version"]
+
+        return FastJSONResponse({
+            "dog_profile": {"name": dog.dogName, "age": age},
+            "sensitivities": sensitivity_report(inputs, lifespan_per_unit, risks),
+            "model_versions": versions,
+            "status": "success",
+        })
 
-        advanced_results = []
-        advanced_risk_values = []
+    except Exception as e:
+        print(f"Sensitivity Error: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
 
-        for d in DISEASES:
-            model = detailed_models_dict["models"][d]
-            proba = model.predict_proba(X_scaled_d)[0]
-            risk_score = round(proba[1] * 100, 1)
-            advanced_risk_values.append(proba[1])
 
-            advanced_results.append(
-                {
-                    "disease": d.upper(),
-                    "risk_score": risk_score,
-                    "model_type": "advanced",
-                    "interpretation": get_risk_interpretation(risk_score),
-                    "recommendation": get_recommendation(d, risk_score),
-                }
-            )
+@app.post("/predict_uncertainty")
+async def predict_uncertainty(
+    dog: Union[DetailedBody, BasicBody],
+    samples: int = Query(UNCERTAINTY_SAMPLES, ge=100, le=50000),
+    seed: Optional[int] = None,
+    lifespan_version: Optional[str] = None,
+    basic_version: Optional[str] = None,
+    advanced_version: Optional[str] = None,
+):
+    """
+    Percentile bands (p5-p95) of lifespan and each disease risk when dailyActiveHours,
+    weight and activityIntensity are treated as owner estimates. `seed` makes the
+    sampling reproducible. Detailed bodies also get advanced-model bands.
+    """
+    ml_models = await resolve_set("lifespan", lifespan_version)
+    disease_models_dict = await resolve_set("19feat", basic_version)
+    detailed = isinstance(dog, DetailedDogHealthData)
+    detailed_models_dict = await resolve_set("67feat", advanced_version) if detailed else None
+    if not ml_models or not disease_models_dict or (detailed and not detailed_models_dict):
+        raise HTTPException(status_code=500, detail="Models not loaded on server.")
 
-        # 3) Compute average risk for each model family
-        avg_risk_basic = round((sum(basic_risk_values) / len(basic_risk_values)) * 100, 1)
-        avg_risk_adv = round((sum(advanced_risk_values) / len(advanced_risk_values)) * 100, 1)
+    try:
+        _, age = lifespan_input(dog, ml_models)
+        bands = uncertainty_bands(dog, age, ml_models, disease_models_dict, detailed_models_dict, samples, seed)
+        versions = {"lifespan": ml_models["version"], "basic": disease_models_dict["version"]}
+        if detailed:
+            versions["advanced"] = detailed_models_dict["version"]
 
-        return {
+        return FastJSONResponse({
             "dog_profile": {"name": dog.dogName, "age": age},
-            "predictions": basic_results + advanced_results,
-            "average_risk": avg_risk_adv,  # Default to the advanced pipeline average
-            "basic_average_risk": avg_risk_basic,
-            "advanced_average_risk": avg_risk_adv,
-            "honesty_level": "High-Precision Dual Model Sync",
+            **bands,
+            "model_versions": versions,
             "status": "success",
-        }
+        })
 
     except Exception as e:
-        print(f"Detailed Prediction Error: {e}")
+        print(f"Uncertainty Error: {e}")
         raise HTTPException(status_code=400, detail=str(e))
 
 
@@ -0,0 +1,207 @@
+# model_store.py
+"""
+Serving model sets, their atomic replacement and older resident versions.
+
+`active` maps each family ("lifespan", "19feat", "67feat") to its loaded artifact
+set. A reload loads the new set off the event loop, validates it with a smoke
+prediction, and only then replaces the family's entry. Requests take their
+reference to a set once when they start, so requests already running finish on
+the old version.
+
+Requests may pin an older version. Those sets are loaded lazily and kept in
+`resident`, an LRU bounded by MODEL_CACHE_MB; the active sets never count against it.
+"""
+import asyncio
+import os
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from artifacts import load_artifact_set, current_version, available_versions
+from tree_compiler import compile_if_equivalent
+from explain import attach_linear_terms
+from intervals import attach_bootstrap_terms
+from codes import build_code_tables
+
+# Resolve the directory where this file is located (used to build stable model paths)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Model directories per family (flat legacy sets or versioned sets with a CURRENT pointer)
+MODEL_DIRS = {
+    "lifespan": Path(BASE_DIR) / "models" / "lifespan",  # dog_lifespan_model.joblib + model_columns.joblib
+    "19feat": Path("models/saved_models_19feat"),        # Basic models using 19 features
+    "67feat": Path("models/saved_models"),               # Advanced models using 67 features
+}
+FAMILIES = list(MODEL_DIRS)
+
+# Supported disease categories
+DISEASES = ["orthopedic", "dermatological", "cardiac", "ear", "urinary"]
+
+# Advanced model family to serve: loads {disease}_{kind}.pkl ("logistic" or "hist_gb")
+DETAILED_MODEL_KIND = os.getenv("DETAILED_MODEL_KIND", "logistic")
+# Histogram boosting is trained on unscaled label codes (native categoricals), so it skips the scaler
+UNSCALED_MODEL_KINDS = {"hist_gb"}
+
+# Serve tree-ensemble lifespan models from flattened NumPy node arrays (set to 0 to use sklearn)
+COMPILE_LIFESPAN_MODEL = os.getenv("COMPILE_LIFESPAN_MODEL", "1") == "1"
+
+# How often the watcher checks the CURRENT pointers for a newly deployed version (0 disables it)
+RELOAD_CHECK_SECONDS = float(os.getenv("MODEL_RELOAD_CHECK_SECONDS", "5"))
+
+# Memory budget for pinned older versions, estimated from their artifact file sizes
+MODEL_CACHE_BYTES = int(float(os.getenv("MODEL_CACHE_MB", "512")) * 2**20)
+
+active = {}                 # family -> loaded artifact set currently served
+resident = OrderedDict()    # (family, version) -> set for pinned older versions, least recently used first
+_pending_loads = {}         # (family, version) -> task loading it, so concurrent pins share one load
+_failed_versions = set()    # (family, version) pairs that failed to load; not retried by the watcher
+_reload_lock = asyncio.Lock()
+
+
+def load_family(family, version=None):
+    """Load one family's artifact set (default: the version named by CURRENT)."""
+    if family == "lifespan":
+        artifact_set = load_artifact_set(MODEL_DIRS[family], family, version=version)
+        if COMPILE_LIFESPAN_MODEL:
+            artifact_set["lifespan"] = compile_if_equivalent(artifact_set["lifespan"])
+    else:
+        model_kind = DETAILED_MODEL_KIND if family == "67feat" else "logistic"
+        artifact_set = load_artifact_set(MODEL_DIRS[family], family, DISEASES, model_kind=model_kind, version=version)
+        artifact_set = attach_bootstrap_terms(attach_linear_terms(artifact_set, DISEASES), DISEASES)
+    # Option-code tables that strict request bodies are gathered from
+    artifact_set["code_tables"] = build_code_tables(family, artifact_set)
+    return artifact_set
+
+
+def smoke_test(family, artifact_set):
+    """Run one prediction through a freshly loaded set; raise ValueError if it is unusable."""
+    if family == "lifespan":
+        X = pd.DataFrame(np.zeros((1, len(artifact_set["columns"]))), columns=artifact_set["columns"])
+        prediction = np.asarray(artifact_set["lifespan"].predict(X), dtype=float)
+        if prediction.shape != (1,) or not np.isfinite(prediction).all():
+            raise ValueError(f"lifespan smoke prediction returned {prediction!r}")
+        return
+
+    features = artifact_set["features"]
+    X = pd.DataFrame(np.zeros((1, len(features))), columns=features)
+    if artifact_set["kind"] not in UNSCALED_MODEL_KINDS:
+        X = artifact_set["scaler"].transform(X)
+    for disease in DISEASES:
+        proba = artifact_set["models"][disease].predict_proba(X)
+        if proba.shape != (1, 2) or not np.isfinite(proba).all():
+            raise ValueError(f"{family} {disease} smoke prediction returned {proba!r}")
+
+
+def load_validated(family, version=None):
+    """Load and smoke-test a set; blocking, so reloads run it in a worker thread."""
+    artifact_set = load_family(family, version)
+    smoke_test(family, artifact_set)
+    return artifact_set
+
+
+def load_all():
+    """Startup: load every family that is present; a missing family is reported, not fatal."""
+    for family in FAMILIES:
+        try:
+            active[family] = load_validated(family)
+            print(f"✅ {family} models loaded ({active[family]['version']}).")
+        except FileNotFoundError:
+            print(f"⚠️ {family} models not found in {MODEL_DIRS[family]}.")
+
+
+async def reload_family(family, version=None, only_if_changed=False):
+    """
+    Load a set in the background, validate it and swap it in.
+    Raises on failure, leaving the previous set serving. With only_if_changed,
+    returns None when CURRENT already names the served version.
+    """
+    async with _reload_lock:
+        previous = active.get(family, {}).get("version")
+        if only_if_changed and current_version(MODEL_DIRS[family]) in (None, previous):
+            return None
+        # A pinned copy of the target version is promoted instead of being loaded a second time
+        target = version or current_version(MODEL_DIRS[family])
+        fresh = resident.pop((family, target), None) if target else None
+        if fresh is None:
+            fresh = await asyncio.to_thread(load_validated, family, version)
+        resident.pop((family, fresh["version"]), None)
+        replaced = active.get(family)
+        active[family] = fresh
+        if replaced is not None and replaced["version"] != fresh["version"]:
+            remember(family, replaced)  # keep it warm for clients pinned to it
+    print(f"🔄 Loaded {family} models {fresh['version']} (was {previous}).")
+    return {"family": family, "previous": previous, "version": fresh["version"]}
+
+
+async def watch_versions():
+    """Background task: reload a family whenever its CURRENT pointer names a new version."""
+    while True:
+        await asyncio.sleep(RELOAD_CHECK_SECONDS)
+        for family in FAMILIES:
+            version = current_version(MODEL_DIRS[family])
+            if version is None or (family, version) in _failed_versions:
+                continue
+            if version == active.get(family, {}).get("version"):
+                continue
+            try:
+                await reload_family(family, only_if_changed=True)
+            except Exception as e:
+                _failed_versions.add((family, version))
+                print(f"❌ Reload of {family} version {version} failed, keeping the current set: {e}")
+
+
+def remember(family, artifact_set):
+    """Add a set to the resident LRU and evict least recently used sets over the budget."""
+    if active.get(family, {}).get("version") == artifact_set["version"]:
+        return  # a pin that finished loading after its version went active; the active set is not counted
+    resident[(family, artifact_set["version"])] = artifact_set
+    resident.move_to_end((family, artifact_set["version"]))
+    # The newest entry stays even if it alone exceeds the budget
+    while len(resident) > 1 and sum(s["nbytes"] for s in resident.values()) > MODEL_CACHE_BYTES:
+        (evicted_family, evicted_version), _ = resident.popitem(last=False)
+        print(f"🧹 Evicted {evicted_family} models {evicted_version} from memory.")
+
+
+async def _load_resident(family, version):
+    artifact_set = await asyncio.to_thread(load_validated, family, version)
+    print(f"📥 Loaded pinned {family} models {version}.")
+    remember(family, artifact_set)
+    return artifact_set
+
+
+async def get_set(family, version=None):
+    """
+    The set serving a request: the active one, or a pinned version loaded on first use.
+    Raises KeyError for a version that does not exist on disk.
+    """
+    current = active.get(family)
+    if version is None or (current is not None and version == current["version"]):
+        return current
+
+    key = (family, version)
+    if key in resident:
+        resident.move_to_end(key)
+        return resident[key]
+    if version not in available_versions(MODEL_DIRS[family]):
+        raise KeyError(version)
+
+    if key not in _pending_loads:
+        _pending_loads[key] = asyncio.ensure_future(_load_resident(family, version))
+    try:
+        return await asyncio.shield(_pending_loads[key])
+    finally:
+        _pending_loads.pop(key, None)
+
+
+def version_summary():
+    """Active, resident and on-disk versions per family."""
+    return {
+        family: {
+            "active": active.get(family, {}).get("version"),
+            "resident": [v for (f, v) in resident if f == family],
+            "available": available_versions(MODEL_DIRS[family]),
+        }
+        for family in FAMILIES
+    }
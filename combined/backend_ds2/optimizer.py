@@ -1,17 +1,35 @@
 # optimizer.py
 import itertools
-import pandas as pd
+import os
+import numpy as np
 from schemas import DogHealthData
-from preprocessor import preprocess_lifespan
+from preprocessor import (
+    dog_age,
+    lifespan_raw_row,
+    encode_lifespan_rows,
+    basic_disease_raw_row,
+    encode_basic_disease_rows,
+)
+from trajectory import batch_risks
+from model_store import DISEASES
 
+# Owner-realistic range searched for dailyActiveHours
+ACTIVE_HOURS_RANGE = (0.5, 6.0)
+# Points per refinement round of the active-hours search, and the resolution it stops at
+ACTIVE_HOURS_GRID_POINTS = 12
+ACTIVE_HOURS_RESOLUTION = 0.1
+# Most lifespan-model evaluations (rows) one optimization may use. The current plan and the discrete
+# combinations (at most 145 rows) come first, sampled down when they do not fit; the hours search
+# gets what is left.
+OPTIMIZER_EVAL_BUDGET = int(os.getenv("OPTIMIZER_EVAL_BUDGET", "200"))
+if OPTIMIZER_EVAL_BUDGET < 2:
+    raise ValueError("OPTIMIZER_EVAL_BUDGET must allow the current plan and at least one combination (>= 2).")
+# dailyActiveHours values crossed with the discrete combinations in the Pareto mode
+PARETO_ACTIVE_HOURS = [0.5, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
 
-def optimize_lifespan(original_data: DogHealthData, model, model_cols):
-    """
-    Iterates through modifiable lifestyle factors to find the combination
-    that yields the maximum predicted lifespan.
-    """
 
-    # 1. Define candidates for optimization
+def candidate_configs(original_data: DogHealthData):
+    """All combinations of the modifiable lifestyle factors (dicts of field updates)."""
 
     # Insurance: If currently 'No', try 'Yes'.
     insurance_opts = [original_data.insurance]
@@ -40,44 +58,103 @@ def optimize_lifespan(original_data: DogHealthData, model, model_cols):
     if original_data.primaryDiet not in diet_opts and original_data.primaryDiet != "Other":
         diet_opts.append(original_data.primaryDiet)
 
-    # 2. Generate all combinations (Cartesian product)
-    combinations = itertools.product(
-        insurance_opts, spayed_opts, vaccine_opts, activity_opts, diet_opts
-    )
-
-    best_years = -1.0
-    best_config = {}
-
-    # 3. Iterate through combinations and predict
-    for ins, spayed, vac, act, diet in combinations:
-        # Create a temporary copy of the data with the new parameter combination
-        temp_data = original_data.model_copy(update={
+    return [
+        {
             "insurance": ins,
             "spayedNeutered": spayed,
             "vaccinationStatus": vac,
             "activityIntensity": act,
-            "primaryDiet": diet
-        })
-
-        # Preprocess and Predict
-        df_l, _ = preprocess_lifespan(temp_data, model_cols)
-        pred_years = float(model.predict(df_l)[0])
-
-        # Track the maximum lifespan found
-        if pred_years > best_years:
-            best_years = pred_years
-            best_config = {
-                "insurance": ins,
-                "spayedNeutered": spayed,
-                "vaccinationStatus": vac,
-                "activityIntensity": act,
-                "primaryDiet": diet
-            }
-
-    # 4. Calculate Gain and Identify Specific Changes
-    baseline_df, _ = preprocess_lifespan(original_data, model_cols)
-    baseline_years = float(model.predict(baseline_df)[0])
+            "primaryDiet": diet,
+        }
+        for ins, spayed, vac, act, diet in itertools.product(
+            insurance_opts, spayed_opts, vaccine_opts, activity_opts, diet_opts
+        )
+    ]
+
+
+def predict_configs(original_data: DogHealthData, configs, model, model_cols, age=None):
+    """Predicted remaining years for each config (dict of field updates), as one batch."""
+    age = dog_age(original_data) if age is None else age
+    rows = [lifespan_raw_row(original_data.model_copy(update=config), age) for config in configs]
+    return np.asarray(model.predict(encode_lifespan_rows(rows, model_cols)), dtype=float)
+
+
+def search_active_hours(original_data: DogHealthData, config, model, model_cols, age, budget):
+    """
+    Grid refinement of dailyActiveHours over ACTIVE_HOURS_RANGE for one config.
+    Each round scores a grid in one batch, then narrows the range to one grid spacing
+    either side of the best point. This suits tree models, whose predictions are flat
+    between split points, better than golden-section search. Ties go to the hours
+    closest to the current value. Returns (best hours, its prediction, rows evaluated).
+    """
+    current = float(original_data.dailyActiveHours)
+    low, high = ACTIVE_HOURS_RANGE
+    hours, years = np.empty(0), np.empty(0)
+    evaluations = 0
+    while budget - evaluations >= 3:
+        points = min(ACTIVE_HOURS_GRID_POINTS, budget - evaluations)
+        # Snap to the search resolution so suggestions read as whole tenths of an hour
+        grid = np.unique(np.round(np.linspace(low, high, points) / ACTIVE_HOURS_RESOLUTION) * ACTIVE_HOURS_RESOLUTION)
+        grid = np.round(grid[~np.isin(np.round(grid, 2), np.round(hours, 2))], 2)
+        if len(grid) == 0:
+            break
+        grid_years = predict_configs(
+            original_data, [{**config, "dailyActiveHours": float(h)} for h in grid], model, model_cols, age
+        )
+        evaluations += len(grid)
+        hours, years = np.concatenate([hours, grid]), np.concatenate([years, grid_years])
+
+        best = hours[np.argmax(years)]
+        spacing = (high - low) / (points - 1)
+        if spacing <= ACTIVE_HOURS_RESOLUTION:
+            break
+        low, high = max(ACTIVE_HOURS_RANGE[0], best - spacing), min(ACTIVE_HOURS_RANGE[1], best + spacing)
+
+    if evaluations == 0:
+        return current, None, 0
+    ties = np.flatnonzero(years >= years.max() - 1e-9)
+    best = ties[np.argmin(np.abs(hours[ties] - current))]
+    return float(hours[best]), float(years[best]), evaluations
+
+
+def optimize_lifespan(original_data: DogHealthData, model, model_cols, budget=OPTIMIZER_EVAL_BUDGET):
+    """
+    Finds the combination of modifiable lifestyle factors that yields the maximum predicted
+    lifespan (all combinations scored in one batch, sampled when they exceed the budget), then
+    searches dailyActiveHours for that combination with the evaluations left in the budget.
+    """
+    age = dog_age(original_data)
+
+    # 1. Score the current plan and every discrete combination in one batch. When the grid does
+    # not fit in the budget, a fixed random sample of it is scored instead.
+    configs = candidate_configs(original_data)
+    if len(configs) > budget - 1:
+        keep = np.sort(np.random.default_rng(0).choice(len(configs), size=max(1, budget - 1), replace=False))
+        configs = [configs[i] for i in keep]
+    predictions = predict_configs(original_data, [{}] + configs, model, model_cols, age)
+    baseline_years = float(predictions[0])
+    best_index = int(np.argmax(predictions[1:]))
+    best_years = float(predictions[1:][best_index])
+    best_config = configs[best_index]
+    evaluations = len(predictions)
+    # Keep the current plan when no combination is SIGNIFICANTLY better (> 0.05 years)
+    if best_years - baseline_years <= 0.05:
+        best_years = baseline_years
+        best_config = {field: getattr(original_data, field) for field in best_config}
 
+    # 2. Continuous search of daily active hours on top of the best combination
+    best_hours, hours_years, hour_evaluations = search_active_hours(
+        original_data, best_config, model, model_cols, age, budget - evaluations
+    )
+    evaluations += hour_evaluations
+    hours_gain = 0.0
+    if hours_years is not None and hours_years - best_years > 0.05:
+        hours_gain = hours_years - best_years
+        best_years = hours_years
+    else:
+        best_hours = float(original_data.dailyActiveHours)
+
+    # 3. Calculate Gain and Identify Specific Changes
     # Prevent tiny floating point errors (e.g., 1e-15) from registering as a gain
     years_gained = max(0.0, round(best_years - baseline_years, 4))
 
@@ -99,6 +176,9 @@ def optimize_lifespan(original_data: DogHealthData, model, model_cols):
                 "Activity"] = f"Adjust intensity ({original_data.activityIntensity} -> {best_config['activityIntensity']})"
         if best_config["primaryDiet"] != original_data.primaryDiet:
             changes["Diet"] = f"Consider diet change ({original_data.primaryDiet} -> {best_config['primaryDiet']})"
+        if hours_gain > 0:
+            changes[
+                "Active Hours"] = f"Adjust daily activity ({original_data.dailyActiveHours:g} -> {best_hours:g} hours)"
 
     # --- SAFETY NET ---
     # If 'changes' is still empty (either due to insignificant gain or already optimal state),
@@ -112,6 +192,66 @@ def optimize_lifespan(original_data: DogHealthData, model, model_cols):
         "original_lifespan": round(baseline_years, 2),
         "max_potential_lifespan": round(baseline_years + years_gained, 2),  # Ensure consistent math
         "years_gained": round(years_gained, 2),
+        "best_daily_active_hours": round(best_hours, 2),
+        "active_hours_gain": round(hours_gain, 2),
+        "model_evaluations": evaluations,
         "suggested_changes": changes
     }
 
+
+def pareto_front(maximize, minimize):
+    """
+    Indices of the non-dominated points for one objective to maximize and one to minimize.
+    Sorting by the first objective and keeping points that beat the running minimum of the
+    second is O(n log n). Among identical points the earliest index is kept.
+    """
+    minimize = np.asarray(minimize, dtype=float)
+    order = np.lexsort((np.arange(len(minimize)), minimize, -np.asarray(maximize, dtype=float)))
+    ranked = minimize[order]
+    best_before = np.concatenate([[np.inf], np.minimum.accumulate(ranked)[:-1]])
+    return order[ranked < best_before].tolist()
+
+
+def optimize_lifespan_and_risk(original_data: DogHealthData, lifespan_set, disease_set):
+    """
+    Multi-objective mode: every discrete combination crossed with PARETO_ACTIVE_HOURS
+    (plus the current plan) is scored with the lifespan model and the five basic disease
+    models, one batch per family. Returns the plans where no other plan gives both a
+    longer predicted lifespan and a lower average disease risk, longest lifespan first.
+    """
+    age = dog_age(original_data)
+    hours = sorted({float(original_data.dailyActiveHours), *PARETO_ACTIVE_HOURS})
+    configs = [{}] + [
+        {**config, "dailyActiveHours": h} for config in candidate_configs(original_data) for h in hours
+    ]
+    dogs = [original_data.model_copy(update=config) for config in configs]
+
+    years = np.asarray(lifespan_set["lifespan"].predict(
+        encode_lifespan_rows([lifespan_raw_row(dog, age) for dog in dogs], lifespan_set["columns"])
+    ), dtype=float)
+    risks = batch_risks(disease_set, encode_basic_disease_rows(
+        [basic_disease_raw_row(dog, age) for dog in dogs], disease_set["encoders"], disease_set["features"]
+    ))
+    average_risk = risks.mean(axis=1)
+
+    # Fewest changes first, so identical outcomes are reported with the simplest plan
+    changed = [
+        {field: value for field, value in config.items() if value != getattr(original_data, field)}
+        for config in configs
+    ]
+    by_changes = np.argsort([len(c) for c in changed], kind="stable")
+    front = by_changes[pareto_front(years[by_changes], average_risk[by_changes])]
+
+    def plan(i):
+        return {
+            "changes": changed[i],
+            "remaining_years": round(float(years[i]), 2),
+            "average_risk": round(float(average_risk[i]) * 100, 1),
+            "risks": {d.upper(): round(float(r) * 100, 1) for d, r in zip(DISEASES, risks[i])},
+        }
+
+    return {
+        "current": plan(0),
+        "pareto_front": [plan(i) for i in front],
+        "candidates": len(configs),
+    }
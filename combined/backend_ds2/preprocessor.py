@@ -1,4 +1,5 @@
 # preprocessor.py
+import os
 import pandas as pd
 import numpy as np
 from datetime import datetime
@@ -16,18 +17,51 @@ MONTH_MAP = {
     "July": 7, "August": 8, "September": 9, "October": 10, "November": 11, "December": 12
 }
 
+LBS_PER_KG = 2.20462
 
-def preprocess_lifespan(data, model_cols):
-    """
-    Prepares data for the Lifespan prediction model using One-Hot encoding alignment.
-    """
+# Detailed-form answers the training data stores as 0/1 flags (other answers keep the 0 fallback).
+# Off by default: these answers have always been encoded as 0, and mapping them changes the
+# served /predict_detailed risks (see models/README.md, "Risk Optimization").
+MAP_DETAILED_ANSWERS = os.getenv("MAP_DETAILED_ANSWERS", "false").lower() == "true"
+YES_NO_CODES = {"yes": 1.0, "no": 0.0}
+ANSWER_CODES = {
+    "df_daily_supplements": YES_NO_CODES,
+    "df_daily_supplements_glucosamine": YES_NO_CODES,
+    "df_daily_supplements_omega3": YES_NO_CODES,
+    "mp_heartworm_preventative": YES_NO_CODES,
+    "mp_flea_and_tick_treatment": {**YES_NO_CODES, "monthly": 1.0, "annually": 1.0, "never": 0.0},
+} if MAP_DETAILED_ANSWERS else {}
+
+
+def encode_detailed_value(feature, value, encoders):
+    """Model input for one detailed-model feature, encoded as preprocess_detailed_disease does."""
+    if feature in ANSWER_CODES:
+        return ANSWER_CODES[feature].get(str(value).strip().lower(), 0.0)
+    if feature in encoders:
+        try:
+            return float(encoders[feature].transform([str(value).strip()])[0])
+        except:
+            return 0.0
+    number = pd.to_numeric(value, errors="coerce")
+    return 0.0 if pd.isna(number) else float(number)
+
+
+def lifespan_weight_lbs(age, weight_kg):
+    """weight_lbs input of the lifespan model: 0 before age 8, else the weight in pounds (ages may be an array)."""
+    return np.where(np.asarray(age) < 8, 0.0, weight_kg * LBS_PER_KG)
+
+
+def dog_age(data):
+    """Age in years (one decimal) from the birth month and year."""
     today = datetime.now()
     birth_month_num = MONTH_MAP.get(data.birthMonth, 1)
     total_months = (today.year - data.birthYear) * 12 + (today.month - birth_month_num)
-    age = max(0.0, round(total_months / 12.0, 1))
+    return max(0.0, round(total_months / 12.0, 1))
 
-    # Construct the raw feature dictionary with lifespan-specific keys
-    raw_dict = {
+
+def lifespan_raw_row(data, age):
+    """Raw (pre one-hot) lifespan-model row with the lifespan-specific keys."""
+    return {
         "Age_at_Condition": age,
         "dog_insurance": data.insurance.lower() == "yes",
         "hs_condition": data.disease,
@@ -39,10 +73,14 @@ def preprocess_lifespan(data, model_cols):
         "dd_breed_mixed_secondary": data.secondaryBreed,
         "df_primary_diet_component": normalize_diet_component_lifespan(data.primaryDiet),
         "mp_vaccination_status": 1 if data.vaccinationStatus.lower() == "current" else 0,
-        "weight_lbs": 0 if age < 8 else data.weight * 2.20462,
+        "weight_lbs": float(lifespan_weight_lbs(age, data.weight)),
         "pa_avg_activity_intensity": map_activity_intensity(data.activityIntensity),
     }
-    df = pd.DataFrame([raw_dict])
+
+
+def encode_lifespan_rows(raw_rows, model_cols):
+    """One-hot encode raw lifespan rows and align them to the training column order."""
+    df = pd.DataFrame(raw_rows)
 
     # Handle specific naming typos found in the saved model columns
     if 'mp_vacciNaNtion_status' in model_cols:
@@ -50,14 +88,25 @@ def preprocess_lifespan(data, model_cols):
 
     # One-Hot Encode and reindex to match training column order
     df_encoded = pd.get_dummies(df)
-    return df_encoded.reindex(columns=model_cols, fill_value=0), age
+    return df_encoded.reindex(columns=model_cols, fill_value=0)
 
 
-def preprocess_basic_disease(data, age, encoders, features_list):
+def preprocess_lifespan(data, model_cols):
     """
-    Prepares data for the 19-feature Disease prediction model using Label Encoding.
+    Prepares data for the Lifespan prediction model using One-Hot encoding alignment.
     """
-    feature_dict = {
+    age = dog_age(data)
+    return encode_lifespan_rows([lifespan_raw_row(data, age)], model_cols), age
+
+
+# Categorical columns of the 19-feature model that use the saved Label Encoders
+BASIC_ENCODED_COLS = ['Sex_Class_at_HLES', 'Breed_Status', 'Weight_Class_5KGBin_at_HLES',
+                      'LifeStage_Class_at_HLES', 'df_primary_diet_component', 'df_appetite']
+
+
+def basic_disease_raw_row(data, age):
+    """Raw (pre label-encoding) 19-feature row."""
+    return {
         'Estimated_Age_Years_at_HLES': float(age),
         'Sex_Class_at_HLES': str(data.sex),
         'Breed_Status': "Purebred" if str(data.breedState).lower() == "pure" else "Mixed Breed",
@@ -78,35 +127,39 @@ def preprocess_basic_disease(data, age, encoders, features_list):
         'od_annual_income_range_usd': str(data.annualIncome),
         'cv_population_density': str(data.homeArea),  # Proxy using homeArea
     }
-    df = pd.DataFrame([feature_dict])
+
+
+def encode_basic_disease_rows(raw_rows, encoders, features_list):
+    """Label-encode raw 19-feature rows; unseen labels and non-numeric values become 0."""
+    df = pd.DataFrame(raw_rows)
 
     # Apply saved Label Encoders to categorical columns
-    encoded_cols = ['Sex_Class_at_HLES', 'Breed_Status', 'Weight_Class_5KGBin_at_HLES',
-                    'LifeStage_Class_at_HLES', 'df_primary_diet_component', 'df_appetite']
-    for col in encoded_cols:
+    for col in BASIC_ENCODED_COLS:
         if col in encoders:
-            try:
-                val = str(df[col].iloc[0]).strip()
-                df[col] = float(encoders[col].transform([val])[0])
-            except:
-                df[col] = 0.0  # Default fallback for unseen labels
+            codes = {label: float(code) for code, label in enumerate(encoders[col].classes_)}
+            df[col] = df[col].astype(str).str.strip().map(codes).fillna(0.0)  # 0 for unseen labels
 
     # Ensure all remaining columns are numeric
     for col in df.columns:
-        if col not in encoded_cols:
+        if col not in BASIC_ENCODED_COLS:
             df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0)
 
     return df.astype(float)[features_list]
 
 
-# preprocessor.py
+def preprocess_basic_disease(data, age, encoders, features_list):
+    """
+    Prepares data for the 19-feature Disease prediction model using Label Encoding.
+    """
+    return encode_basic_disease_rows([basic_disease_raw_row(data, age)], encoders, features_list)
 
-def preprocess_detailed_disease(data, age, encoders, features_list):
+
+def detailed_disease_raw_row(data, age):
     """
-    Prepares data for the 67-feature Precision Disease prediction model.
+    Raw (pre label-encoding) 67-feature row.
     Uses explicit type conversion (str/float) to resolve StringDtype errors.
     """
-    feature_dict = {
+    return {
         # --- Basic Features (Explicit Conversion) ---
         'Estimated_Age_Years_at_HLES': float(age),
         'Sex_Class_at_HLES': str(data.sex),
@@ -181,23 +234,33 @@ def preprocess_detailed_disease(data, age, encoders, features_list):
         'cslb_score': float(50.0)  # 认知健康评分中位数
     }
 
-    # Create DataFrame from explicitly typed dictionary
-    df = pd.DataFrame([feature_dict])
 
-    # 1. Apply Label Encoders
+
+def encode_detailed_disease_rows(raw_rows, encoders, features_list):
+    """Label-encode raw 67-feature rows; unseen labels and non-numeric values become 0."""
+    # Create DataFrame from explicitly typed dictionaries
+    df = pd.DataFrame(raw_rows)
+
+    # 1. Map 0/1 answers to their training codes, then apply Label Encoders
     for col in df.columns:
-        if col in encoders:
-            try:
-                # Ensure the value is treated as a plain Python string
-                val = str(df[col].iloc[0]).strip()
-                df[col] = float(encoders[col].transform([val])[0])
-            except:
-                df[col] = 0.0
+        if col in ANSWER_CODES:
+            df[col] = df[col].astype(str).str.strip().str.lower().map(ANSWER_CODES[col]).fillna(0.0)
+        elif col in encoders:
+            codes = {label: float(code) for code, label in enumerate(encoders[col].classes_)}
+            df[col] = df[col].astype(str).str.strip().map(codes).fillna(0.0)  # 0 for unseen labels
 
     # 2. CRITICAL FIX: Break the StringDtype lock by converting to standard object first
     for col in df.columns:
-        # Converting to 'object' reverts Pandas specialized strings to standard Python strings
-        df[col] = pd.to_numeric(df[col].astype(object), errors='coerce').fillna(0.0)
+        if df[col].dtype != float:
+            # Converting to 'object' reverts Pandas specialized strings to standard Python strings
+            df[col] = pd.to_numeric(df[col].astype(object), errors='coerce').fillna(0.0)
 
     # 3. Return the specific features as standard floats
     return df[features_list].astype(float)
+
+
+def preprocess_detailed_disease(data, age, encoders, features_list):
+    """
+    Prepares data for the 67-feature Precision Disease prediction model.
+    """
+    return encode_detailed_disease_rows([detailed_disease_raw_row(data, age)], encoders, features_list)
@@ -0,0 +1,18 @@
+# responses.py
+"""
+orjson responses for the prediction endpoints.
+
+Endpoints that return a FastJSONResponse skip FastAPI's jsonable_encoder, which
+walks and copies every nested dict and list of the result. orjson then writes the
+response in one native pass (numpy arrays and scalars included), so the cost
+grows linearly with the response size and stays small per element.
+"""
+import orjson
+from fastapi.responses import Response
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
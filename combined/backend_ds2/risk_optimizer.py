@@ -0,0 +1,125 @@
+# risk_optimizer.py
+"""
+Counterfactual care changes that lower the advanced (67-feature) disease risks.
+
+Each modifiable answer feeds exactly one model feature, so changing it to another
+option moves every disease's log-odds by coef[:, feature] * (new code - old code) / scale.
+All candidate changes are scored with one (candidates x diseases) product instead
+of re-running the models. A greedy search then picks, at most once per field, the
+change that lowers the mean risk the most, and stops when the next change gains
+less than MIN_RISK_GAIN. Because the shifts add up exactly in log-odds, each step
+is exact rather than an approximation.
+"""
+import numpy as np
+from scipy.special import expit
+
+from preprocessor import ANSWER_CODES, encode_detailed_value
+from model_store import DISEASES
+
+# Detailed-form field -> (label shown to the user, options the owner can switch to).
+# Preventive care is only ever suggested in the protective direction, whatever the model's sign.
+# The Yes/No-style answers only have a training code when MAP_DETAILED_ANSWERS is on
+# (preprocessor.ANSWER_CODES); otherwise every option encodes to 0 and they are not considered.
+# Dental brushing and diet consistency are left out: their form answers have no training code.
+MODIFIABLE_FIELDS = {
+    "df_daily_supplements": ("Daily Supplements", ["Yes", "No"]),
+    "df_daily_supplements_glucosamine": ("Glucosamine", ["Yes", "No"]),
+    "df_daily_supplements_omega3": ("Omega-3", ["Yes", "No"]),
+    "mp_flea_and_tick_treatment": ("Flea/Tick Treatment", ["Monthly"]),
+    "mp_heartworm_preventative": ("Heartworm Prevention", ["Yes"]),
+    "de_nighttime_sleep_avg_hours": ("Nighttime Sleep", None),
+    "de_daytime_sleep_avg_hours": ("Daytime Sleep", None),
+}
+# Sleep is searched in whole-hour steps around the current value, kept within a plausible range
+SLEEP_STEPS = [-2, -1, 1, 2]
+SLEEP_RANGES = {"de_nighttime_sleep_avg_hours": (6.0, 12.0), "de_daytime_sleep_avg_hours": (0.0, 8.0)}
+
+MAX_CHANGES = 3
+MIN_RISK_GAIN = 0.005  # mean risk (0-1) a change must remove to be suggested
+
+
+def considered_fields():
+    """Modifiable fields whose options encode to distinct model inputs: sleep, plus coded answers."""
+    return [field for field, (_, options) in MODIFIABLE_FIELDS.items() if options is None or field in ANSWER_CODES]
+
+
+def candidate_changes(dog):
+    """(field, new value) pairs for the considered fields that differ from the dog's current answers."""
+    for field in considered_fields():
+        options = MODIFIABLE_FIELDS[field][1]
+        current = getattr(dog, field)
+        if field in SLEEP_RANGES:
+            low, high = SLEEP_RANGES[field]
+            options = sorted({min(high, max(low, float(current) + step)) for step in SLEEP_STEPS})
+            options = [hours for hours in options if hours != float(current)]
+        else:
+            options = [option for option in options if option.lower() != str(current).strip().lower()]
+        for option in options:
+            yield field, option
+
+
+def optimize_disease_risk(dog, X, models_dict, diseases=DISEASES, max_changes=MAX_CHANGES, min_gain=MIN_RISK_GAIN):
+    """
+    Smallest set of care changes (one option per field) with the largest drop in the mean
+    risk of the listed diseases. X is the dog's unscaled 67-feature row from
+    preprocess_detailed_disease; models_dict must carry the stacked linear terms
+    (see explain.attach_linear_terms).
+    """
+    features = list(models_dict["features"])
+    rows = [DISEASES.index(d) for d in diseases]
+    coef, scale = models_dict["coef"][rows], models_dict["scaler"].scale_
+    x = np.asarray(X, dtype=float)[0]
+    base_logit = coef @ models_dict["scaler"].transform(X)[0] + models_dict["intercept"][rows]
+
+    # Log-odds shift of every candidate change for every disease, in one product
+    candidates, columns, steps = [], [], []
+    for field, option in candidate_changes(dog):
+        if field not in features:
+            continue
+        i = features.index(field)
+        step = (encode_detailed_value(field, option, models_dict["encoders"]) - x[i]) / scale[i]
+        if step != 0:
+            candidates.append((field, option))
+            columns.append(i)
+            steps.append(step)
+    shifts = np.asarray(steps)[:, np.newaxis] * coef[:, columns].T if candidates else np.zeros((0, len(coef)))
+
+    # Greedy forward selection; shifts of different fields add exactly in log-odds
+    logit = base_logit.copy()
+    risk = base_risk = float(expit(logit).mean())
+    chosen, used_fields = [], set()
+    for _ in range(max_changes):
+        open_rows = np.array([field not in used_fields for field, _ in candidates], dtype=bool)
+        if not open_rows.any():
+            break
+        trial = expit(logit + shifts).mean(axis=1)
+        trial[~open_rows] = np.inf
+        best = int(np.argmin(trial))
+        if risk - trial[best] < min_gain:
+            break
+        field, option = candidates[best]
+        chosen.append((field, option, risk - float(trial[best])))
+        used_fields.add(field)
+        logit = logit + shifts[best]
+        risk = float(trial[best])
+
+    changes = {}
+    for field, option, gain in chosen:
+        label = MODIFIABLE_FIELDS[field][0]
+        changes[label] = f"Consider changing ({getattr(dog, field)} -> {option}), lowers average risk by {gain * 100:.1f} points"
+
+    # --- SAFETY NET --- (same affirmation as the lifespan optimizer when nothing helps enough)
+    if not changes:
+        changes["Excellent Care"] = "Great job! None of the care changes we model would meaningfully lower your dog's disease risk."
+
+    return {
+        "original_average_risk": round(base_risk * 100, 1),
+        "optimized_average_risk": round(risk * 100, 1),
+        "risk_reduction": round((base_risk - risk) * 100, 1),
+        "optimized_risks": {
+            disease.upper(): round(float(p) * 100, 1)
+            for disease, p in zip(diseases, expit(logit))
+        },
+        "suggested_changes": changes,
+        "levers_considered": [MODIFIABLE_FIELDS[field][0] for field in considered_fields() if field in features],
+    }
@@ -1,5 +1,5 @@
 # schemas.py
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 from typing import Optional
 
 class DogHealthData(BaseModel):
@@ -54,4 +54,93 @@ class DetailedDogHealthData(DogHealthData):
     de_stairs_in_home: str
     oc_household_person_count: int
     oc_household_child_count: int
-    de_other_present_animals_dogs: int
\ No newline at end of file
+    de_other_present_animals_dogs: int
+
+# Answers accepted by the strict schemas, in canonical spelling (matched case-insensitively).
+# The index of an answer in its list is the option code the model-input tables are keyed by.
+INCOME_OPTIONS = [f"${i * 25000} - ${(i + 1) * 25000}" for i in range(10)] + ["$250,000+", "250000+"]
+CATEGORY_OPTIONS = {
+    "birthMonth": ["January", "February", "March", "April", "May", "June", "July", "August",
+                   "September", "October", "November", "December"],
+    "sex": ["Male", "Female", "Male, neutered", "Male, intact", "Female, spayed", "Female, intact"],
+    "breedState": ["Pure", "Mixed"],
+    "activityIntensity": ["Light", "Moderate", "Intense"],
+    "activityLevel": ["Low", "Moderate", "High", "Very High"],
+    "primaryDiet": ["Commercial kibble", "Commercial wet", "Freeze-dried", "Home cooked", "Raw", "Other"],
+    "appetiteLevel": ["Poor", "Normal", "Excellent"],
+    "fearOfNoises": ["Yes", "No"],
+    "aggressionOnLeash": ["None", "Mild", "Moderate", "Severe"],
+    "homeType": ["House", "Apartment", "Condo"],
+    "homeArea": ["Urban", "Suburban", "Rural"],
+    "leadPresent": ["Yes", "No"],
+    "annualIncome": INCOME_OPTIONS,
+    "spayedNeutered": ["Yes", "No"],
+    "vaccinationStatus": ["Current", "Not Current"],
+    "insurance": ["Yes", "No"],
+}
+DETAILED_CATEGORY_OPTIONS = {
+    "df_diet_consistency": ["Consistent", "Variable", "Unknown"],
+    "df_appetite_change_last_year": ["Yes", "No", "Unknown"],
+    "df_ever_overweight": ["Yes", "No", "Unknown"],
+    "df_daily_supplements": ["Yes", "No"],
+    "df_daily_supplements_glucosamine": ["Yes", "No"],
+    "df_daily_supplements_omega3": ["Yes", "No"],
+    "db_fear_level_unknown_situations": ["Low", "Moderate", "High", "Unknown"],
+    "db_left_alone_barking_frequency": ["Never", "Rarely", "Often", "Unknown"],
+    "db_attention_seeking_follows_humans_frequency": ["Rarely", "Sometimes", "Often", "Unknown"],
+    "mp_dental_brushing_frequency": ["Never", "Rarely", "Sometimes", "Daily"],
+    "mp_flea_and_tick_treatment": ["Monthly", "Annually", "Never", "Yes", "No", "Unknown"],
+    "mp_heartworm_preventative": ["Yes", "No", "Unknown"],
+    "de_drinking_water_source": ["Tap", "Filtered", "Bottled", "Well"],
+    "de_radon_present": ["Yes", "No", "Unknown"],
+    "de_central_air_conditioning_present": ["Yes", "No"],
+    "de_stairs_in_home": ["Yes", "No"],
+}
+# field -> {canonical answer: option code}
+OPTION_CODES = {
+    field: {answer: code for code, answer in enumerate(options)}
+    for field, options in {**CATEGORY_OPTIONS, **DETAILED_CATEGORY_OPTIONS}.items()
+}
+_CANONICAL = {
+    field: {answer.lower(): answer for answer in options}
+    for field, options in {**CATEGORY_OPTIONS, **DETAILED_CATEGORY_OPTIONS}.items()
+}
+
+
+def canonical_answer(field, value):
+    """The canonical spelling of an allowed answer; ValueError listing the options otherwise."""
+    answer = _CANONICAL[field].get(str(value).strip().lower())
+    if answer is None:
+        raise ValueError(f"must be one of: {', '.join(OPTION_CODES[field])}")
+    return answer
+
+
+class StrictDogHealthData(DogHealthData):
+    """DogHealthData that only accepts the CATEGORY_OPTIONS answers and in-range numbers."""
+
+    birthYear: int = Field(ge=1990)
+    weight: float = Field(gt=0, le=120)
+    dailyActiveHours: float = Field(ge=0, le=24)
+
+    @field_validator(*CATEGORY_OPTIONS, mode="before")
+    @classmethod
+    def resolve_answer(cls, value, info):
+        return canonical_answer(info.field_name, value)
+
+
+class StrictDetailedDogHealthData(StrictDogHealthData, DetailedDogHealthData):
+    """DetailedDogHealthData with the strict checks, plus the DETAILED_CATEGORY_OPTIONS answers."""
+
+    pa_moderate_weather_daily_hours_outside: float = Field(ge=0, le=24)
+    pa_hot_weather_months_per_year: float = Field(ge=0, le=12)
+    pa_cold_weather_months_per_year: float = Field(ge=0, le=12)
+    de_nighttime_sleep_avg_hours: float = Field(ge=0, le=24)
+    de_daytime_sleep_avg_hours: float = Field(ge=0, le=24)
+    oc_household_person_count: int = Field(ge=0, le=50)
+    oc_household_child_count: int = Field(ge=0, le=50)
+    de_other_present_animals_dogs: int = Field(ge=0, le=50)
+
+    @field_validator(*DETAILED_CATEGORY_OPTIONS, mode="before")
+    @classmethod
+    def resolve_detailed_answer(cls, value, info):
+        return canonical_answer(info.field_name, value)
@@ -0,0 +1,121 @@
+# sensitivity.py
+"""
+Finite-difference sensitivities of the lifespan prediction and disease risks.
+
+For each continuous input in the request body, the model rows are evaluated at
+value + step and value - step (kept at or above 0). The central difference is the
+change per unit. Like the trajectory curves, each family's row is preprocessed
+once and repeated for every perturbation. Only the columns an input feeds are
+rewritten, one strided column assignment per input, so each family scores all
+perturbations in one batch.
+"""
+import numpy as np
+import pandas as pd
+
+from explain import feature_field
+from model_store import DISEASES
+from preprocessor import encode_detailed_value, lifespan_weight_lbs
+from trajectory import batch_risks
+from utils import map_weight_to_class
+
+# Continuous request field -> finite-difference step (kg, hours or counts)
+SENSITIVITY_STEPS = {
+    "weight": 1.0,
+    "dailyActiveHours": 0.5,
+    "pa_moderate_weather_daily_hours_outside": 0.5,
+    "de_nighttime_sleep_avg_hours": 0.5,
+    "de_daytime_sleep_avg_hours": 0.5,
+    "oc_household_person_count": 1.0,
+    "oc_household_child_count": 1.0,
+    "de_other_present_animals_dogs": 1.0,
+}
+
+# Lifespan model column fed by a request field, and its values for (field values, age)
+LIFESPAN_COLUMNS = {
+    "weight": ("weight_lbs", lambda values, age: lifespan_weight_lbs(age, values)),
+    "dailyActiveHours": ("pa_avg_daily_active_hours", lambda values, age: values),
+}
+
+
+def perturbations(dog):
+    """Continuous inputs present in the body, with their upper and lower evaluation points."""
+    inputs = [name for name in SENSITIVITY_STEPS if hasattr(dog, name)]
+    values = np.array([float(getattr(dog, name)) for name in inputs])
+    steps = np.array([SENSITIVITY_STEPS[name] for name in inputs])
+    return inputs, values + steps, np.maximum(values - steps, 0.0)
+
+
+def disease_value(feature, value, encoders):
+    """Encoded disease-model input for a perturbed request value."""
+    if feature == "Weight_Class_5KGBin_at_HLES":
+        value = map_weight_to_class(value)
+    return encode_detailed_value(feature, value, encoders)
+
+
+def perturbed_rows(df, inputs, values, column_values):
+    """
+    df's row repeated once per value; row k holds values[k] for inputs[k % len(inputs)].
+    column_values(input, input_values) gives {column index: new values} for the columns that input feeds.
+    """
+    block = np.repeat(np.asarray(df, dtype=float)[:1], len(values), axis=0)
+    for j, name in enumerate(inputs):
+        rows = slice(j, None, len(inputs))
+        for column, new in column_values(name, values[rows]).items():
+            block[rows, column] = new
+    return pd.DataFrame(block, columns=df.columns)
+
+
+def central_differences(outputs, upper, lower):
+    """(f(upper) - f(lower)) / (upper - lower) for outputs stacked as [upper rows; lower rows]."""
+    n = len(upper)
+    return (outputs[:n] - outputs[n:]) / (upper - lower).reshape((n,) + (1,) * (outputs.ndim - 1))
+
+
+def lifespan_sensitivities(ml_models, df_l, age, inputs, upper, lower):
+    """Change in predicted remaining years per unit of each input."""
+    columns = list(df_l.columns)
+
+    def column_values(name, values):
+        if name not in LIFESPAN_COLUMNS or LIFESPAN_COLUMNS[name][0] not in columns:
+            return {}
+        column, encode = LIFESPAN_COLUMNS[name]
+        return {columns.index(column): encode(values, age)}
+
+    rows = perturbed_rows(df_l, inputs, np.concatenate([upper, lower]), column_values)
+    return central_differences(np.asarray(ml_models["lifespan"].predict(rows), dtype=float), upper, lower)
+
+
+def risk_sensitivities(models_dict, df, inputs, upper, lower):
+    """Change in each disease risk (0-100 points) per unit of each input; inputs x diseases."""
+    encoders = models_dict["encoders"]
+    fields = [feature_field(feature) for feature in df.columns]
+
+    def column_values(name, values):
+        return {
+            i: [disease_value(feature, value, encoders) for value in values]
+            for i, (feature, field) in enumerate(zip(df.columns, fields)) if field == name
+        }
+
+    rows = perturbed_rows(df, inputs, np.concatenate([upper, lower]), column_values)
+    return central_differences(batch_risks(models_dict, rows) * 100, upper, lower)
+
+
+def sensitivity_report(inputs, lifespan, risks):
+    """
+    One entry per input, largest mover first (by the biggest risk change over one step).
+    risks maps model family label ("basic"/"advanced") -> inputs x diseases array.
+    """
+    report, impact = [], []
+    for k, name in enumerate(inputs):
+        entry = {
+            "input": name,
+            "step": SENSITIVITY_STEPS[name],
+            "lifespan_years_per_unit": round(float(lifespan[k]), 4),
+        }
+        for label, per_unit in risks.items():
+            entry[f"{label}_risk_per_unit"] = {
+                d.upper(): round(float(per_unit[k, i]), 4) for i, d in enumerate(DISEASES)
+            }
+        report.append(entry)
+        impact.append(max(np.abs(per_unit[k]).max() for per_unit in risks.values()) * SENSITIVITY_STEPS[name])
+    return [report[k] for k in np.argsort(-np.asarray(impact), kind="stable")]
@@ -0,0 +1,118 @@
+# shadow.py
+"""
+Shadow scoring of candidate model versions on live traffic.
+
+When SHADOW_LIFESPAN_VERSION / SHADOW_BASIC_VERSION / SHADOW_ADVANCED_VERSION name
+a candidate version, each request's input is queued after its response has been
+sent. A single background worker then scores the input with the candidate and
+appends the per-disease deltas against the served prediction, plus timings, to a
+JSON-lines log. The queue is bounded: when it is full the shadow work is dropped,
+so the primary path never waits on it.
+"""
+import asyncio
+import json
+import os
+import time
+
+from codes import lifespan_input, basic_disease_input, detailed_disease_input
+from model_store import DISEASES, UNSCALED_MODEL_KINDS, active, get_set
+
+# Candidate version per family; unset families are not shadowed
+SHADOW_VERSIONS = {
+    family: os.getenv(env_var)
+    for family, env_var in [
+        ("lifespan", "SHADOW_LIFESPAN_VERSION"),
+        ("19feat", "SHADOW_BASIC_VERSION"),
+        ("67feat", "SHADOW_ADVANCED_VERSION"),
+    ]
+    if os.getenv(env_var)
+}
+SHADOW_QUEUE_SIZE = int(os.getenv("SHADOW_QUEUE_SIZE", "100"))
+SHADOW_LOG = os.getenv("SHADOW_LOG", "logs/shadow.jsonl")
+
+shadow_stats = {"enqueued": 0, "dropped": 0, "completed": 0, "failed": 0}
+_queue = None
+
+
+def submit_shadow(family, dog, age, primary, primary_version, primary_ms):
+    """
+    Queue one request for shadow scoring (run as a background task after the response).
+    primary is {disease: probability} (or {"lifespan": years}) as served to the client.
+    """
+    candidate = SHADOW_VERSIONS.get(family)
+    if _queue is None or candidate is None or candidate == primary_version:
+        return
+    try:
+        _queue.put_nowait((family, candidate, dog, age, primary, primary_version, primary_ms))
+        shadow_stats["enqueued"] += 1
+    except asyncio.QueueFull:
+        shadow_stats["dropped"] += 1
+
+
+def _score(family, candidate_set, dog, age):
+    """Candidate predictions in the same shape as the primary ones."""
+    if family == "lifespan":
+        df_l, _ = lifespan_input(dog, candidate_set)
+        return {"lifespan": float(candidate_set["lifespan"].predict(df_l)[0])}
+
+    model_input = basic_disease_input if family == "19feat" else detailed_disease_input
+    X = model_input(dog, age, candidate_set)
+    if candidate_set["kind"] not in UNSCALED_MODEL_KINDS:
+        X = candidate_set["scaler"].transform(X)
+    return {d: float(candidate_set["models"][d].predict_proba(X)[0][1]) for d in DISEASES}
+
+
+def _append_log(record):
+    os.makedirs(os.path.dirname(SHADOW_LOG) or ".", exist_ok=True)
+    with open(SHADOW_LOG, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+async def shadow_worker():
+    """Background task: score queued requests with the candidate sets, one at a time."""
+    while True:
+        family, candidate, dog, age, primary, primary_version, primary_ms = await _queue.get()
+        try:
+            candidate_set = await get_set(family, candidate)
+            start = time.perf_counter()
+            shadow = await asyncio.to_thread(_score, family, candidate_set, dog, age)
+            shadow_ms = (time.perf_counter() - start) * 1000
+            deltas = {key: round(shadow[key] - primary[key], 6) for key in primary}
+            record = {
+                "ts": time.time(),
+                "family": family,
+                "primary_version": primary_version,
+                "candidate_version": candidate,
+                "deltas": deltas,
+                "max_abs_delta": max(abs(v) for v in deltas.values()),
+                "primary_ms": round(primary_ms, 3),
+                "shadow_ms": round(shadow_ms, 3),
+            }
+            await asyncio.to_thread(_append_log, record)
+            shadow_stats["completed"] += 1
+        except KeyError:
+            shadow_stats["failed"] += 1
+            print(f"❌ Shadow candidate {family} {candidate} does not exist.")
+        except Exception as e:
+            shadow_stats["failed"] += 1
+            print(f"❌ Shadow scoring with {family} {candidate} failed: {e}")
+
+
+def start_shadow():
+    """Create the queue and worker task when any candidate is configured (called at startup)."""
+    global _queue
+    if not SHADOW_VERSIONS:
+        return None
+    _queue = asyncio.Queue(maxsize=SHADOW_QUEUE_SIZE)
+    print(f"👥 Shadow scoring candidates: {SHADOW_VERSIONS}")
+    return asyncio.create_task(shadow_worker())
+
+
+def shadow_summary():
+    """Configured candidates, served versions and queue counters."""
+    return {
+        "candidates": SHADOW_VERSIONS,
+        "served": {family: active.get(family, {}).get("version") for family in SHADOW_VERSIONS},
+        "queued": _queue.qsize() if _queue is not None else 0,
+        **shadow_stats,
+    }
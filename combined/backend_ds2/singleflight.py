@@ -0,0 +1,59 @@
+# singleflight.py
+"""
+Single-flight coalescing of identical in-flight prediction requests.
+
+A double-submit or retry from the frontend sends the same body again while the
+first request is still running. Each request is keyed on a hash of its canonical
+payload (sorted-key JSON of the validated body, the endpoint, the resolved model
+versions and the options). The first request with a key runs the computation in a
+worker thread. Requests with the same key that arrive before it finishes await
+that result instead of computing again. The computation runs as its own task, so
+a waiter that disconnects does not cancel it for the others.
+"""
+import asyncio
+import hashlib
+
+import orjson
+
+singleflight_stats = {}
+_inflight = {}
+
+
+def request_key(endpoint, dog, **params):
+    """Hash of the canonical payload: endpoint, validated body and options (versions included)."""
+    payload = {"endpoint": endpoint, "dog": dog.model_dump(), "params": params}
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def _count(endpoint, outcome):
+    stats = singleflight_stats.setdefault(endpoint, {"computed": 0, "coalesced": 0, "failed": 0})
+    stats[outcome] += 1
+
+
+async def single_flight(endpoint, key, fn, *args):
+    """Result of fn(*args) run in a thread, shared by every concurrent request with the same key."""
+    task = _inflight.get(key)
+    if task is not None:
+        _count(endpoint, "coalesced")
+        return await asyncio.shield(task)
+
+    task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    _inflight[key] = task
+    task.add_done_callback(lambda _: _inflight.pop(key, None))
+    _count(endpoint, "computed")
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        _count(endpoint, "failed")
+        raise
+
+
+def singleflight_summary():
+    """Per-endpoint computed / coalesced / failed counts, dedup rate and requests in flight."""
+    endpoints = {}
+    for endpoint, s in singleflight_stats.items():
+        total = s["computed"] + s["coalesced"]
+        endpoints[endpoint] = {**s, "dedup_rate": round(s["coalesced"] / total, 4) if total else None}
+    return {"in_flight": len(_inflight), "endpoints": endpoints}
@@ -0,0 +1,118 @@
+# conftest.py
+"""
+Shared fixtures for the backend tests (run pytest from combined/backend_ds2).
+
+The flat backend modules are put on sys.path. Model sets are loaded once per
+session from models/; a family whose artifacts are missing is skipped. The
+sample bodies only use canonical answers, so they pass the strict schemas too.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASIC_BODY = dict(
+    dogName="Rex", birthMonth="March", birthYear=2016, sex="Male, neutered", weight=22.0,
+    breedState="Pure", breed="Labrador Retriever", dailyActiveHours=2.0, activityIntensity="Moderate",
+    activityLevel="Moderate", primaryDiet="Commercial kibble", appetiteLevel="Normal",
+    fearOfNoises="No", aggressionOnLeash="None", homeType="House", homeArea="Suburban",
+    leadPresent="No", annualIncome="$50000 - $75000", spayedNeutered="Yes",
+    vaccinationStatus="Current", insurance="No",
+)
+DETAILED_BODY = dict(
+    BASIC_BODY, pa_moderate_weather_daily_hours_outside=3.0, pa_hot_weather_months_per_year=3,
+    pa_cold_weather_months_per_year=3, df_diet_consistency="Consistent", df_appetite_change_last_year="No",
+    df_ever_overweight="No", df_daily_supplements="No", df_daily_supplements_glucosamine="No",
+    df_daily_supplements_omega3="No", db_fear_level_unknown_situations="Low",
+    db_left_alone_barking_frequency="Rarely", db_attention_seeking_follows_humans_frequency="Often",
+    mp_dental_brushing_frequency="Never", mp_flea_and_tick_treatment="Monthly", mp_heartworm_preventative="Yes",
+    de_nighttime_sleep_avg_hours=9, de_daytime_sleep_avg_hours=3, de_drinking_water_source="Tap",
+    de_radon_present="No", de_central_air_conditioning_present="Yes", de_stairs_in_home="Yes",
+    oc_household_person_count=3, oc_household_child_count=1, de_other_present_animals_dogs=1,
+)
+
+_sets = {}
+
+
+@pytest.fixture(scope="session")
+def model_set():
+    """model_set(family) -> the family's current artifact set, or a skip when it cannot be loaded."""
+    from model_store import load_family
+
+    def get(family):
+        if family not in _sets:
+            try:
+                _sets[family] = load_family(family)
+            except Exception as e:
+                _sets[family] = e
+        if isinstance(_sets[family], Exception):
+            pytest.skip(f"{family} models not available: {_sets[family]}")
+        return _sets[family]
+
+    return get
+
+
+def write_version(root, name, source, family="19feat", break_scaler=False):
+    """Copy a legacy flat set into root/name with a manifest; break_scaler makes every prediction NaN."""
+    import json
+    import pickle
+    import shutil
+
+    from artifacts import LEGACY_LAYOUTS, MANIFEST_FILE, content_hash, file_sha256
+
+    version_dir = root / name
+    shutil.copytree(source, version_dir)
+    roles = LEGACY_LAYOUTS[family]
+    if break_scaler:
+        path = version_dir / roles["scaler"]
+        with open(path, "rb") as f:
+            scaler = pickle.load(f)
+        scaler.mean_ = scaler.mean_ * float("nan")
+        with open(path, "wb") as f:
+            pickle.dump(scaler, f)
+    files = {p.name: file_sha256(p) for p in version_dir.iterdir() if p.suffix in (".pkl", ".joblib")}
+    manifest = {"version": name, "family": family, "roles": roles, "files": files,
+                "content_hash": content_hash(files), "metrics": {}}
+    (version_dir / MANIFEST_FILE).write_text(json.dumps(manifest))
+
+
+@pytest.fixture
+def versioned_19feat(tmp_path, monkeypatch):
+    """
+    A versioned 19feat directory in tmp_path with good sets v1 and v2 and a broken set "bad",
+    CURRENT at v1 and v1 active. Returns point(version), which rewrites CURRENT.
+    The store's module state is emptied for the test and restored afterwards.
+    """
+    import asyncio
+
+    import model_store
+    from artifacts import CURRENT_FILE
+
+    source = model_store.MODEL_DIRS["19feat"]
+    if not source.is_dir():
+        pytest.skip(f"{source} not available")
+    for name in ("v1", "v2"):
+        write_version(tmp_path, name, source)
+    write_version(tmp_path, "bad", source, break_scaler=True)
+
+    def point(version):
+        (tmp_path / CURRENT_FILE).write_text(version)
+
+    point("v1")
+    monkeypatch.setitem(model_store.MODEL_DIRS, "19feat", tmp_path)
+    monkeypatch.setattr(model_store, "FAMILIES", ["19feat"])
+    monkeypatch.setattr(model_store, "_reload_lock", asyncio.Lock())
+    saved = [(d, dict(d)) for d in (model_store.active, model_store.resident, model_store._pending_loads)]
+    saved_failed = set(model_store._failed_versions)
+    for d, _ in saved:
+        d.clear()
+    model_store._failed_versions.clear()
+    model_store.active["19feat"] = model_store.load_validated("19feat")
+    yield point
+    for d, contents in saved:
+        d.clear()
+        d.update(contents)
+    model_store._failed_versions.clear()
+    model_store._failed_versions.update(saved_failed)
@@ -0,0 +1,18 @@
+# test_admission.py
+import admission
+from admission import take_token
+
+
+def test_token_bucket_is_off_by_default():
+    assert admission.RATE_LIMIT_PER_SECOND == 0
+    assert all(take_token("client", now=0.0) == 0 for _ in range(100))
+
+
+def test_token_bucket_limits_each_client(monkeypatch):
+    monkeypatch.setattr(admission, "RATE_LIMIT_PER_SECOND", 5.0)
+    monkeypatch.setattr(admission, "RATE_LIMIT_BURST", 3.0)
+    monkeypatch.setattr(admission, "_buckets", {})
+    assert [take_token("a", now=0.0) for _ in range(3)] == [0, 0, 0]
+    assert take_token("a", now=0.0) == 1 / 5.0  # seconds until the next token
+    assert take_token("b", now=0.0) == 0  # other clients keep their own bucket
+    assert take_token("a", now=0.2) == 0  # refilled one token
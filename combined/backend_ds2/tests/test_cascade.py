@@ -0,0 +1,41 @@
+# test_cascade.py
+import threading
+
+import pytest
+
+import cascade
+from cascade import cascade_summary, escalated, record_request
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    monkeypatch.setattr(cascade, "cascade_stats", dict.fromkeys(cascade.cascade_stats, 0))
+
+
+def test_escalates_only_the_uncertainty_band():
+    assert escalated(["a", "b", "c", "d"], [0.1, 0.25, 0.6, 0.9], low=0.25, high=0.75) == ["b", "c"]
+
+
+def test_saving_only_counts_cascades_that_skipped_a_model():
+    record_request(False, 5, 0, 100.0, 60.0)
+    record_request(True, 5, 5, 110.0, 60.0)  # escalated everything: full work, no saving
+    record_request(True, 5, 1, 50.0, 10.0)
+    summary = cascade_summary()
+    assert summary["requests_with_skips"] == 1
+    assert summary["mean_saved_ms"] == 50.0
+    assert summary["cascade_rate"] == 0.6
+
+
+def test_counters_are_consistent_across_threads():
+    def worker():
+        for _ in range(2000):
+            record_request(True, 5, 2, 1.0, 0.5)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    summary = cascade_summary()
+    assert summary["cascade_requests"] == 16000
+    assert summary["diseases_escalated"] == 32000
@@ -0,0 +1,65 @@
+# test_codes.py
+"""
+Rows gathered from the option-code tables must equal the normal preprocessing
+for random strict bodies, for the lifespan, 19feat and 67feat sets.
+"""
+import random
+
+import numpy as np
+import pytest
+
+from codes import basic_disease_input, detailed_disease_input, lifespan_input
+from preprocessor import preprocess_basic_disease, preprocess_detailed_disease, preprocess_lifespan
+from schemas import CATEGORY_OPTIONS, DETAILED_CATEGORY_OPTIONS, StrictDetailedDogHealthData, StrictDogHealthData
+
+
+def random_body(rng, conditions, breeds):
+    """Every answer drawn from its options (in mixed case), numeric fields on and off the class edges."""
+    def any_case(s):
+        return rng.choice([s, s.lower(), s.upper(), f" {s} "])
+
+    body = {f: any_case(rng.choice(o)) for f, o in {**CATEGORY_OPTIONS, **DETAILED_CATEGORY_OPTIONS}.items()}
+    body.update(
+        dogName="x", birthYear=rng.randint(2005, 2025), weight=rng.choice([rng.uniform(0.5, 60), 5.0, 10.0, 35.0]),
+        dailyActiveHours=rng.uniform(0, 8), disease=rng.choice(conditions + [None, "Not a condition"]),
+        breed=rng.choice(breeds + [None, "Mutt"]), primaryBreed=rng.choice(breeds + [None]),
+        secondaryBreed=rng.choice(breeds + [None]),
+        pa_moderate_weather_daily_hours_outside=rng.uniform(0, 10), pa_hot_weather_months_per_year=rng.randint(0, 12),
+        pa_cold_weather_months_per_year=rng.uniform(0, 12), de_nighttime_sleep_avg_hours=rng.uniform(0, 14),
+        de_daytime_sleep_avg_hours=rng.uniform(0, 8), oc_household_person_count=rng.randint(0, 8),
+        oc_household_child_count=rng.randint(0, 4), de_other_present_animals_dogs=rng.randint(0, 4),
+    )
+    return body
+
+
+@pytest.fixture(scope="module")
+def sets(model_set):
+    return {family: model_set(family) for family in ("lifespan", "19feat", "67feat")}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_gathered_rows_match_preprocessing(sets, seed):
+    life_cols = list(sets["lifespan"]["columns"])
+    conditions = [c[len("hs_condition_"):] for c in life_cols if c.startswith("hs_condition_")]
+    breeds = [c[len("dd_breed_pure_"):] for c in life_cols if c.startswith("dd_breed_pure_")]
+    rng = random.Random(seed)
+    basic, detailed = sets["19feat"], sets["67feat"]
+
+    for _ in range(20):
+        body = random_body(rng, conditions, breeds)
+        dog = StrictDetailedDogHealthData(**body)
+        gathered, age = lifespan_input(dog, sets["lifespan"])
+        expected, expected_age = preprocess_lifespan(dog, sets["lifespan"]["columns"])
+        assert age == expected_age
+        assert list(gathered.columns) == list(expected.columns)
+        np.testing.assert_array_equal(gathered.to_numpy(float), expected.to_numpy(float))
+
+        np.testing.assert_array_equal(
+            detailed_disease_input(dog, age, detailed).to_numpy(),
+            preprocess_detailed_disease(dog, age, detailed["encoders"], detailed["features"]).to_numpy(),
+        )
+        for d in (dog, StrictDogHealthData(**{f: v for f, v in body.items() if f in StrictDogHealthData.model_fields})):
+            np.testing.assert_array_equal(
+                basic_disease_input(d, age, basic).to_numpy(),
+                preprocess_basic_disease(d, age, basic["encoders"], basic["features"]).to_numpy(),
+            )
@@ -0,0 +1,77 @@
+# test_degraded.py
+"""
+Deferred optimizations: a full job queue answers 503 with Retry-After, jobs
+carry only the dog and model version, and they run in the niced worker process
+with the same result as the inline optimizer.
+"""
+import os
+import pickle
+import queue
+import time
+
+import pytest
+from fastapi import HTTPException
+
+import degraded
+from conftest import BASIC_BODY
+from optimizer import optimize_lifespan
+from schemas import DogHealthData
+
+
+def test_full_queue_returns_503(monkeypatch):
+    full = queue.Queue(maxsize=1)
+    full.put_nowait(None)
+    monkeypatch.setattr(degraded, "_queue", full)
+    ml_models = {"lifespan": None, "columns": [], "version": "v"}
+    with pytest.raises(HTTPException) as exc:
+        degraded.defer_optimization(DogHealthData(**BASIC_BODY), ml_models)
+    assert exc.value.status_code == 503
+    assert exc.value.headers["Retry-After"] == str(degraded.ADMISSION_RETRY_AFTER)
+
+
+def test_job_carries_version_not_model(model_set, monkeypatch):
+    ml_models = model_set("lifespan")
+    monkeypatch.setattr(degraded, "_queue", queue.Queue(maxsize=1))
+    degraded.defer_optimization(DogHealthData(**BASIC_BODY), ml_models)
+    _, _, version, _ = job = degraded._queue.get_nowait()
+    assert version == ml_models["version"]
+    assert len(pickle.dumps(job)) < 10_000
+
+
+def test_worker_model_is_loaded_once(model_set, monkeypatch):
+    version = model_set("lifespan")["version"]
+    monkeypatch.setattr(degraded, "_worker_models", degraded.OrderedDict())
+    model, columns = degraded.worker_model(version)
+    assert degraded.worker_model(version)[0] is model
+    assert columns == model_set("lifespan")["columns"]
+
+
+def test_deferred_job_runs_in_niced_process(model_set):
+    ml_models = model_set("lifespan")
+    dog = DogHealthData(**BASIC_BODY)
+    degraded.start_deferred()
+    assert degraded._pool.submit(os.nice, 0).result() == min(19, os.nice(0) + degraded.DEFER_NICE)
+
+    job_id = degraded.defer_optimization(dog, ml_models)["job_id"]
+    deadline = time.monotonic() + 60
+    while degraded.optimization_job(job_id)["status"] not in ("done", "failed") and time.monotonic() < deadline:
+        time.sleep(0.05)
+    job = degraded.optimization_job(job_id)
+    assert job["status"] == "done"
+    assert job["lifespan_optimization"] == optimize_lifespan(dog, ml_models["lifespan"], ml_models["columns"])
+
+
+def test_restart_after_stop(model_set):
+    ml_models = model_set("lifespan")
+    dog = DogHealthData(**BASIC_BODY)
+    degraded.start_deferred()
+    degraded.stop_deferred()
+    assert degraded._pool is None and degraded._worker is None
+
+    degraded.start_deferred()
+    job_id = degraded.defer_optimization(dog, ml_models)["job_id"]
+    deadline = time.monotonic() + 60
+    while degraded.optimization_job(job_id)["status"] not in ("done", "failed") and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert degraded.optimization_job(job_id)["status"] == "done"
+    degraded.stop_deferred()
@@ -0,0 +1,42 @@
+# test_explain.py
+"""
+The one-product linear scoring must give the same risks as each disease model's
+predict_proba, and its contribution rows must add up to the models' log-odds.
+"""
+import numpy as np
+import pytest
+
+from conftest import DETAILED_BODY
+from main import disease_scores
+from model_store import DISEASES
+from preprocessor import dog_age, preprocess_basic_disease, preprocess_detailed_disease
+from schemas import DetailedDogHealthData
+
+
+@pytest.mark.parametrize("family", ["19feat", "67feat"])
+@pytest.mark.parametrize("weight", [3.0, 22.0, 40.0])
+def test_linear_scores_match_predict_proba(model_set, family, weight):
+    models = model_set(family)
+    if "coef" not in models:
+        pytest.skip(f"{family} is not a linear set")
+    dog = DetailedDogHealthData(**dict(DETAILED_BODY, weight=weight))
+    age = dog_age(dog)
+    preprocess = preprocess_basic_disease if family == "19feat" else preprocess_detailed_disease
+    X = models["scaler"].transform(preprocess(dog, age, models["encoders"], models["features"]))
+
+    proba, contributions = disease_scores(models, X)
+    expected = [models["models"][d].predict_proba(X)[0][1] for d in DISEASES]
+    np.testing.assert_allclose(proba, expected, rtol=0, atol=1e-12)
+    logits = [models["models"][d].decision_function(X)[0] for d in DISEASES]
+    np.testing.assert_allclose(contributions.sum(axis=1) + models["intercept"], logits, rtol=0, atol=1e-9)
+
+
+def test_disease_subset_keeps_order(model_set):
+    models = model_set("19feat")
+    dog = DetailedDogHealthData(**DETAILED_BODY)
+    X = models["scaler"].transform(
+        preprocess_basic_disease(dog, dog_age(dog), models["encoders"], models["features"])
+    )
+    proba, _ = disease_scores(models, X)
+    subset, _ = disease_scores(models, X, ["ear", "orthopedic"])
+    assert subset == [proba[DISEASES.index("ear")], proba[DISEASES.index("orthopedic")]]
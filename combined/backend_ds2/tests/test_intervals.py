@@ -0,0 +1,54 @@
+# test_intervals.py
+import numpy as np
+from scipy.special import expit
+
+from intervals import attach_bootstrap_terms, bootstrap_intervals
+
+DISEASES = ["orthopedic", "dermatological", "cardiac"]
+
+
+def linear_set(n_replicates=200, n_features=6, seed=0):
+    rng = np.random.default_rng(seed)
+    coef = rng.normal(size=(len(DISEASES), n_features))
+    intercept = rng.normal(size=len(DISEASES))
+    return {
+        "models": dict.fromkeys(DISEASES),
+        "coef": coef,
+        "intercept": intercept,
+        "bootstrap": {
+            "coef": coef.T[np.newaxis] + rng.normal(scale=0.2, size=(n_replicates, n_features, len(DISEASES))),
+            "intercept": intercept + rng.normal(scale=0.2, size=(n_replicates, len(DISEASES))),
+        },
+    }
+
+
+def test_contraction_matches_per_replicate_loop():
+    artifact_set = linear_set()
+    x = np.random.default_rng(1).normal(size=(1, 6))
+    boot = artifact_set["bootstrap"]
+    log_odds = np.array([x[0] @ boot["coef"][r] + boot["intercept"][r] for r in range(len(boot["intercept"]))])
+    served = x[0] @ artifact_set["coef"].T + artifact_set["intercept"]
+    spread = np.percentile(log_odds, [5, 95], axis=0) - np.median(log_odds, axis=0)
+
+    intervals = bootstrap_intervals(artifact_set, x, level=0.9)
+    for i, interval in enumerate(intervals):
+        assert interval["percentile_range"] == 90
+        assert np.isclose(interval["low"], round(float(expit(served[i] + spread[0, i]) * 100), 1))
+        assert np.isclose(interval["high"], round(float(expit(served[i] + spread[1, i]) * 100), 1))
+        assert interval["low"] <= expit(served[i]) * 100 <= interval["high"]
+
+
+def test_sets_without_replicates_get_none():
+    artifact_set = linear_set()
+    del artifact_set["bootstrap"]
+    assert bootstrap_intervals(artifact_set, np.zeros((1, 6))) == [None] * len(DISEASES)
+
+
+def test_replicates_are_reordered_to_the_serving_order():
+    artifact_set = linear_set()
+    boot = artifact_set["bootstrap"]
+    stored_order = DISEASES[::-1]
+    artifact_set["bootstrap"] = {"coef": boot["coef"][:, :, ::-1], "intercept": boot["intercept"][:, ::-1],
+                                 "diseases": stored_order}
+    attached = attach_bootstrap_terms(artifact_set, DISEASES)["bootstrap"]
+    assert np.allclose(attached["coef"], boot["coef"]) and np.allclose(attached["intercept"], boot["intercept"])
@@ -0,0 +1,89 @@
+# test_model_cache.py
+"""
+Pinned older versions: least-recently-used eviction under MODEL_CACHE_MB,
+one shared load for concurrent pins, KeyError (404) for unknown versions, and
+no double counting of a version that becomes active.
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+import main
+import model_store
+
+
+def fake_set(version, nbytes=100):
+    return {"version": version, "nbytes": nbytes}
+
+
+def test_eviction_is_least_recently_used(versioned_19feat, monkeypatch):
+    monkeypatch.setattr(model_store, "MODEL_CACHE_BYTES", 250)
+    model_store.remember("19feat", fake_set("a"))
+    model_store.remember("19feat", fake_set("b"))
+    assert asyncio.run(model_store.get_set("19feat", "a"))["version"] == "a"  # a is now the most recent
+    model_store.remember("19feat", fake_set("c"))
+    assert list(model_store.resident) == [("19feat", "a"), ("19feat", "c")]
+
+
+def test_concurrent_pins_share_one_load(versioned_19feat, monkeypatch):
+    loads = []
+
+    def slow_load(family, version=None):
+        loads.append(version)
+        time.sleep(0.2)
+        return fake_set(version)
+
+    monkeypatch.setattr(model_store, "load_validated", slow_load)
+
+    async def run():
+        return await asyncio.gather(*(model_store.get_set("19feat", "v2") for _ in range(3)))
+
+    sets = asyncio.run(run())
+    assert loads == ["v2"]
+    assert all(s is sets[0] for s in sets)
+    assert list(model_store.resident) == [("19feat", "v2")]
+    assert not model_store._pending_loads
+
+
+def test_unknown_version_is_404(versioned_19feat):
+    with pytest.raises(KeyError):
+        asyncio.run(model_store.get_set("19feat", "v9"))
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main.resolve_set("19feat", "v9"))
+    assert exc.value.status_code == 404
+
+
+def test_pinned_version_leaves_resident_when_activated(versioned_19feat):
+    async def run():
+        pinned = await model_store.get_set("19feat", "v2")
+        versioned_19feat("v2")
+        await model_store.reload_family("19feat")
+        return pinned
+
+    pinned = asyncio.run(run())
+    assert model_store.active["19feat"] is pinned  # promoted, not loaded again
+    assert list(model_store.resident) == [("19feat", "v1")]
+
+
+def test_pin_finishing_after_activation_is_not_counted(versioned_19feat, monkeypatch):
+    load_validated = model_store.load_validated
+
+    def slow_load(family, version=None):
+        if version == "v2":
+            time.sleep(0.5)  # the pin is still loading when the reload activates v2
+        return load_validated(family, version)
+
+    monkeypatch.setattr(model_store, "load_validated", slow_load)
+
+    async def run():
+        pin = asyncio.ensure_future(model_store.get_set("19feat", "v2"))
+        await asyncio.sleep(0.05)
+        versioned_19feat("v2")
+        await model_store.reload_family("19feat")
+        await pin
+
+    asyncio.run(run())
+    assert model_store.active["19feat"]["version"] == "v2"
+    assert list(model_store.resident) == [("19feat", "v1")]
@@ -0,0 +1,85 @@
+# test_optimizer.py
+"""
+The split lifespan preprocessing and the batched optimizer scoring must match the
+old one-dog-at-a-time path, and optimize_lifespan must stay within its budget.
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import BASIC_BODY
+from optimizer import candidate_configs, optimize_lifespan, predict_configs
+from preprocessor import (
+    MONTH_MAP,
+    lifespan_weight_lbs,
+    preprocess_lifespan,
+)
+from schemas import DogHealthData
+from utils import map_activity_intensity, normalize_diet_component_lifespan
+
+DOGS = [
+    BASIC_BODY,
+    dict(BASIC_BODY, birthYear=2024, weight=4.0, activityIntensity="Intense", primaryDiet="Raw", insurance="Yes"),
+    dict(BASIC_BODY, breedState="Mixed", breed=None, primaryBreed="Beagle", secondaryBreed="Poodle",
+         vaccinationStatus="Not Current", spayedNeutered="No", disease="Blindness"),
+    dict(BASIC_BODY, birthYear=2010, weight=38.0, activityIntensity="Light", primaryDiet="Other"),
+]
+
+
+def legacy_preprocess_lifespan(data, model_cols):
+    """preprocess_lifespan as it was before it was split into dog_age / raw row / encoding."""
+    today = datetime.now()
+    birth_month_num = MONTH_MAP.get(data.birthMonth, 1)
+    total_months = (today.year - data.birthYear) * 12 + (today.month - birth_month_num)
+    age = max(0.0, round(total_months / 12.0, 1))
+    raw_dict = {
+        "Age_at_Condition": age,
+        "dog_insurance": data.insurance.lower() == "yes",
+        "hs_condition": data.disease,
+        "dd_spayed_or_neutered": "spayed" if data.spayedNeutered.lower() == "yes" else "neutered",
+        "pa_avg_daily_active_hours": data.dailyActiveHours,
+        "dd_breed_pure_or_mixed": "Purebred" if data.breedState.lower() == "pure" else "Mixed Breed",
+        "dd_breed_pure": data.breed,
+        "dd_breed_mixed_primary": data.primaryBreed,
+        "dd_breed_mixed_secondary": data.secondaryBreed,
+        "df_primary_diet_component": normalize_diet_component_lifespan(data.primaryDiet),
+        "mp_vaccination_status": 1 if data.vaccinationStatus.lower() == "current" else 0,
+        "weight_lbs": float(lifespan_weight_lbs(age, data.weight)),
+        "pa_avg_activity_intensity": map_activity_intensity(data.activityIntensity),
+    }
+    df = pd.DataFrame([raw_dict])
+    if 'mp_vacciNaNtion_status' in model_cols:
+        df.rename(columns={'mp_vaccination_status': 'mp_vacciNaNtion_status'}, inplace=True)
+    return pd.get_dummies(df).reindex(columns=model_cols, fill_value=0), age
+
+
+@pytest.mark.parametrize("body", DOGS)
+def test_preprocess_lifespan_matches_legacy(model_set, body):
+    cols = model_set("lifespan")["columns"]
+    dog = DogHealthData(**body)
+    df, age = preprocess_lifespan(dog, cols)
+    expected, expected_age = legacy_preprocess_lifespan(dog, cols)
+    assert age == expected_age
+    assert list(df.columns) == list(expected.columns)
+    np.testing.assert_array_equal(df.to_numpy(float), expected.to_numpy(float))
+
+
+@pytest.mark.parametrize("body", DOGS)
+def test_batched_configs_match_single_predictions(model_set, body):
+    ml_models = model_set("lifespan")
+    model, cols = ml_models["lifespan"], ml_models["columns"]
+    dog = DogHealthData(**body)
+    configs = [{}] + candidate_configs(dog)
+    batch = predict_configs(dog, configs, model, cols)
+    single = [model.predict(legacy_preprocess_lifespan(dog.model_copy(update=c), cols)[0])[0] for c in configs]
+    np.testing.assert_array_equal(batch, single)
+
+
+@pytest.mark.parametrize("budget", [2, 20, 200])
+def test_optimize_lifespan_stays_within_budget(model_set, budget):
+    ml_models = model_set("lifespan")
+    result = optimize_lifespan(DogHealthData(**DOGS[2]), ml_models["lifespan"], ml_models["columns"], budget)
+    assert result["model_evaluations"] <= budget
+    assert result["max_potential_lifespan"] >= result["original_lifespan"]
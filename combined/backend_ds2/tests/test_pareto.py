@@ -0,0 +1,37 @@
+# test_pareto.py
+"""
+pareto_front must keep exactly the points an O(n^2) dominance check keeps
+(earliest index among identical points), ties and duplicates included.
+"""
+import numpy as np
+import pytest
+
+from optimizer import pareto_front
+
+
+def brute_force_front(maximize, minimize):
+    kept = []
+    for i in range(len(maximize)):
+        dominated = any(
+            maximize[j] >= maximize[i] and minimize[j] <= minimize[i]
+            and (maximize[j] > maximize[i] or minimize[j] < minimize[i] or j < i)
+            for j in range(len(maximize)) if j != i
+        )
+        if not dominated:
+            kept.append(i)
+    return kept
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_pareto_front_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 60))
+    # Small integer grids force ties on one or both objectives
+    maximize = rng.integers(0, 8, n).astype(float)
+    minimize = rng.integers(0, 8, n).astype(float)
+    assert sorted(pareto_front(maximize, minimize)) == brute_force_front(maximize, minimize)
+
+
+def test_pareto_front_orders_longest_first():
+    front = pareto_front([1.0, 3.0, 2.0, 3.0], [0.1, 0.5, 0.3, 0.9])
+    assert front == [1, 2, 0]
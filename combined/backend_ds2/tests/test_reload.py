@@ -0,0 +1,66 @@
+# test_reload.py
+"""
+Background reloads: a set that fails its smoke test leaves the previous one
+serving, requests keep the set they started with, and the watcher does not retry
+a version that failed.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+import model_store
+
+
+def test_broken_set_fails_smoke_test_and_keeps_previous(versioned_19feat):
+    broken = model_store.load_family("19feat", "bad")
+    with pytest.raises(ValueError):
+        model_store.smoke_test("19feat", broken)
+
+    versioned_19feat("bad")
+    with pytest.raises(ValueError):
+        asyncio.run(model_store.reload_family("19feat"))
+    assert model_store.active["19feat"]["version"] == "v1"
+
+
+def test_in_flight_request_keeps_its_set(versioned_19feat):
+    async def run():
+        started = await model_store.get_set("19feat")  # taken once, as the endpoints do
+        versioned_19feat("v2")
+        result = await model_store.reload_family("19feat")
+        return started, result
+
+    started, result = asyncio.run(run())
+    assert result == {"family": "19feat", "previous": "v1", "version": "v2"}
+    assert started["version"] == "v1"
+    assert model_store.active["19feat"]["version"] == "v2"
+    X = started["scaler"].transform(np.zeros((1, len(started["features"]))))
+    assert np.isfinite(started["models"]["cardiac"].predict_proba(X)).all()
+
+
+def test_watcher_does_not_retry_failed_version(versioned_19feat, monkeypatch):
+    loads = []
+    load_validated = model_store.load_validated
+
+    def counting_load(family, version=None):
+        loads.append(model_store.current_version(model_store.MODEL_DIRS[family]))
+        return load_validated(family, version)
+
+    monkeypatch.setattr(model_store, "load_validated", counting_load)
+    monkeypatch.setattr(model_store, "RELOAD_CHECK_SECONDS", 0.02)
+
+    async def watch(seconds):
+        watcher = asyncio.create_task(model_store.watch_versions())
+        await asyncio.sleep(seconds)
+        watcher.cancel()
+
+    versioned_19feat("bad")
+    asyncio.run(watch(0.5))
+    assert loads == ["bad"]
+    assert ("19feat", "bad") in model_store._failed_versions
+    assert model_store.active["19feat"]["version"] == "v1"
+
+    versioned_19feat("v2")
+    asyncio.run(watch(0.5))
+    assert loads == ["bad", "v2"]
+    assert model_store.active["19feat"]["version"] == "v2"
@@ -0,0 +1,70 @@
+# test_responses.py
+"""
+The orjson responses and the risk-band table must give the same output as the
+default JSONResponse and the old if/elif threshold functions.
+"""
+import json
+import math
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import main
+from conftest import BASIC_BODY
+from responses import FastJSONResponse
+from schemas import DogHealthData
+from utils import get_recommendation, get_risk_interpretation, risk_band_text
+
+
+def legacy_interpretation(score):
+    if score < 20: return "Low"
+    elif score < 40: return "Low-Moderate"
+    elif score < 60: return "Moderate"
+    elif score < 80: return "Moderate-High"
+    else: return "High"
+
+
+def legacy_recommendation(score):
+    recommendations = {
+        "low": "Continue regular wellness exams and preventive care.",
+        "low-moderate": "Monitor for early signs and maintain preventive care.",
+        "moderate": "Schedule veterinary consultation for thorough evaluation.",
+        "moderate-high": "Consult with veterinarian soon for comprehensive assessment.",
+        "high": "Schedule urgent veterinary consultation and testing."
+    }
+    return recommendations.get(legacy_interpretation(score).lower().replace(" ", "-"), "Consult your veterinarian.")
+
+
+# Each band edge and the values just either side of it, the ends of the scale, out-of-range scores and NaN
+SCORES = sorted({x for edge in (20, 40, 60, 80) for x in (edge - 0.1, np.nextafter(edge, 0), edge, edge + 0.1)}
+                | {-5.0, 0.0, 100.0, 120.0}) + [math.nan]
+
+
+def test_risk_band_text_matches_thresholds():
+    for score in SCORES:
+        assert risk_band_text(score) == (legacy_interpretation(score), legacy_recommendation(score)), score
+        assert get_risk_interpretation(score) == legacy_interpretation(score), score
+        assert get_recommendation("cardiac", score) == legacy_recommendation(score), score
+
+
+def test_fast_json_matches_default_response():
+    content = {
+        "name": "Zoë", "age": 10.6, "ints": [0, -3, 2**40], "none": None, "flag": True,
+        "nested": [{"risk_score": 73.3, "confidence": "73.3%"}, {"y": 123456.789}],
+    }
+    assert FastJSONResponse(content).body == JSONResponse(jsonable_encoder(content)).body
+    # Exponent notation is spelled differently ("1e-7" vs "1e-07") but parses to the same value
+    tiny = {"x": 1e-7}
+    assert json.loads(FastJSONResponse(tiny).body) == json.loads(JSONResponse(tiny).body)
+
+
+def test_fast_json_serializes_numpy():
+    content = {"a": np.float64(0.25), "b": np.int64(3), "c": np.arange(3)}
+    assert FastJSONResponse(content).body == JSONResponse({"a": 0.25, "b": 3, "c": [0, 1, 2]}).body
+
+
+def test_prediction_body_matches_default_response(model_set):
+    _, result = main.basic_prediction(DogHealthData(**BASIC_BODY), model_set("lifespan"), model_set("19feat"),
+                                      True, 3, False)
+    assert FastJSONResponse(result).body == JSONResponse(jsonable_encoder(result)).body
@@ -0,0 +1,66 @@
+# test_risk_optimizer.py
+import numpy as np
+
+from conftest import DETAILED_BODY
+from codes import detailed_disease_input
+from model_store import DISEASES
+from preprocessor import dog_age
+from risk_optimizer import MODIFIABLE_FIELDS, optimize_disease_risk
+from schemas import DetailedDogHealthData
+from sensitivity import disease_value
+from trajectory import batch_risks
+
+
+def test_optimized_risks_match_rerunning_the_models(model_set):
+    models_dict = model_set("67feat")
+    dog = DetailedDogHealthData(**dict(DETAILED_BODY, de_nighttime_sleep_avg_hours=6, de_daytime_sleep_avg_hours=6))
+    age = dog_age(dog)
+    X = detailed_disease_input(dog, age, models_dict)
+    result = optimize_disease_risk(dog, X, models_dict, min_gain=0.0)
+
+    # Apply the suggested changes to the model row and score it with the models themselves
+    labels = {label: field for field, (label, _) in MODIFIABLE_FIELDS.items()}
+    changed = X.copy()
+    for label, text in result["suggested_changes"].items():
+        if label in labels:
+            option = text.split("-> ")[1].split(")")[0]
+            value = float(option) if labels[label].endswith("_hours") else option
+            changed[labels[label]] = disease_value(labels[label], value, models_dict["encoders"])
+    risks = batch_risks(models_dict, changed)[0] * 100
+    assert np.allclose([result["optimized_risks"][d.upper()] for d in DISEASES], risks, atol=0.051)
+
+
+def test_limited_to_the_listed_diseases(model_set):
+    models_dict = model_set("67feat")
+    dog = DetailedDogHealthData(**DETAILED_BODY)
+    X = detailed_disease_input(dog, dog_age(dog), models_dict)
+    result = optimize_disease_risk(dog, X, models_dict, diseases=["cardiac", "ear"])
+    assert list(result["optimized_risks"]) == ["CARDIAC", "EAR"]
+    full = batch_risks(models_dict, X)[0] * 100
+    expected = np.mean([full[DISEASES.index("cardiac")], full[DISEASES.index("ear")]])
+    assert abs(result["original_average_risk"] - expected) <= 0.051
+
+
+def test_uncoded_answers_are_not_considered(model_set, monkeypatch):
+    import preprocessor
+    import risk_optimizer
+
+    models_dict = model_set("67feat")
+    dog = DetailedDogHealthData(**DETAILED_BODY)
+    X = detailed_disease_input(dog, dog_age(dog), models_dict)
+
+    # MAP_DETAILED_ANSWERS off: the Yes/No answers all encode to 0, so only sleep is searched
+    monkeypatch.setattr(preprocessor, "ANSWER_CODES", {})
+    monkeypatch.setattr(risk_optimizer, "ANSWER_CODES", {})
+    assert {field for field, _ in risk_optimizer.candidate_changes(dog)} == set(risk_optimizer.SLEEP_RANGES)
+    result = optimize_disease_risk(dog, X, models_dict)
+    assert result["levers_considered"] == ["Nighttime Sleep", "Daytime Sleep"]
+
+    # MAP_DETAILED_ANSWERS on: every lever the 67-feature set has is considered
+    codes = {field: preprocessor.YES_NO_CODES for field, (_, options) in MODIFIABLE_FIELDS.items() if options}
+    codes["mp_flea_and_tick_treatment"] = {**preprocessor.YES_NO_CODES, "monthly": 1.0}
+    monkeypatch.setattr(preprocessor, "ANSWER_CODES", codes)
+    monkeypatch.setattr(risk_optimizer, "ANSWER_CODES", codes)
+    result = optimize_disease_risk(dog, detailed_disease_input(dog, dog_age(dog), models_dict), models_dict)
+    features = list(models_dict["features"])
+    assert result["levers_considered"] == [label for field, (label, _) in MODIFIABLE_FIELDS.items() if field in features]
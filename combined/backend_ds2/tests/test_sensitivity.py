@@ -0,0 +1,54 @@
+# test_sensitivity.py
+import numpy as np
+import pandas as pd
+
+from conftest import DETAILED_BODY
+from codes import basic_disease_input, detailed_disease_input, lifespan_input
+from schemas import DetailedDogHealthData
+from sensitivity import lifespan_sensitivities, perturbations, perturbed_rows, risk_sensitivities
+from trajectory import batch_risks
+
+
+def test_perturbed_rows_matches_cell_by_cell_reference():
+    df = pd.DataFrame([[1.0, 2.0, 3.0, 4.0]], columns=["a", "b", "c", "d"])
+    inputs, values = ["x", "y", "z"], np.arange(6, dtype=float) + 10
+    feeds = {"x": [0, 2], "y": [3], "z": []}
+
+    def column_values(name, input_values):
+        return {column: input_values * (column + 1) for column in feeds[name]}
+
+    expected = np.repeat(df.values, len(values), axis=0)
+    for k, value in enumerate(values):
+        for column in feeds[inputs[k % len(inputs)]]:
+            expected[k, column] = value * (column + 1)
+    rows = perturbed_rows(df, inputs, values, column_values)
+    assert list(rows.columns) == list(df.columns)
+    assert np.array_equal(rows.values, expected)
+
+
+def brute_force(dog, inputs, upper, lower, output):
+    """Central differences from re-running the whole request path on perturbed bodies."""
+    result = []
+    for name, up, down in zip(inputs, upper, lower):
+        high = output(dog.model_copy(update={name: up}))
+        low = output(dog.model_copy(update={name: down}))
+        result.append((high - low) / (up - down))
+    return np.asarray(result)
+
+
+def test_sensitivities_match_rerunning_the_models(model_set):
+    lifespan_set, basic_set, detailed_set = model_set("lifespan"), model_set("19feat"), model_set("67feat")
+    dog = DetailedDogHealthData(**DETAILED_BODY)
+    df_l, age = lifespan_input(dog, lifespan_set)
+    inputs, upper, lower = perturbations(dog)
+
+    lifespan = lifespan_sensitivities(lifespan_set, df_l, age, inputs, upper, lower)
+    expected = brute_force(dog, inputs, upper, lower,
+                           lambda d: float(lifespan_set["lifespan"].predict(lifespan_input(d, lifespan_set)[0])[0]))
+    assert np.allclose(lifespan, expected)
+
+    for models_dict, model_input in [(basic_set, basic_disease_input), (detailed_set, detailed_disease_input)]:
+        risks = risk_sensitivities(models_dict, model_input(dog, age, models_dict), inputs, upper, lower)
+        expected = brute_force(dog, inputs, upper, lower,
+                               lambda d: batch_risks(models_dict, model_input(d, age, models_dict))[0] * 100)
+        assert np.allclose(risks, expected)
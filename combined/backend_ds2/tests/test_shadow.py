@@ -0,0 +1,98 @@
+# test_shadow.py
+"""
+Shadow scoring: the bounded queue drops and counts overflow, the worker logs
+per-disease probability deltas, and a candidate that fails to load is counted
+without stopping the worker.
+"""
+import asyncio
+import json
+
+import pytest
+
+import shadow
+from codes import basic_disease_input
+from conftest import BASIC_BODY
+from model_store import DISEASES, active
+from preprocessor import dog_age
+from schemas import DogHealthData
+
+
+@pytest.fixture
+def shadow_state(tmp_path, monkeypatch):
+    """Fresh counters, a 19feat candidate and a log in tmp_path."""
+    monkeypatch.setattr(shadow, "shadow_stats", {"enqueued": 0, "dropped": 0, "completed": 0, "failed": 0})
+    monkeypatch.setattr(shadow, "SHADOW_VERSIONS", {"19feat": "v2"})
+    monkeypatch.setattr(shadow, "SHADOW_LOG", str(tmp_path / "logs" / "shadow.jsonl"))
+    monkeypatch.setattr(shadow, "_queue", None)
+    return tmp_path / "logs" / "shadow.jsonl"
+
+
+def served_risks(dog, age):
+    served = active["19feat"]
+    X = served["scaler"].transform(basic_disease_input(dog, age, served))
+    return {d: float(served["models"][d].predict_proba(X)[0][1]) for d in DISEASES}
+
+
+async def drain(jobs):
+    """Wait until the worker has finished (completed or failed) the given number of jobs."""
+    while shadow.shadow_stats["completed"] + shadow.shadow_stats["failed"] < jobs:
+        await asyncio.sleep(0.01)
+
+
+def test_full_queue_drops_and_counts(shadow_state, monkeypatch):
+    monkeypatch.setattr(shadow, "SHADOW_QUEUE_SIZE", 2)
+
+    async def run():
+        shadow._queue = asyncio.Queue(maxsize=shadow.SHADOW_QUEUE_SIZE)  # no worker: nothing is consumed
+        for _ in range(5):
+            shadow.submit_shadow("19feat", None, 5.0, {"cardiac": 0.5}, "v1", 10.0)
+        # Families without a candidate, and requests already served by it, are not queued
+        shadow.submit_shadow("67feat", None, 5.0, {"cardiac": 0.5}, "v1", 10.0)
+        shadow.submit_shadow("19feat", None, 5.0, {"cardiac": 0.5}, "v2", 10.0)
+
+    asyncio.run(run())
+    assert shadow.shadow_stats == {"enqueued": 2, "dropped": 3, "completed": 0, "failed": 0}
+
+
+def test_worker_logs_probability_deltas(versioned_19feat, shadow_state):
+    dog = DogHealthData(**BASIC_BODY)
+    age = dog_age(dog)
+    primary = served_risks(dog, age)
+    primary["cardiac"] -= 0.1  # v2 is a copy of v1, so this is the only difference
+
+    async def run():
+        worker = shadow.start_shadow()
+        shadow.submit_shadow("19feat", dog, age, primary, "v1", 12.5)
+        await asyncio.wait_for(drain(1), 10)
+        worker.cancel()
+
+    asyncio.run(run())
+    assert shadow.shadow_stats["completed"] == 1
+    (record,) = [json.loads(line) for line in shadow_state.read_text().splitlines()]
+    assert record["family"] == "19feat"
+    assert (record["primary_version"], record["candidate_version"]) == ("v1", "v2")
+    assert set(record["deltas"]) == set(DISEASES)
+    assert record["deltas"]["cardiac"] == pytest.approx(0.1, abs=1e-6)
+    assert all(record["deltas"][d] == 0 for d in DISEASES if d != "cardiac")
+    assert record["max_abs_delta"] == pytest.approx(0.1, abs=1e-6)
+    assert record["primary_ms"] == 12.5
+
+
+def test_failed_candidate_is_counted_and_worker_continues(versioned_19feat, shadow_state, monkeypatch):
+    dog = DogHealthData(**BASIC_BODY)
+    age = dog_age(dog)
+    primary = served_risks(dog, age)
+
+    async def run():
+        worker = shadow.start_shadow()
+        for candidate in ("bad", "v9", "v2"):  # fails its smoke test, does not exist, good
+            monkeypatch.setitem(shadow.SHADOW_VERSIONS, "19feat", candidate)
+            shadow.submit_shadow("19feat", dog, age, primary, "v1", 1.0)
+        await asyncio.wait_for(drain(3), 10)
+        assert not worker.done()
+        worker.cancel()
+
+    asyncio.run(run())
+    assert shadow.shadow_stats["failed"] == 2
+    assert shadow.shadow_stats["completed"] == 1
+    assert len(shadow_state.read_text().splitlines()) == 1
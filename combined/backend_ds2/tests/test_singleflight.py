@@ -0,0 +1,40 @@
+# test_singleflight.py
+"""
+Duplicate concurrent /predict requests share one computation, but every caller
+still enqueues its own shadow scoring.
+"""
+import asyncio
+import time
+
+import httpx
+
+import main
+from conftest import BASIC_BODY
+
+
+def test_coalesced_callers_each_submit_shadows(monkeypatch):
+    computed, submitted = [], []
+
+    def slow_prediction(dog, *args):
+        computed.append(dog)
+        time.sleep(0.2)
+        return [("19feat", 5.0, {"cardiac": 0.5}, "v1")], {"status": "success"}
+
+    async def fake_set(family, version):
+        return {"version": "v1"}
+
+    monkeypatch.setattr(main, "basic_prediction", slow_prediction)
+    monkeypatch.setattr(main, "resolve_set", fake_set)
+    monkeypatch.setattr(main, "submit_shadow", lambda *args: submitted.append(args))
+
+    async def run():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(client.post("/predict", json=BASIC_BODY) for _ in range(4)))
+
+    responses = asyncio.run(run())
+    assert [r.status_code for r in responses] == [200] * 4
+    assert all(r.json() == {"status": "success"} for r in responses)
+    assert len(computed) == 1
+    assert len(submitted) == 4
+    assert all(args[0] == "19feat" and args[4] == "v1" for args in submitted)
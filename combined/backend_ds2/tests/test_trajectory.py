@@ -0,0 +1,60 @@
+# test_trajectory.py
+"""
+The repeated-row trajectory inputs must equal preprocessing the dog separately at
+each grid age, and the batch scores must equal scoring those rows one by one.
+"""
+import numpy as np
+import pytest
+
+from conftest import DETAILED_BODY
+from model_store import DISEASES, UNSCALED_MODEL_KINDS
+from preprocessor import (
+    encode_lifespan_rows,
+    lifespan_raw_row,
+    preprocess_basic_disease,
+    preprocess_detailed_disease,
+)
+from schemas import DetailedDogHealthData
+from trajectory import age_grid, disease_rows, lifespan_rows, risk_curves
+
+# Crosses the life-stage edges and the age-8 weight rule
+START_AGES = [0.5, 2.5, 6.5]
+
+
+@pytest.mark.parametrize("start", START_AGES)
+def test_lifespan_rows_match_per_age_preprocessing(model_set, start):
+    ml_models = model_set("lifespan")
+    dog = DetailedDogHealthData(**DETAILED_BODY)
+    cols = ml_models["columns"]
+    ages = age_grid(start, 5.0, 0.5)
+    rows = lifespan_rows(encode_lifespan_rows([lifespan_raw_row(dog, start)], cols), ages, dog.weight)
+    expected = encode_lifespan_rows([lifespan_raw_row(dog, a) for a in ages], cols)
+    np.testing.assert_array_equal(rows.to_numpy(float), expected.to_numpy(float))
+    np.testing.assert_array_equal(ml_models["lifespan"].predict(rows), ml_models["lifespan"].predict(expected))
+
+
+@pytest.mark.parametrize("family", ["19feat", "67feat"])
+@pytest.mark.parametrize("start", START_AGES)
+def test_risk_curves_match_per_age_scoring(model_set, family, start):
+    models = model_set(family)
+    dog = DetailedDogHealthData(**DETAILED_BODY)
+    preprocess = preprocess_basic_disease if family == "19feat" else preprocess_detailed_disease
+    ages = age_grid(start, 5.0, 0.5)
+    df = preprocess(dog, start, models["encoders"], models["features"])
+    per_age = [preprocess(dog, a, models["encoders"], models["features"]) for a in ages]
+
+    np.testing.assert_array_equal(
+        disease_rows(df, ages, models["encoders"]).to_numpy(float),
+        np.vstack([row.to_numpy(float) for row in per_age]),
+    )
+    curves = risk_curves(models, df, ages)
+    for d in DISEASES:
+        expected = []
+        for row in per_age:
+            X = row if models["kind"] in UNSCALED_MODEL_KINDS else models["scaler"].transform(row)
+            expected.append(round(models["models"][d].predict_proba(X)[0][1] * 100, 1))
+        assert curves[d.upper()] == expected
+
+
+def test_age_grid_includes_both_ends():
+    np.testing.assert_array_equal(age_grid(5.3, 2.0, 0.5), [5.3, 5.8, 6.3, 6.8, 7.3])
@@ -0,0 +1,54 @@
+# test_tree_compiler.py
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import ExtraTreesRegressor, GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+
+from tree_compiler import CompiledTreeEnsemble, compile_if_equivalent, compile_tree_ensemble
+
+ESTIMATORS = [
+    DecisionTreeRegressor(max_depth=8, random_state=0),
+    RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0),
+    ExtraTreesRegressor(n_estimators=20, max_depth=6, random_state=0),
+    GradientBoostingRegressor(n_estimators=30, max_depth=3, random_state=0),
+]
+
+
+def training_data(n=400, n_features=12, seed=0):
+    """Mixed one-hot and continuous columns, like the lifespan model's input."""
+    rng = np.random.default_rng(seed)
+    X = np.hstack([(rng.random((n, n_features // 2)) < 0.3).astype(float), rng.normal(size=(n, n_features // 2))])
+    y = X[:, 0] * 2 + np.sin(X[:, -1]) + rng.normal(scale=0.1, size=n)
+    return X, y
+
+
+@pytest.mark.parametrize("estimator", ESTIMATORS, ids=lambda e: type(e).__name__)
+def test_compiled_matches_sklearn(estimator):
+    X, y = training_data()
+    est = estimator.fit(X, y)
+    compiled = compile_tree_ensemble(est)
+    X_test, _ = training_data(n=500, seed=1)
+    assert np.allclose(compiled.predict(X_test), est.predict(X_test))
+    # Rows sitting exactly on split thresholds go left, as in sklearn
+    assert np.allclose(compiled.predict(X), est.predict(X))
+
+
+@pytest.mark.parametrize("estimator", ESTIMATORS, ids=lambda e: type(e).__name__)
+def test_compiled_matches_sklearn_with_feature_names(estimator):
+    X, y = training_data()
+    columns = [f"f{i}" for i in range(X.shape[1])]
+    est = estimator.fit(pd.DataFrame(X, columns=columns), y)
+    compiled = compile_if_equivalent(est)
+    assert isinstance(compiled, CompiledTreeEnsemble)
+    X_test = pd.DataFrame(training_data(n=200, seed=2)[0], columns=columns)
+    assert np.allclose(compiled.predict(X_test), est.predict(X_test))
+
+
+def test_unsupported_estimator_is_returned_unchanged():
+    X, y = training_data()
+    est = LinearRegression().fit(X, y)
+    with pytest.raises(TypeError):
+        compile_tree_ensemble(est)
+    assert compile_if_equivalent(est) is est
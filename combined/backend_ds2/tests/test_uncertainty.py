@@ -0,0 +1,102 @@
+# test_uncertainty.py
+"""
+Monte Carlo samples built from the variant tables must score the same as
+preprocessing each sampled dog, and the batched 67-feature encoding must match
+the old one-row label-encoding loop.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import DETAILED_BODY
+from preprocessor import (
+    ANSWER_CODES,
+    basic_disease_raw_row,
+    detailed_disease_raw_row,
+    dog_age,
+    encode_basic_disease_rows,
+    encode_detailed_disease_rows,
+    encode_detailed_value,
+    encode_lifespan_rows,
+    lifespan_raw_row,
+)
+from schemas import DetailedDogHealthData
+from trajectory import batch_risks
+from uncertainty import (
+    INTENSITY_LEVELS,
+    draw_samples,
+    lifespan_samples,
+    risk_samples,
+    variant_dogs,
+)
+
+N_SAMPLES = 40
+
+
+def legacy_encode_detailed(raw_row, encoders, features_list):
+    """The one-row label encoding preprocess_detailed_disease used before the batch version."""
+    df = pd.DataFrame([raw_row])
+    for col in df.columns:
+        if col in ANSWER_CODES:
+            df[col] = encode_detailed_value(col, df[col].iloc[0], encoders)
+        elif col in encoders:
+            try:
+                df[col] = float(encoders[col].transform([str(df[col].iloc[0]).strip()])[0])
+            except Exception:
+                df[col] = 0.0
+    for col in df.columns:
+        df[col] = pd.to_numeric(df[col].astype(object), errors='coerce').fillna(0.0)
+    return df[features_list].astype(float)
+
+
+def sampled_dogs(dog, samples):
+    return [
+        dog.model_copy(update={
+            "dailyActiveHours": float(samples["dailyActiveHours"][i]),
+            "weight": float(samples["weight"][i]),
+            "activityIntensity": INTENSITY_LEVELS[samples["intensity"][i]],
+        })
+        for i in range(len(samples["weight"]))
+    ]
+
+
+@pytest.fixture
+def sample_case():
+    dog = DetailedDogHealthData(**DETAILED_BODY)
+    samples = draw_samples(dog, N_SAMPLES, np.random.default_rng(0))
+    return dog, dog_age(dog), samples
+
+
+@pytest.mark.parametrize("weight", [4.0, 22.0, 34.0])
+def test_detailed_encoding_matches_legacy_loop(model_set, weight):
+    models = model_set("67feat")
+    dogs = variant_dogs(DetailedDogHealthData(**dict(DETAILED_BODY, weight=weight, sex="Unknown sex")))
+    rows = [detailed_disease_raw_row(d, 3.0) for d in dogs]
+    batch = encode_detailed_disease_rows(rows, models["encoders"], models["features"])
+    expected = pd.concat([legacy_encode_detailed(r, models["encoders"], models["features"]) for r in rows])
+    np.testing.assert_array_equal(batch.to_numpy(), expected.to_numpy())
+
+
+def test_lifespan_samples_match_per_dog(model_set, sample_case):
+    ml_models = model_set("lifespan")
+    dog, age, samples = sample_case
+    cols = ml_models["columns"]
+    variants = encode_lifespan_rows([lifespan_raw_row(d, age) for d in variant_dogs(dog)], cols)
+    expected = ml_models["lifespan"].predict(
+        encode_lifespan_rows([lifespan_raw_row(d, age) for d in sampled_dogs(dog, samples)], cols)
+    )
+    np.testing.assert_allclose(lifespan_samples(ml_models, variants, samples, age), expected, rtol=0, atol=1e-12)
+
+
+@pytest.mark.parametrize("family", ["19feat", "67feat"])
+def test_risk_samples_match_per_dog(model_set, sample_case, family):
+    models = model_set(family)
+    dog, age, samples = sample_case
+    raw_row, encode = (
+        (basic_disease_raw_row, encode_basic_disease_rows) if family == "19feat"
+        else (detailed_disease_raw_row, encode_detailed_disease_rows)
+    )
+    variants = encode([raw_row(d, age) for d in variant_dogs(dog)], models["encoders"], models["features"])
+    per_dog = encode([raw_row(d, age) for d in sampled_dogs(dog, samples)], models["encoders"], models["features"])
+    np.testing.assert_allclose(risk_samples(models, variants, samples, age), batch_risks(models, per_dog),
+                               rtol=0, atol=1e-12)
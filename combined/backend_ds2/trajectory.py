@@ -0,0 +1,61 @@
+# trajectory.py
+"""
+Lifespan and disease-risk curves for one dog across a grid of future ages.
+
+Only a few model inputs depend on age: Age_at_Condition and weight_lbs (weighed
+only from age 8) for the lifespan model, and Estimated_Age_Years_at_HLES and
+LifeStage_Class_at_HLES for the disease models. Each family's input row is
+preprocessed once and repeated for every grid age, and only those columns are
+overwritten. The whole grid is then scored in one pass per model family.
+"""
+import numpy as np
+from scipy.special import expit
+
+from preprocessor import encode_detailed_value, lifespan_weight_lbs
+from model_store import DISEASES, UNSCALED_MODEL_KINDS
+from utils import map_age_to_life_stage
+
+
+def age_grid(age, years_ahead, step):
+    """Ages from the current one up to years_ahead later, every step years."""
+    return np.round(age + np.arange(0.0, years_ahead + step / 2, step), 2)
+
+
+def lifespan_rows(df_l, ages, weight_kg):
+    """The one-row lifespan input repeated per age, with the age-driven columns rewritten."""
+    rows = df_l.loc[df_l.index.repeat(len(ages))].reset_index(drop=True)
+    if "Age_at_Condition" in rows:
+        rows["Age_at_Condition"] = ages
+    if "weight_lbs" in rows:
+        rows["weight_lbs"] = lifespan_weight_lbs(ages, weight_kg)
+    return rows
+
+
+def disease_rows(df, ages, encoders):
+    """A one-row disease input (19 or 67 features) repeated per age, with age and life stage rewritten."""
+    rows = df.loc[df.index.repeat(len(ages))].reset_index(drop=True)
+    if "Estimated_Age_Years_at_HLES" in rows:
+        rows["Estimated_Age_Years_at_HLES"] = ages
+    if "LifeStage_Class_at_HLES" in rows:
+        stage_codes = {}
+        for age in ages:
+            stage = map_age_to_life_stage(age)
+            if stage not in stage_codes:
+                stage_codes[stage] = encode_detailed_value("LifeStage_Class_at_HLES", stage, encoders)
+        rows["LifeStage_Class_at_HLES"] = [stage_codes[map_age_to_life_stage(age)] for age in ages]
+    return rows
+
+
+def batch_risks(models_dict, X):
+    """Positive-class probabilities (rows x diseases) for an unscaled input matrix."""
+    if models_dict["kind"] not in UNSCALED_MODEL_KINDS:
+        X = models_dict["scaler"].transform(X)
+    if "coef" in models_dict:
+        return expit(np.asarray(X, dtype=float) @ models_dict["coef"].T + models_dict["intercept"])
+    return np.column_stack([models_dict["models"][d].predict_proba(X)[:, 1] for d in DISEASES])
+
+
+def risk_curves(models_dict, df, ages):
+    """{DISEASE: [risk score per age]} on the 0-100 scale used by the prediction endpoints."""
+    risks = batch_risks(models_dict, disease_rows(df, ages, models_dict["encoders"]))
+    return {d.upper(): np.round(risks[:, i] * 100, 1).tolist() for i, d in enumerate(DISEASES)}
@@ -0,0 +1,127 @@
+# tree_compiler.py
+"""
+Flattened NumPy evaluation of fitted scikit-learn tree ensembles.
+
+compile_tree_ensemble() copies every tree of a fitted DecisionTreeRegressor,
+RandomForestRegressor, ExtraTreesRegressor or GradientBoostingRegressor into one
+set of contiguous node arrays (feature, threshold, left, right, value). Leaves
+point to themselves, so evaluation is a fixed number of vectorized steps (the
+deepest tree's depth) over all rows and all trees at once, with no per-call
+estimator or joblib overhead. The result is a drop-in for model.predict.
+"""
+import numpy as np
+import pandas as pd
+from sklearn.dummy import DummyRegressor
+from sklearn.ensemble import (
+    ExtraTreesRegressor,
+    GradientBoostingRegressor,
+    RandomForestRegressor,
+)
+from sklearn.tree import DecisionTreeRegressor
+
+TREE_LEAF = -1
+
+
+class CompiledTreeEnsemble:
+    """Tree ensemble evaluated from flat node arrays; predict() matches the source model."""
+
+    def __init__(self, trees, scale, offset, feature_names=None, n_features=None):
+        n_nodes = [tree.node_count for tree in trees]
+        starts = np.concatenate([[0], np.cumsum(n_nodes)[:-1]]).astype(np.intp)
+
+        feature, threshold, left, right, value, missing_left = [], [], [], [], [], []
+        for tree, start in zip(trees, starts):
+            is_leaf = tree.children_left == TREE_LEAF
+            nodes = np.arange(tree.node_count) + start
+            feature.append(np.where(is_leaf, 0, tree.feature))
+            # Leaves always go "left" to themselves
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(np.where(is_leaf, nodes, tree.children_left + start))
+            right.append(np.where(is_leaf, nodes, tree.children_right + start))
+            value.append(tree.value[:, 0, 0])
+            missing = getattr(tree, "missing_go_to_left", None)
+            missing_left.append(np.ones(tree.node_count, dtype=bool) if missing is None
+                                else np.where(is_leaf, True, missing.astype(bool)))
+
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = np.concatenate(threshold)
+        self.left = np.concatenate(left).astype(np.intp)
+        self.right = np.concatenate(right).astype(np.intp)
+        self.value = np.concatenate(value)
+        self.missing_left = np.concatenate(missing_left)
+        self.roots = starts
+        self.depth = max(tree.max_depth for tree in trees)
+        self.scale = scale
+        self.offset = offset
+        self.feature_names_in_ = feature_names
+        self.n_features_in_ = n_features
+
+    def _as_matrix(self, X):
+        if hasattr(X, "columns") and self.feature_names_in_ is not None:
+            if list(X.columns) != list(self.feature_names_in_):
+                X = X[self.feature_names_in_]
+        # sklearn trees compare float32 inputs against float64 thresholds
+        return np.asarray(X, dtype=np.float32)
+
+    def predict(self, X):
+        X = self._as_matrix(X)
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots))).copy()
+        for _ in range(self.depth):
+            x = X[rows, self.feature[node]]
+            go_left = np.where(np.isnan(x), self.missing_left[node], x <= self.threshold[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.offset + self.scale * self.value[node].sum(axis=1)
+
+
+def compile_tree_ensemble(model):
+    """Compile a fitted single-output tree regressor; raises TypeError for anything else."""
+    names = getattr(model, "feature_names_in_", None)
+    n_features = getattr(model, "n_features_in_", None)
+
+    if isinstance(model, DecisionTreeRegressor):
+        trees, scale, offset = [model.tree_], 1.0, 0.0
+    elif isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+        trees = [est.tree_ for est in model.estimators_]
+        scale, offset = 1.0 / len(trees), 0.0
+    elif isinstance(model, GradientBoostingRegressor):
+        trees = [est.tree_ for est in model.estimators_[:, 0]]
+        scale = model.learning_rate
+        if model.init_ == "zero":
+            offset = 0.0
+        elif isinstance(model.init_, DummyRegressor):
+            offset = float(np.ravel(model.init_.constant_)[0])
+        else:
+            raise TypeError(f"Unsupported GradientBoosting init estimator: {type(model.init_).__name__}")
+    else:
+        raise TypeError(f"Cannot compile {type(model).__name__}")
+
+    if any(tree.n_outputs != 1 for tree in trees):
+        raise TypeError("Only single-output regressors can be compiled")
+    return CompiledTreeEnsemble(trees, scale, offset, names, n_features)
+
+
+def compile_if_equivalent(model, n_probe=256, random_state=0, atol=1e-9):
+    """
+    Compiled model when it reproduces model.predict on probe rows, else the model itself.
+    Probe rows are sparse one-hot style vectors with one value set exactly on a split threshold.
+    """
+    try:
+        compiled = compile_tree_ensemble(model)
+    except TypeError:
+        return model
+
+    rng = np.random.RandomState(random_state)
+    n_features = compiled.n_features_in_ or int(compiled.feature.max()) + 1
+    X = (rng.rand(n_probe, n_features) < 0.1).astype(float)
+    split_nodes = np.flatnonzero(np.isfinite(compiled.threshold))
+    if len(split_nodes):
+        picks = rng.choice(split_nodes, size=n_probe)
+        X[np.arange(n_probe), compiled.feature[picks]] = compiled.threshold[picks]  # exact tie -> left
+    if compiled.feature_names_in_ is not None:
+        X = pd.DataFrame(X, columns=compiled.feature_names_in_)
+
+    if not np.allclose(compiled.predict(X), model.predict(X), rtol=0, atol=atol):
+        print(f"⚠️ Compiled {type(model).__name__} disagrees with sklearn; serving the original model.")
+        return model
+    return compiled
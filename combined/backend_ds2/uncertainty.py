@@ -0,0 +1,160 @@
+# uncertainty.py
+"""
+Monte Carlo bands for owner-estimated inputs.
+
+dailyActiveHours, weight and activityIntensity are owner estimates. Samples of
+them are drawn as arrays, and every family's preprocessed row is repeated and
+rewritten from those arrays. Categorical inputs copy their columns from a small
+table of pre-encoded variant rows (one per level or weight class, built with the
+family's own preprocessing). Continuous inputs overwrite their column directly.
+Rows are scored in chunks of UNCERTAINTY_BATCH_SIZE, and percentiles are taken
+across samples.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from model_store import DISEASES
+from preprocessor import (
+    lifespan_weight_lbs,
+    lifespan_raw_row,
+    encode_lifespan_rows,
+    basic_disease_raw_row,
+    encode_basic_disease_rows,
+    detailed_disease_raw_row,
+    encode_detailed_disease_rows,
+)
+from trajectory import batch_risks
+
+UNCERTAINTY_SAMPLES = int(os.getenv("UNCERTAINTY_SAMPLES", "10000"))
+UNCERTAINTY_BATCH_SIZE = int(os.getenv("UNCERTAINTY_BATCH_SIZE", "2500"))
+PERCENTILES = [5, 25, 50, 75, 95]
+
+# Owner-estimate noise: relative standard deviation (with a floor) for the continuous inputs
+ACTIVE_HOURS_REL_SD, ACTIVE_HOURS_MIN_SD = 0.25, 0.25
+WEIGHT_REL_SD = 0.10
+# activityIntensity stays as reported with this probability, else moves to an adjacent level
+INTENSITY_LEVELS = ["Light", "Moderate", "Intense"]
+INTENSITY_KEEP_PROB = 0.7
+# Lower edges of the 5 kg weight classes after the first (see utils.map_weight_to_class)
+WEIGHT_CLASS_EDGES = [5.0, 10.0, 15.0, 25.0, 35.0]
+
+
+def intensity_probabilities(current):
+    """Probability of each INTENSITY_LEVELS entry given the reported level."""
+    i = INTENSITY_LEVELS.index(current)
+    neighbours = [j for j in (i - 1, i + 1) if 0 <= j < len(INTENSITY_LEVELS)]
+    p = np.zeros(len(INTENSITY_LEVELS))
+    p[i] = INTENSITY_KEEP_PROB
+    p[neighbours] = (1 - INTENSITY_KEEP_PROB) / len(neighbours)
+    return p
+
+
+def draw_samples(dog, n, rng):
+    """Sampled hours, weights and intensity level indices (None when the level is not a standard one)."""
+    hours = float(dog.dailyActiveHours)
+    sd = max(ACTIVE_HOURS_MIN_SD, ACTIVE_HOURS_REL_SD * hours)
+    samples = {
+        "dailyActiveHours": np.clip(rng.normal(hours, sd, n), 0.0, 24.0),
+        "weight": np.clip(rng.normal(dog.weight, WEIGHT_REL_SD * dog.weight, n), 0.5, None),
+        "intensity": None,
+    }
+    current = dog.activityIntensity.strip().title()
+    if current in INTENSITY_LEVELS:
+        samples["intensity"] = rng.choice(len(INTENSITY_LEVELS), size=n, p=intensity_probabilities(current))
+    return samples
+
+
+def variant_dogs(dog):
+    """The dog as sent, then one copy per intensity level, then one per weight class."""
+    weights = [0.0] + WEIGHT_CLASS_EDGES
+    return (
+        [dog]
+        + [dog.model_copy(update={"activityIntensity": level}) for level in INTENSITY_LEVELS]
+        + [dog.model_copy(update={"weight": w}) for w in weights]
+    )
+
+
+def level_table(rows):
+    """Variant rows and the columns that differ between them."""
+    return rows, np.flatnonzero((rows != rows[0]).any(axis=0))
+
+
+def sampled_outputs(encoded_variants, columns, samples, age, score):
+    """
+    Score every sample for one family. encoded_variants holds the family's encoded
+    variant_dogs() rows; score maps a DataFrame chunk to a (rows,) or (rows, diseases) array.
+    """
+    variants = np.asarray(encoded_variants, dtype=float)
+    base = variants[0]
+    n_levels = len(INTENSITY_LEVELS)
+    intensity_table = level_table(variants[1:1 + n_levels])
+    weight_table = level_table(variants[1 + n_levels:])
+    weight_class = np.searchsorted(WEIGHT_CLASS_EDGES, samples["weight"], side="right")
+    continuous = {"pa_avg_daily_active_hours": samples["dailyActiveHours"]}
+    if "weight_lbs" in columns:
+        continuous["weight_lbs"] = lifespan_weight_lbs(age, samples["weight"])
+
+    n = len(weight_class)
+    outputs = []
+    for start in range(0, n, UNCERTAINTY_BATCH_SIZE):
+        stop = min(n, start + UNCERTAINTY_BATCH_SIZE)
+        X = np.repeat(base[np.newaxis, :], stop - start, axis=0)
+        if samples["intensity"] is not None:
+            table, cols = intensity_table
+            X[:, cols] = table[:, cols][samples["intensity"][start:stop]]
+        table, cols = weight_table
+        X[:, cols] = table[:, cols][weight_class[start:stop]]
+        for name, values in continuous.items():
+            if name in columns:
+                X[:, columns.index(name)] = values[start:stop]
+        outputs.append(score(pd.DataFrame(X, columns=columns)))
+    return np.concatenate(outputs)
+
+
+def percentile_bands(values, scale=1.0, digits=2):
+    """{p5: ..., p25: ..., ...} for one output, or {DISEASE: {...}} when values has a disease axis."""
+    bands = np.percentile(values, PERCENTILES, axis=0) * scale
+    if bands.ndim == 1:
+        return {f"p{p}": round(float(b), digits) for p, b in zip(PERCENTILES, bands)}
+    return {
+        d.upper(): {f"p{p}": round(float(b), digits) for p, b in zip(PERCENTILES, bands[:, i])}
+        for i, d in enumerate(DISEASES)
+    }
+
+
+def lifespan_samples(ml_models, encoded_variants, samples, age):
+    """Predicted remaining years per sample."""
+    return sampled_outputs(encoded_variants, list(ml_models["columns"]), samples, age,
+                           lambda X: np.asarray(ml_models["lifespan"].predict(X), dtype=float))
+
+
+def risk_samples(models_dict, encoded_variants, samples, age):
+    """Disease probabilities per sample (samples x diseases)."""
+    return sampled_outputs(encoded_variants, list(models_dict["features"]), samples, age,
+                           lambda X: batch_risks(models_dict, X))
+
+
+def uncertainty_bands(dog, age, ml_models, basic_set, detailed_set=None, n=UNCERTAINTY_SAMPLES, seed=None):
+    """Percentile bands of remaining lifespan and of each disease risk (basic and, if given, advanced)."""
+    samples = draw_samples(dog, n, np.random.default_rng(seed))
+    dogs = variant_dogs(dog)
+
+    lifespan_variants = encode_lifespan_rows([lifespan_raw_row(d, age) for d in dogs], ml_models["columns"])
+    basic_variants = encode_basic_disease_rows(
+        [basic_disease_raw_row(d, age) for d in dogs], basic_set["encoders"], basic_set["features"]
+    )
+    result = {
+        "samples": n,
+        "lifespan": {"remaining_years": percentile_bands(lifespan_samples(ml_models, lifespan_variants, samples, age))},
+        "risks": {"basic": percentile_bands(risk_samples(basic_set, basic_variants, samples, age), 100, 1)},
+    }
+    if detailed_set is not None:
+        detailed_variants = encode_detailed_disease_rows(
+            [detailed_disease_raw_row(d, age) for d in dogs], detailed_set["encoders"], detailed_set["features"]
+        )
+        result["risks"]["advanced"] = percentile_bands(
+            risk_samples(detailed_set, detailed_variants, samples, age), 100, 1
+        )
+    return result
@@ -1,4 +1,6 @@
 # utils.py
+import sys
+from bisect import bisect_right
 
 def map_age_to_life_stage(age: float) -> str:
     """
@@ -82,13 +84,28 @@ def map_activity_intensity(intensity: str) -> str:
         # Default fallback for unknown values
         return ""
 
+# Lower edges of the risk bands after "Low", and each band's interpretation and advice
+RISK_BAND_EDGES = [20, 40, 60, 80]
+RISK_BAND_LABELS = ["Low", "Low-Moderate", "Moderate", "Moderate-High", "High"]
+RECOMMENDATIONS = {
+    "low": "Continue regular wellness exams and preventive care.",
+    "low-moderate": "Monitor for early signs and maintain preventive care.",
+    "moderate": "Schedule veterinary consultation for thorough evaluation.",
+    "moderate-high": "Consult with veterinarian soon for comprehensive assessment.",
+    "high": "Schedule urgent veterinary consultation and testing."
+}
+# (interpretation, recommendation) per band, built once so responses reuse the same strings
+RISK_BAND_TEXT = [
+    (sys.intern(label), sys.intern(RECOMMENDATIONS[label.lower()])) for label in RISK_BAND_LABELS
+]
+
+def risk_band_text(score: float) -> tuple:
+    """(interpretation, recommendation) for a 0-100 risk score, from the precomputed band table."""
+    return RISK_BAND_TEXT[bisect_right(RISK_BAND_EDGES, score)]
+
 def get_risk_interpretation(score: float) -> str:
     """Converts a 0-100 risk score into a qualitative risk level."""
-    if score < 20: return "Low"
-    elif score < 40: return "Low-Moderate"
-    elif score < 60: return "Moderate"
-    elif score < 80: return "Moderate-High"
-    else: return "High"
+    return risk_band_text(score)[0]
 
 def get_reliability_rating(auc_score: float) -> str:
     """Converts the model's AUC score into a reliability rating."""
@@ -110,12 +127,4 @@ def get_reliability_explanation(auc_score: float, disease: str) -> str:
 
 def get_recommendation(disease: str, risk_score: float) -> str:
     """Provides actionable veterinary advice based on the calculated risk level."""
-    risk_level = get_risk_interpretation(risk_score)
-    recommendations = {
-        "low": "Continue regular wellness exams and preventive care.",
-        "low-moderate": "Monitor for early signs and maintain preventive care.",
-        "moderate": "Schedule veterinary consultation for thorough evaluation.",
-        "moderate-high": "Consult with veterinarian soon for comprehensive assessment.",
-        "high": "Schedule urgent veterinary consultation and testing."
-    }
-    return recommendations.get(risk_level.lower().replace(" ", "-"), "Consult your veterinarian.")
\ No newline at end of file
+    return risk_band_text(risk_score)[1]